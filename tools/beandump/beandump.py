@@ -0,0 +1,69 @@
+import mmap
+import struct
+
+# layout written by source/util/dump.d: u32 magic, u32 entrypoint, MEM1, MEM2
+BEAN_MAGIC = 0x4245414E # "BEAN"
+HEADER_SIZE = 8
+
+MEM1_SIZE = 0x1800000
+MEM2_SIZE = 0x4000000
+
+class BeanDump:
+    def __init__(self, filename='bean.bdp'):
+        with open(filename, 'rb') as f:
+            self.file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self.file)
+        if len(view) != HEADER_SIZE + MEM1_SIZE + MEM2_SIZE:
+            raise ValueError(f"{filename} is {len(view)} bytes, expected {HEADER_SIZE + MEM1_SIZE + MEM2_SIZE}")
+
+        magic, self.entrypoint = struct.unpack_from('<II', view, 0)
+        if magic != BEAN_MAGIC:
+            raise ValueError(f"{filename} has bad magic 0x{magic:08x}, expected 0x{BEAN_MAGIC:08x}")
+
+        self.mem1 = view[HEADER_SIZE:HEADER_SIZE + MEM1_SIZE]
+        self.mem2 = view[HEADER_SIZE + MEM1_SIZE:]
+
+    # accepts physical addresses as well as the cached (0x8/0x9) and uncached (0xC/0xD) mirrors
+    def translate(self, addr):
+        match addr >> 28:
+            case 0x0 | 0x8 | 0xc:
+                mem = self.mem1
+            case 0x1 | 0x9 | 0xd:
+                mem = self.mem2
+            case _:
+                raise IndexError(f"address 0x{addr:08x} is not in MEM1 or MEM2")
+
+        offset = addr & 0x0fffffff
+        if offset >= len(mem):
+            raise IndexError(f"address 0x{addr:08x} is out of bounds")
+
+        return mem, offset
+
+    def is_valid_addr(self, addr, size=1):
+        try:
+            mem, offset = self.translate(addr)
+        except IndexError:
+            return False
+
+        return offset + size <= len(mem)
+
+    # one contiguous zero-copy view, a range may not run past the end of MEM1 or MEM2
+    def read_range(self, addr, length):
+        mem, offset = self.translate(addr)
+        if length < 0 or offset + length > len(mem):
+            raise IndexError(f"range 0x{addr:08x}-0x{addr + length:08x} is out of bounds")
+
+        return mem[offset:offset + length]
+
+    def read_u8(self, addr):
+        mem, offset = self.translate(addr)
+        return mem[offset]
+
+    def read_u16(self, addr):
+        mem, offset = self.translate(addr)
+        return struct.unpack_from('>H', mem, offset)[0]
+
+    def read_u32(self, addr):
+        mem, offset = self.translate(addr)
+        return struct.unpack_from('>I', mem, offset)[0]
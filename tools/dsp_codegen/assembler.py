@@ -1,1729 +1,2500 @@
 
 # This file is automatically generated by generate_assembler.py. 
 # Do not edit it manually.
+
+import contextlib
+import threading
+
+# every Assembler is its own program, so any number of them can be built at once. instructions are
+# encoded straight into code as big endian words, labels and sizes come from its length, so they're
+# O(1) no matter how big the program gets.
+#
+# origin is the word address code will be loaded at. the address of bloop, bloopi, jmp_cc and call_cc, and
+# the immediate of lri, can be a label name, or ref(name, offset), and is filled in by assemble() once every
+# label is known.
+class Assembler:
+	def __init__(self, origin=0):
+		self.origin = origin
+		self.code = bytearray()
+		self.num_instructions = 0
+		self.last_instruction_offset = 0
+		self.labels = {}
+		self.fixups = []
+
+	def emit(self, instruction, num_bytes):
+		self.last_instruction_offset = len(self.code)
+		self.num_instructions += 1
+		self.code.extend(instruction.to_bytes(num_bytes, 'big'))
+
+	def label(self, name):
+		if name in self.labels:
+			raise ValueError(f"Label {name} is already defined")
+
+		self.labels[name] = self.get_label()
+
+	# the instruction that's about to be emitted has target in the given field
+	def add_fixup(self, target, shift, size):
+		name, offset = (target, 0) if isinstance(target, str) else target
+		self.fixups.append((len(self.code), shift, size, name, offset))
+
+	def resolve_fixups(self):
+		for instruction_offset, shift, size, name, offset in self.fixups:
+			if name not in self.labels:
+				raise ValueError(f"Label {name} is never defined")
+
+			address = self.labels[name] + offset
+			if not 0 <= address < (1 << size):
+				raise ValueError(f"Label {name} is out of range: {address}")
+
+			instruction_size = 4
+			instruction = int.from_bytes(self.code[instruction_offset:instruction_offset + instruction_size], 'big')
+			instruction &= ~(((1 << size) - 1) << shift)
+			instruction |= address << shift
+			self.code[instruction_offset:instruction_offset + instruction_size] = instruction.to_bytes(instruction_size, 'big')
+
+		self.fixups = []
+    
+	def nop(self):
+		
+		
+        
+		instruction = 0x0
+		
+		self.emit(instruction, 2)
+    
+	def dar(self, a):
+		
+		assert 0 <= a and a < 4
+        
+		instruction = 0x4
+		instruction |= (a << 0)
+		self.emit(instruction, 2)
+    
+	def iar(self, a):
+		
+		assert 0 <= a and a < 4
+        
+		instruction = 0x8
+		instruction |= (a << 0)
+		self.emit(instruction, 2)
+    
+	def addarn(self, s, d):
+		
+		assert 0 <= s and s < 4
+		assert 0 <= d and d < 4
+        
+		instruction = 0x10
+		instruction |= (s << 2)
+		instruction |= (d << 0)
+		self.emit(instruction, 2)
+    
+	def halt(self):
+		
+		
+        
+		instruction = 0x21
+		
+		self.emit(instruction, 2)
+    
+	def loop(self, r):
+		
+		assert 0 <= r and r < 32
+        
+		instruction = 0x40
+		instruction |= (r << 0)
+		self.emit(instruction, 2)
+    
+	def bloop(self, r, a):
+		if isinstance(a, (str, tuple)):
+			self.add_fixup(a, 0, 16)
+			a = 0
+		assert 0 <= r and r < 32
+		assert 0 <= a and a < 65536
+        
+		instruction = 0x600000
+		instruction |= (r << 16)
+		instruction |= (a << 0)
+		self.emit(instruction, 4)
+    
+	def lri(self, r, i):
+		if isinstance(i, (str, tuple)):
+			self.add_fixup(i, 0, 16)
+			i = 0
+		assert 0 <= r and r < 32
+		assert 0 <= i and i < 65536
+        
+		instruction = 0x800000
+		instruction |= (r << 16)
+		instruction |= (i << 0)
+		self.emit(instruction, 4)
+    
+	def lr(self, r, m):
+		
+		assert 0 <= r and r < 32
+		assert 0 <= m and m < 65536
+        
+		instruction = 0xc00000
+		instruction |= (r << 16)
+		instruction |= (m << 0)
+		self.emit(instruction, 4)
+    
+	def sr(self, r, m):
+		
+		assert 0 <= r and r < 32
+		assert 0 <= m and m < 65536
+        
+		instruction = 0xe00000
+		instruction |= (r << 16)
+		instruction |= (m << 0)
+		self.emit(instruction, 4)
+    
+	def if_cc(self, c):
+		
+		assert 0 <= c and c < 16
+        
+		instruction = 0x270
+		instruction |= (c << 0)
+		self.emit(instruction, 2)
+    
+	def jmp_cc(self, c, a):
+		if isinstance(a, (str, tuple)):
+			self.add_fixup(a, 0, 16)
+			a = 0
+		assert 0 <= c and c < 16
+		assert 0 <= a and a < 65536
+        
+		instruction = 0x2900000
+		instruction |= (c << 16)
+		instruction |= (a << 0)
+		self.emit(instruction, 4)
+    
+	def call_cc(self, c, a):
+		if isinstance(a, (str, tuple)):
+			self.add_fixup(a, 0, 16)
+			a = 0
+		assert 0 <= c and c < 16
+		assert 0 <= a and a < 65536
+        
+		instruction = 0x2b00000
+		instruction |= (c << 16)
+		instruction |= (a << 0)
+		self.emit(instruction, 4)
+    
+	def ret_cc(self, c):
+		
+		assert 0 <= c and c < 16
+        
+		instruction = 0x2d0
+		instruction |= (c << 0)
+		self.emit(instruction, 2)
+    
+	def rti_cc(self, c):
+		
+		assert 0 <= c and c < 16
+        
+		instruction = 0x2f0
+		instruction |= (c << 0)
+		self.emit(instruction, 2)
+    
+	def asrn(self):
+		
+		
+        
+		instruction = 0x2cb
+		
+		self.emit(instruction, 2)
+    
+	def lsrn(self):
+		
+		
+        
+		instruction = 0x2ca
+		
+		self.emit(instruction, 2)
+    
+	def asrnr(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3e80
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def asrnrx(self, s, d, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3880
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def lsrnr(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3c80
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def lsrnrx(self, s, d, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3480
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def addi(self, d, i):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= i and i < 65536
+        
+		instruction = 0x2000000
+		instruction |= (d << 24)
+		instruction |= (i << 0)
+		self.emit(instruction, 4)
+    
+	def xori(self, r, i):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= i and i < 65536
+        
+		instruction = 0x2200000
+		instruction |= (r << 24)
+		instruction |= (i << 0)
+		self.emit(instruction, 4)
+    
+	def andi(self, r, i):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= i and i < 65536
+        
+		instruction = 0x2400000
+		instruction |= (r << 24)
+		instruction |= (i << 0)
+		self.emit(instruction, 4)
+    
+	def ori(self, r, i):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= i and i < 65536
+        
+		instruction = 0x2600000
+		instruction |= (r << 24)
+		instruction |= (i << 0)
+		self.emit(instruction, 4)
+    
+	def cmpi(self, r, i):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= i and i < 65536
+        
+		instruction = 0x2800000
+		instruction |= (r << 24)
+		instruction |= (i << 0)
+		self.emit(instruction, 4)
+    
+	def andcf(self, r, i):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= i and i < 65536
+        
+		instruction = 0x2c00000
+		instruction |= (r << 24)
+		instruction |= (i << 0)
+		self.emit(instruction, 4)
+    
+	def andf(self, r, i):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= i and i < 65536
+        
+		instruction = 0x2a00000
+		instruction |= (r << 24)
+		instruction |= (i << 0)
+		self.emit(instruction, 4)
+    
+	def ilrr(self, r, a):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= a and a < 4
+        
+		instruction = 0x210
+		instruction |= (r << 8)
+		instruction |= (a << 0)
+		self.emit(instruction, 2)
+    
+	def ilrrd(self, d, s):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= s and s < 4
+        
+		instruction = 0x214
+		instruction |= (d << 8)
+		instruction |= (s << 0)
+		self.emit(instruction, 2)
+    
+	def ilrri(self, d, s):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= s and s < 4
+        
+		instruction = 0x218
+		instruction |= (d << 8)
+		instruction |= (s << 0)
+		self.emit(instruction, 2)
+    
+	def ilrrn(self, d, s):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= s and s < 4
+        
+		instruction = 0x21c
+		instruction |= (d << 8)
+		instruction |= (s << 0)
+		self.emit(instruction, 2)
+    
+	def addis(self, d, i):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= i and i < 256
+        
+		instruction = 0x400
+		instruction |= (d << 8)
+		instruction |= (i << 0)
+		self.emit(instruction, 2)
+    
+	def cmpis(self, d, i):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= i and i < 256
+        
+		instruction = 0x600
+		instruction |= (d << 8)
+		instruction |= (i << 0)
+		self.emit(instruction, 2)
+    
+	def lris(self, r, i):
+		
+		assert 0 <= r and r < 8
+		assert 0 <= i and i < 256
+        
+		instruction = 0x800
+		instruction |= (r << 8)
+		instruction |= (i << 0)
+		self.emit(instruction, 2)
+    
+	def loopi(self, i):
+		
+		assert 0 <= i and i < 256
+        
+		instruction = 0x1000
+		instruction |= (i << 0)
+		self.emit(instruction, 2)
+    
+	def bloopi(self, i, a):
+		if isinstance(a, (str, tuple)):
+			self.add_fixup(a, 0, 16)
+			a = 0
+		assert 0 <= i and i < 256
+		assert 0 <= a and a < 65536
+        
+		instruction = 0x11000000
+		instruction |= (i << 16)
+		instruction |= (a << 0)
+		self.emit(instruction, 4)
+    
+	def sbclr(self, i):
+		
+		assert 0 <= i and i < 8
+        
+		instruction = 0x1200
+		instruction |= (i << 0)
+		self.emit(instruction, 2)
+    
+	def sbset(self, i):
+		
+		assert 0 <= i and i < 8
+        
+		instruction = 0x1300
+		instruction |= (i << 0)
+		self.emit(instruction, 2)
+    
+	def lsl(self, r, s):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= s and s < 64
+        
+		instruction = 0x1400
+		instruction |= (r << 8)
+		instruction |= (s << 0)
+		self.emit(instruction, 2)
+    
+	def lsr(self, r, s):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= s and s < 64
+        
+		instruction = 0x1440
+		instruction |= (r << 8)
+		instruction |= (s << 0)
+		self.emit(instruction, 2)
+    
+	def asl(self, r, s):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= s and s < 64
+        
+		instruction = 0x1480
+		instruction |= (r << 8)
+		instruction |= (s << 0)
+		self.emit(instruction, 2)
+    
+	def asr(self, r, s):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= s and s < 64
+        
+		instruction = 0x14c0
+		instruction |= (r << 8)
+		instruction |= (s << 0)
+		self.emit(instruction, 2)
+    
+	def si(self, i, m):
+		
+		assert 0 <= i and i < 256
+		assert 0 <= m and m < 65536
+        
+		instruction = 0x16000000
+		instruction |= (i << 16)
+		instruction |= (m << 0)
+		self.emit(instruction, 4)
+    
+	def callrcc(self, r, c):
+		
+		assert 0 <= r and r < 8
+		assert 0 <= c and c < 16
+        
+		instruction = 0x1710
+		instruction |= (r << 5)
+		instruction |= (c << 0)
+		self.emit(instruction, 2)
+    
+	def jmpr_cc(self, r, c):
+		
+		assert 0 <= r and r < 8
+		assert 0 <= c and c < 16
+        
+		instruction = 0x1700
+		instruction |= (r << 5)
+		instruction |= (c << 0)
+		self.emit(instruction, 2)
+    
+	def lrr(self, a, r):
+		
+		assert 0 <= a and a < 4
+		assert 0 <= r and r < 32
+        
+		instruction = 0x1800
+		instruction |= (a << 5)
+		instruction |= (r << 0)
+		self.emit(instruction, 2)
+    
+	def lrrd(self, a, r):
+		
+		assert 0 <= a and a < 4
+		assert 0 <= r and r < 32
+        
+		instruction = 0x1880
+		instruction |= (a << 5)
+		instruction |= (r << 0)
+		self.emit(instruction, 2)
+    
+	def lrri(self, a, r):
+		
+		assert 0 <= a and a < 4
+		assert 0 <= r and r < 32
+        
+		instruction = 0x1900
+		instruction |= (a << 5)
+		instruction |= (r << 0)
+		self.emit(instruction, 2)
+    
+	def lrrn(self, a, r):
+		
+		assert 0 <= a and a < 4
+		assert 0 <= r and r < 32
+        
+		instruction = 0x1980
+		instruction |= (a << 5)
+		instruction |= (r << 0)
+		self.emit(instruction, 2)
+    
+	def srr(self, a, r):
+		
+		assert 0 <= a and a < 4
+		assert 0 <= r and r < 32
+        
+		instruction = 0x1a00
+		instruction |= (a << 5)
+		instruction |= (r << 0)
+		self.emit(instruction, 2)
+    
+	def srrd(self, a, r):
+		
+		assert 0 <= a and a < 4
+		assert 0 <= r and r < 32
+        
+		instruction = 0x1a80
+		instruction |= (a << 5)
+		instruction |= (r << 0)
+		self.emit(instruction, 2)
+    
+	def srri(self, a, r):
+		
+		assert 0 <= a and a < 4
+		assert 0 <= r and r < 32
+        
+		instruction = 0x1b00
+		instruction |= (a << 5)
+		instruction |= (r << 0)
+		self.emit(instruction, 2)
+    
+	def srrn(self, a, r):
+		
+		assert 0 <= a and a < 4
+		assert 0 <= r and r < 32
+        
+		instruction = 0x1b80
+		instruction |= (a << 5)
+		instruction |= (r << 0)
+		self.emit(instruction, 2)
+    
+	def mrr(self, d, s):
+		
+		assert 0 <= d and d < 32
+		assert 0 <= s and s < 32
+        
+		instruction = 0x1c00
+		instruction |= (d << 5)
+		instruction |= (s << 0)
+		self.emit(instruction, 2)
+    
+	def lrs(self, r, m):
+		
+		assert 0 <= r and r < 8
+		assert 0 <= m and m < 256
+        
+		instruction = 0x2000
+		instruction |= (r << 8)
+		instruction |= (m << 0)
+		self.emit(instruction, 2)
+    
+	def srs(self, r, m):
+		
+		assert 0 <= r and r < 4
+		assert 0 <= m and m < 256
+        
+		instruction = 0x2c00
+		instruction |= (r << 8)
+		instruction |= (m << 0)
+		self.emit(instruction, 2)
+    
+	def srsh(self, s, m):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= m and m < 256
+        
+		instruction = 0x2800
+		instruction |= (s << 8)
+		instruction |= (m << 0)
+		self.emit(instruction, 2)
+    
+	def xorc(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3080
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def xorr(self, s, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3000
+		instruction |= (s << 9)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def andr(self, s, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3400
+		instruction |= (s << 9)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def orr(self, s, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3800
+		instruction |= (s << 9)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def andc(self, r, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3c00
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def orc(self, r, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3e00
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def addr(self, s, d, x):
+		
+		assert 0 <= s and s < 4
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x4000
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def addax(self, s, d, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x4800
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def add(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x4c00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def addp(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x4e00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def subr(self, s, d, x):
+		
+		assert 0 <= s and s < 4
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x5000
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def subax(self, s, d, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x5800
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def subarn(self, d):
+		
+		assert 0 <= d and d < 4
+        
+		instruction = 0xc
+		instruction |= (d << 0)
+		self.emit(instruction, 2)
+    
+	def sub(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x5c00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def subp(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x5e00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def movr(self, s, d, x):
+		
+		assert 0 <= s and s < 4
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x6000
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def movax(self, s, d, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x6800
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mov(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x6c00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def movp(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x6e00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def addaxl(self, s, d, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x7000
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def incm(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x7400
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def inc(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x7600
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def decm(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x7800
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def dec(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x7a00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def neg(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x7c00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def _not(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 128
+        
+		instruction = 0x3280
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def movnp(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x7e00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def nx(self, y, x):
+		
+		assert 0 <= y and y < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8000
+		instruction |= (y << 11)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def clr(self, r, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8100
+		instruction |= (r << 11)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def cmp(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8200
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulaxh(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8300
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def clrp(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8400
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def tstprod(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8500
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def tstaxh(self, r, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8600
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def m2(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8a00
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def m0(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8b00
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def clr15(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8c00
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def set15(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8d00
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def set16(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8e00
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def set40(self, x):
+		
+		assert 0 <= x and x < 256
+        
+		instruction = 0x8f00
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mul(self, s, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x9000
+		instruction |= (s << 11)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def asr16(self, r, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x9100
+		instruction |= (r << 11)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulmvz(self, s, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x9200
+		instruction |= (s << 11)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulac(self, s, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x9400
+		instruction |= (s << 11)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulmv(self, s, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0x9600
+		instruction |= (s << 11)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulx(self, s, t, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xa000
+		instruction |= (s << 12)
+		instruction |= (t << 11)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def abs(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xa100
+		instruction |= (d << 11)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def tst(self, r, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xb100
+		instruction |= (r << 11)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulxmvz(self, s, t, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xa200
+		instruction |= (s << 12)
+		instruction |= (t << 11)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulxac(self, s, t, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xa400
+		instruction |= (s << 12)
+		instruction |= (t << 11)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulxmv(self, s, t, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xa600
+		instruction |= (s << 12)
+		instruction |= (t << 11)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulc(self, s, t, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xc000
+		instruction |= (s << 12)
+		instruction |= (t << 11)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def cmpaxh(self, r, s, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= s and s < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xc100
+		instruction |= (r << 12)
+		instruction |= (s << 11)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulcmvz(self, s, t, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xc200
+		instruction |= (s << 12)
+		instruction |= (t << 11)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulcac(self, s, t, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xc400
+		instruction |= (s << 12)
+		instruction |= (t << 11)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def mulcmv(self, s, t, r, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xc600
+		instruction |= (s << 12)
+		instruction |= (t << 11)
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def maddx(self, s, t, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xe000
+		instruction |= (s << 9)
+		instruction |= (t << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def msubx(self, s, t, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xe400
+		instruction |= (s << 9)
+		instruction |= (t << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def maddc(self, s, t, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xe800
+		instruction |= (s << 9)
+		instruction |= (t << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def msubc(self, s, t, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= t and t < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xec00
+		instruction |= (s << 9)
+		instruction |= (t << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def lsl16(self, r, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xf000
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def madd(self, s, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xf200
+		instruction |= (s << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def lsr16(self, r, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xf400
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def msub(self, s, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xf600
+		instruction |= (s << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def addpaxz(self, s, d, x):
+		
+		assert 0 <= s and s < 2
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xf800
+		instruction |= (s << 9)
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def clrl(self, r, x):
+		
+		assert 0 <= r and r < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xfc00
+		instruction |= (r << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def movpz(self, d, x):
+		
+		assert 0 <= d and d < 2
+		assert 0 <= x and x < 256
+        
+		instruction = 0xfe00
+		instruction |= (d << 8)
+		instruction |= (x << 0)
+		self.emit(instruction, 2)
+    
+	def ext_nop(self, x):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= x and x < 4
+		
+		extension = 0x0
+		extension |= (x << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_dr(self, r):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= r and r < 4
+		
+		extension = 0x4
+		extension |= (r << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ir(self, r):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= r and r < 4
+		
+		extension = 0x8
+		extension |= (r << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_nr(self, r):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= r and r < 4
+		
+		extension = 0xc
+		extension |= (r << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_mv(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 4
+		assert 0 <= s and s < 4
+		
+		extension = 0x10
+		extension |= (d << 2)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_s(self, s, d):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= s and s < 4
+		assert 0 <= d and d < 4
+		
+		extension = 0x20
+		extension |= (s << 3)
+		extension |= (d << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_sn(self, s, d):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= s and s < 4
+		assert 0 <= d and d < 4
+		
+		extension = 0x24
+		extension |= (s << 3)
+		extension |= (d << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_l(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 8
+		assert 0 <= s and s < 4
+		
+		extension = 0x40
+		extension |= (d << 3)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ln(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 8
+		assert 0 <= s and s < 4
+		
+		extension = 0x44
+		extension |= (d << 3)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ls(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 4
+		assert 0 <= s and s < 2
+		
+		extension = 0x80
+		extension |= (d << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_sl(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 4
+		assert 0 <= s and s < 2
+		
+		extension = 0x82
+		extension |= (d << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_lsn(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 4
+		assert 0 <= s and s < 2
+		
+		extension = 0x84
+		extension |= (d << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_sln(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 4
+		assert 0 <= s and s < 2
+		
+		extension = 0x86
+		extension |= (d << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_lsm(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 4
+		assert 0 <= s and s < 2
+		
+		extension = 0x88
+		extension |= (d << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_slm(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 4
+		assert 0 <= s and s < 2
+		
+		extension = 0x8a
+		extension |= (d << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_lsnm(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 4
+		assert 0 <= s and s < 2
+		
+		extension = 0x8c
+		extension |= (d << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_slnm(self, d, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 4
+		assert 0 <= s and s < 2
+		
+		extension = 0x8e
+		extension |= (d << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ld(self, d, r, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 2
+		assert 0 <= r and r < 2
+		assert 0 <= s and s < 4
+		
+		extension = 0xc0
+		extension |= (d << 5)
+		extension |= (r << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ldax(self, s, r):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		
+		extension = 0xc3
+		extension |= (s << 5)
+		extension |= (r << 4)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ldn(self, d, r, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 2
+		assert 0 <= r and r < 2
+		assert 0 <= s and s < 4
+		
+		extension = 0xc4
+		extension |= (d << 5)
+		extension |= (r << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ldaxn(self, s, r):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		
+		extension = 0xc7
+		extension |= (s << 5)
+		extension |= (r << 4)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ldm(self, d, r, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 2
+		assert 0 <= r and r < 2
+		assert 0 <= s and s < 4
+		
+		extension = 0xc8
+		extension |= (d << 5)
+		extension |= (r << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ldaxm(self, s, r):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		
+		extension = 0xcb
+		extension |= (s << 5)
+		extension |= (r << 4)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ldnm(self, d, r, s):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= d and d < 2
+		assert 0 <= r and r < 2
+		assert 0 <= s and s < 4
+		
+		extension = 0xcc
+		extension |= (d << 5)
+		extension |= (r << 4)
+		extension |= (s << 0)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+    
+	def ext_ldaxnm(self, s, r):
+		# Validate that last instruction can have extension
+		if self.num_instructions == 0:
+			raise ValueError("No main instruction to extend")
+		
+		last_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+		if (last_instruction >> 12) < 3:
+			raise ValueError("Last instruction cannot have extension (first nybble < 3)")
+		
+		# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+		extension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+		if (last_instruction & extension_mask) != 0:
+			raise ValueError("Last instruction already has an extension")
+		
+		assert 0 <= s and s < 2
+		assert 0 <= r and r < 2
+		
+		extension = 0xcf
+		extension |= (s << 5)
+		extension |= (r << 4)
+		if (extension & ~extension_mask) != 0:
+			raise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+		
+		# Modify last instruction by ORing in the extension
+		self.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
+
+
+	def get_label(self):
+		return self.origin + len(self.code) // 2
+
+	# returns the program as bytes and its length in bytes
+	def assemble(self):
+		self.resolve_fixups()
+		return (bytes(self.code), len(self.code))
+
+	def get_num_bytes(self):
+		return len(self.code)
+
+	def get_num_instructions(self):
+		return self.num_instructions
             
-instructions = []
-    
+	def reset(self):
+		self.code.clear()
+		self.num_instructions = 0
+		self.last_instruction_offset = 0
+		self.labels = {}
+		self.fixups = []
+
+# a label plus a number of words, for addresses like the last word of a loop body
+def ref(name, offset=0):
+	return (name, offset)
+
+# the module level functions below build on the current thread's current assembler, which is a
+# thread's own Assembler unless using() has swapped another one in
+local = threading.local()
+
+def current():
+	if getattr(local, 'assembler', None) is None:
+		local.assembler = Assembler()
+
+	return local.assembler
+
+@contextlib.contextmanager
+def using(assembler):
+	previous = getattr(local, 'assembler', None)
+	local.assembler = assembler
+	try:
+		yield assembler
+	finally:
+		local.assembler = previous
+
 def nop():
-	
-        
-	instruction = 0x0
-	
-	instructions.append((instruction, 16))
-    
+	current().nop()
+
 def dar(a):
-	assert 0 <= a and a < 4
-        
-	instruction = 0x4
-	instruction |= (a << 0)
-	instructions.append((instruction, 16))
-    
+	current().dar(a)
+
 def iar(a):
-	assert 0 <= a and a < 4
-        
-	instruction = 0x8
-	instruction |= (a << 0)
-	instructions.append((instruction, 16))
-    
+	current().iar(a)
+
 def addarn(s, d):
-	assert 0 <= s and s < 4
-	assert 0 <= d and d < 4
-        
-	instruction = 0x10
-	instruction |= (s << 2)
-	instruction |= (d << 0)
-	instructions.append((instruction, 16))
-    
+	current().addarn(s, d)
+
 def halt():
-	
-        
-	instruction = 0x21
-	
-	instructions.append((instruction, 16))
-    
+	current().halt()
+
 def loop(r):
-	assert 0 <= r and r < 32
-        
-	instruction = 0x40
-	instruction |= (r << 0)
-	instructions.append((instruction, 16))
-    
+	current().loop(r)
+
 def bloop(r, a):
-	assert 0 <= r and r < 32
-	assert 0 <= a and a < 65536
-        
-	instruction = 0x600000
-	instruction |= (r << 16)
-	instruction |= (a << 0)
-	instructions.append((instruction, 32))
-    
+	current().bloop(r, a)
+
 def lri(r, i):
-	assert 0 <= r and r < 32
-	assert 0 <= i and i < 65536
-        
-	instruction = 0x800000
-	instruction |= (r << 16)
-	instruction |= (i << 0)
-	instructions.append((instruction, 32))
-    
+	current().lri(r, i)
+
 def lr(r, m):
-	assert 0 <= r and r < 32
-	assert 0 <= m and m < 65536
-        
-	instruction = 0xc00000
-	instruction |= (r << 16)
-	instruction |= (m << 0)
-	instructions.append((instruction, 32))
-    
+	current().lr(r, m)
+
 def sr(r, m):
-	assert 0 <= r and r < 32
-	assert 0 <= m and m < 65536
-        
-	instruction = 0xe00000
-	instruction |= (r << 16)
-	instruction |= (m << 0)
-	instructions.append((instruction, 32))
-    
+	current().sr(r, m)
+
 def if_cc(c):
-	assert 0 <= c and c < 16
-        
-	instruction = 0x270
-	instruction |= (c << 0)
-	instructions.append((instruction, 16))
-    
+	current().if_cc(c)
+
 def jmp_cc(c, a):
-	assert 0 <= c and c < 16
-	assert 0 <= a and a < 65536
-        
-	instruction = 0x2900000
-	instruction |= (c << 16)
-	instruction |= (a << 0)
-	instructions.append((instruction, 32))
-    
+	current().jmp_cc(c, a)
+
 def call_cc(c, a):
-	assert 0 <= c and c < 16
-	assert 0 <= a and a < 65536
-        
-	instruction = 0x2b00000
-	instruction |= (c << 16)
-	instruction |= (a << 0)
-	instructions.append((instruction, 32))
-    
+	current().call_cc(c, a)
+
 def ret_cc(c):
-	assert 0 <= c and c < 16
-        
-	instruction = 0x2d0
-	instruction |= (c << 0)
-	instructions.append((instruction, 16))
-    
+	current().ret_cc(c)
+
 def rti_cc(c):
-	assert 0 <= c and c < 16
-        
-	instruction = 0x2f0
-	instruction |= (c << 0)
-	instructions.append((instruction, 16))
-    
+	current().rti_cc(c)
+
 def asrn():
-	
-        
-	instruction = 0x2cb
-	
-	instructions.append((instruction, 16))
-    
+	current().asrn()
+
 def lsrn():
-	
-        
-	instruction = 0x2ca
-	
-	instructions.append((instruction, 16))
-    
+	current().lsrn()
+
 def asrnr(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3e80
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().asrnr(d, x)
+
 def asrnrx(s, d, x):
-	assert 0 <= s and s < 2
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3880
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().asrnrx(s, d, x)
+
 def lsrnr(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3c80
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().lsrnr(d, x)
+
 def lsrnrx(s, d, x):
-	assert 0 <= s and s < 2
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3480
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().lsrnrx(s, d, x)
+
 def addi(d, i):
-	assert 0 <= d and d < 2
-	assert 0 <= i and i < 65536
-        
-	instruction = 0x2000000
-	instruction |= (d << 24)
-	instruction |= (i << 0)
-	instructions.append((instruction, 32))
-    
+	current().addi(d, i)
+
 def xori(r, i):
-	assert 0 <= r and r < 2
-	assert 0 <= i and i < 65536
-        
-	instruction = 0x2200000
-	instruction |= (r << 24)
-	instruction |= (i << 0)
-	instructions.append((instruction, 32))
-    
+	current().xori(r, i)
+
 def andi(r, i):
-	assert 0 <= r and r < 2
-	assert 0 <= i and i < 65536
-        
-	instruction = 0x2400000
-	instruction |= (r << 24)
-	instruction |= (i << 0)
-	instructions.append((instruction, 32))
-    
+	current().andi(r, i)
+
 def ori(r, i):
-	assert 0 <= r and r < 2
-	assert 0 <= i and i < 65536
-        
-	instruction = 0x2600000
-	instruction |= (r << 24)
-	instruction |= (i << 0)
-	instructions.append((instruction, 32))
-    
+	current().ori(r, i)
+
 def cmpi(r, i):
-	assert 0 <= r and r < 2
-	assert 0 <= i and i < 65536
-        
-	instruction = 0x2800000
-	instruction |= (r << 24)
-	instruction |= (i << 0)
-	instructions.append((instruction, 32))
-    
+	current().cmpi(r, i)
+
 def andcf(r, i):
-	assert 0 <= r and r < 2
-	assert 0 <= i and i < 65536
-        
-	instruction = 0x2c00000
-	instruction |= (r << 24)
-	instruction |= (i << 0)
-	instructions.append((instruction, 32))
-    
+	current().andcf(r, i)
+
 def andf(r, i):
-	assert 0 <= r and r < 2
-	assert 0 <= i and i < 65536
-        
-	instruction = 0x2a00000
-	instruction |= (r << 24)
-	instruction |= (i << 0)
-	instructions.append((instruction, 32))
-    
+	current().andf(r, i)
+
 def ilrr(r, a):
-	assert 0 <= r and r < 2
-	assert 0 <= a and a < 4
-        
-	instruction = 0x210
-	instruction |= (r << 8)
-	instruction |= (a << 0)
-	instructions.append((instruction, 16))
-    
+	current().ilrr(r, a)
+
 def ilrrd(d, s):
-	assert 0 <= d and d < 2
-	assert 0 <= s and s < 4
-        
-	instruction = 0x214
-	instruction |= (d << 8)
-	instruction |= (s << 0)
-	instructions.append((instruction, 16))
-    
+	current().ilrrd(d, s)
+
 def ilrri(d, s):
-	assert 0 <= d and d < 2
-	assert 0 <= s and s < 4
-        
-	instruction = 0x218
-	instruction |= (d << 8)
-	instruction |= (s << 0)
-	instructions.append((instruction, 16))
-    
+	current().ilrri(d, s)
+
 def ilrrn(d, s):
-	assert 0 <= d and d < 2
-	assert 0 <= s and s < 4
-        
-	instruction = 0x21c
-	instruction |= (d << 8)
-	instruction |= (s << 0)
-	instructions.append((instruction, 16))
-    
+	current().ilrrn(d, s)
+
 def addis(d, i):
-	assert 0 <= d and d < 2
-	assert 0 <= i and i < 256
-        
-	instruction = 0x400
-	instruction |= (d << 8)
-	instruction |= (i << 0)
-	instructions.append((instruction, 16))
-    
+	current().addis(d, i)
+
 def cmpis(d, i):
-	assert 0 <= d and d < 2
-	assert 0 <= i and i < 256
-        
-	instruction = 0x600
-	instruction |= (d << 8)
-	instruction |= (i << 0)
-	instructions.append((instruction, 16))
-    
+	current().cmpis(d, i)
+
 def lris(r, i):
-	assert 0 <= r and r < 8
-	assert 0 <= i and i < 256
-        
-	instruction = 0x800
-	instruction |= (r << 8)
-	instruction |= (i << 0)
-	instructions.append((instruction, 16))
-    
-def loopi(i, a):
-	assert 0 <= i and i < 256
-	assert 0 <= a and a < 65536
-        
-	instruction = 0x10000000
-	instruction |= (i << 16)
-	instruction |= (a << 0)
-	instructions.append((instruction, 32))
-    
+	current().lris(r, i)
+
+def loopi(i):
+	current().loopi(i)
+
 def bloopi(i, a):
-	assert 0 <= i and i < 256
-	assert 0 <= a and a < 65536
-        
-	instruction = 0x11000000
-	instruction |= (i << 16)
-	instruction |= (a << 0)
-	instructions.append((instruction, 32))
-    
+	current().bloopi(i, a)
+
 def sbclr(i):
-	assert 0 <= i and i < 8
-        
-	instruction = 0x1200
-	instruction |= (i << 0)
-	instructions.append((instruction, 16))
-    
+	current().sbclr(i)
+
 def sbset(i):
-	assert 0 <= i and i < 8
-        
-	instruction = 0x1300
-	instruction |= (i << 0)
-	instructions.append((instruction, 16))
-    
+	current().sbset(i)
+
 def lsl(r, s):
-	assert 0 <= r and r < 2
-	assert 0 <= s and s < 64
-        
-	instruction = 0x1400
-	instruction |= (r << 8)
-	instruction |= (s << 0)
-	instructions.append((instruction, 16))
-    
+	current().lsl(r, s)
+
 def lsr(r, s):
-	assert 0 <= r and r < 2
-	assert 0 <= s and s < 64
-        
-	instruction = 0x1440
-	instruction |= (r << 8)
-	instruction |= (s << 0)
-	instructions.append((instruction, 16))
-    
+	current().lsr(r, s)
+
 def asl(r, s):
-	assert 0 <= r and r < 2
-	assert 0 <= s and s < 64
-        
-	instruction = 0x1480
-	instruction |= (r << 8)
-	instruction |= (s << 0)
-	instructions.append((instruction, 16))
-    
+	current().asl(r, s)
+
 def asr(r, s):
-	assert 0 <= r and r < 2
-	assert 0 <= s and s < 64
-        
-	instruction = 0x14c0
-	instruction |= (r << 8)
-	instruction |= (s << 0)
-	instructions.append((instruction, 16))
-    
+	current().asr(r, s)
+
 def si(i, m):
-	assert 0 <= i and i < 256
-	assert 0 <= m and m < 65536
-        
-	instruction = 0x16000000
-	instruction |= (i << 16)
-	instruction |= (m << 0)
-	instructions.append((instruction, 32))
-    
+	current().si(i, m)
+
 def callrcc(r, c):
-	assert 0 <= r and r < 8
-	assert 0 <= c and c < 16
-        
-	instruction = 0x1710
-	instruction |= (r << 5)
-	instruction |= (c << 0)
-	instructions.append((instruction, 16))
-    
+	current().callrcc(r, c)
+
 def jmpr_cc(r, c):
-	assert 0 <= r and r < 8
-	assert 0 <= c and c < 16
-        
-	instruction = 0x1700
-	instruction |= (r << 5)
-	instruction |= (c << 0)
-	instructions.append((instruction, 16))
-    
+	current().jmpr_cc(r, c)
+
 def lrr(a, r):
-	assert 0 <= a and a < 4
-	assert 0 <= r and r < 32
-        
-	instruction = 0x1800
-	instruction |= (a << 5)
-	instruction |= (r << 0)
-	instructions.append((instruction, 16))
-    
+	current().lrr(a, r)
+
 def lrrd(a, r):
-	assert 0 <= a and a < 4
-	assert 0 <= r and r < 32
-        
-	instruction = 0x1880
-	instruction |= (a << 5)
-	instruction |= (r << 0)
-	instructions.append((instruction, 16))
-    
+	current().lrrd(a, r)
+
 def lrri(a, r):
-	assert 0 <= a and a < 4
-	assert 0 <= r and r < 32
-        
-	instruction = 0x1900
-	instruction |= (a << 5)
-	instruction |= (r << 0)
-	instructions.append((instruction, 16))
-    
+	current().lrri(a, r)
+
 def lrrn(a, r):
-	assert 0 <= a and a < 4
-	assert 0 <= r and r < 32
-        
-	instruction = 0x1980
-	instruction |= (a << 5)
-	instruction |= (r << 0)
-	instructions.append((instruction, 16))
-    
+	current().lrrn(a, r)
+
 def srr(a, r):
-	assert 0 <= a and a < 4
-	assert 0 <= r and r < 32
-        
-	instruction = 0x1a00
-	instruction |= (a << 5)
-	instruction |= (r << 0)
-	instructions.append((instruction, 16))
-    
+	current().srr(a, r)
+
 def srrd(a, r):
-	assert 0 <= a and a < 4
-	assert 0 <= r and r < 32
-        
-	instruction = 0x1a80
-	instruction |= (a << 5)
-	instruction |= (r << 0)
-	instructions.append((instruction, 16))
-    
+	current().srrd(a, r)
+
 def srri(a, r):
-	assert 0 <= a and a < 4
-	assert 0 <= r and r < 32
-        
-	instruction = 0x1b00
-	instruction |= (a << 5)
-	instruction |= (r << 0)
-	instructions.append((instruction, 16))
-    
+	current().srri(a, r)
+
 def srrn(a, r):
-	assert 0 <= a and a < 4
-	assert 0 <= r and r < 32
-        
-	instruction = 0x1b80
-	instruction |= (a << 5)
-	instruction |= (r << 0)
-	instructions.append((instruction, 16))
-    
+	current().srrn(a, r)
+
 def mrr(d, s):
-	assert 0 <= d and d < 32
-	assert 0 <= s and s < 32
-        
-	instruction = 0x1c00
-	instruction |= (d << 5)
-	instruction |= (s << 0)
-	instructions.append((instruction, 16))
-    
+	current().mrr(d, s)
+
 def lrs(r, m):
-	assert 0 <= r and r < 8
-	assert 0 <= m and m < 256
-        
-	instruction = 0x2000
-	instruction |= (r << 8)
-	instruction |= (m << 0)
-	instructions.append((instruction, 16))
-    
+	current().lrs(r, m)
+
 def srs(r, m):
-	assert 0 <= r and r < 4
-	assert 0 <= m and m < 256
-        
-	instruction = 0x2c00
-	instruction |= (r << 8)
-	instruction |= (m << 0)
-	instructions.append((instruction, 16))
-    
+	current().srs(r, m)
+
 def srsh(s, m):
-	assert 0 <= s and s < 2
-	assert 0 <= m and m < 256
-        
-	instruction = 0x2800
-	instruction |= (s << 8)
-	instruction |= (m << 0)
-	instructions.append((instruction, 16))
-    
+	current().srsh(s, m)
+
 def xorc(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3080
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().xorc(d, x)
+
 def xorr(s, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3000
-	instruction |= (s << 9)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().xorr(s, r, x)
+
 def andr(s, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3400
-	instruction |= (s << 9)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().andr(s, r, x)
+
 def orr(s, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3800
-	instruction |= (s << 9)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().orr(s, r, x)
+
 def andc(r, x):
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3c00
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().andc(r, x)
+
 def orc(r, x):
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3e00
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().orc(r, x)
+
 def addr(s, d, x):
-	assert 0 <= s and s < 4
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x4000
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().addr(s, d, x)
+
 def addax(s, d, x):
-	assert 0 <= s and s < 2
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x4800
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().addax(s, d, x)
+
 def add(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x4c00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().add(d, x)
+
 def addp(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x4e00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().addp(d, x)
+
 def subr(s, d, x):
-	assert 0 <= s and s < 4
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x5000
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().subr(s, d, x)
+
 def subax(s, d, x):
-	assert 0 <= s and s < 2
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x5800
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().subax(s, d, x)
+
 def subarn(d):
-	assert 0 <= d and d < 4
-        
-	instruction = 0xc
-	instruction |= (d << 0)
-	instructions.append((instruction, 16))
-    
+	current().subarn(d)
+
 def sub(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x5c00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().sub(d, x)
+
 def subp(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x5e00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().subp(d, x)
+
 def movr(s, d, x):
-	assert 0 <= s and s < 4
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x6000
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().movr(s, d, x)
+
 def movax(s, d, x):
-	assert 0 <= s and s < 2
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x6800
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().movax(s, d, x)
+
 def mov(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x6c00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mov(d, x)
+
 def movp(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x6e00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().movp(d, x)
+
 def addaxl(s, d, x):
-	assert 0 <= s and s < 2
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x7000
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().addaxl(s, d, x)
+
 def incm(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x7400
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().incm(d, x)
+
 def inc(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x7600
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().inc(d, x)
+
 def decm(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x7800
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().decm(d, x)
+
 def dec(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x7a00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().dec(d, x)
+
 def neg(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x7c00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().neg(d, x)
+
 def _not(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 128
-        
-	instruction = 0x3280
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current()._not(d, x)
+
 def movnp(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x7e00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().movnp(d, x)
+
 def nx(y, x):
-	assert 0 <= y and y < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8000
-	instruction |= (y << 11)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().nx(y, x)
+
 def clr(r, x):
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8100
-	instruction |= (r << 11)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().clr(r, x)
+
 def cmp(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8200
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().cmp(x)
+
 def mulaxh(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8300
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulaxh(x)
+
 def clrp(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8400
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().clrp(x)
+
 def tstprod(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8500
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().tstprod(x)
+
 def tstaxh(r, x):
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8600
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().tstaxh(r, x)
+
 def m2(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8a00
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().m2(x)
+
 def m0(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8b00
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().m0(x)
+
 def clr15(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8c00
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().clr15(x)
+
 def set15(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8d00
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().set15(x)
+
 def set16(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8e00
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().set16(x)
+
 def set40(x):
-	assert 0 <= x and x < 256
-        
-	instruction = 0x8f00
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().set40(x)
+
 def mul(s, x):
-	assert 0 <= s and s < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x9000
-	instruction |= (s << 11)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mul(s, x)
+
 def asr16(r, x):
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x9100
-	instruction |= (r << 11)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().asr16(r, x)
+
 def mulmvz(s, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x9200
-	instruction |= (s << 11)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulmvz(s, r, x)
+
 def mulac(s, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x9400
-	instruction |= (s << 11)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulac(s, r, x)
+
 def mulmv(s, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0x9600
-	instruction |= (s << 11)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulmv(s, r, x)
+
 def mulx(s, t, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xa000
-	instruction |= (s << 12)
-	instruction |= (t << 11)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulx(s, t, x)
+
 def abs(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xa100
-	instruction |= (d << 11)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().abs(d, x)
+
 def tst(r, x):
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xb100
-	instruction |= (r << 11)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().tst(r, x)
+
 def mulxmvz(s, t, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xa200
-	instruction |= (s << 12)
-	instruction |= (t << 11)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulxmvz(s, t, r, x)
+
 def mulxac(s, t, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xa400
-	instruction |= (s << 12)
-	instruction |= (t << 11)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulxac(s, t, r, x)
+
 def mulxmv(s, t, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xa600
-	instruction |= (s << 12)
-	instruction |= (t << 11)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulxmv(s, t, r, x)
+
 def mulc(s, t, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xc000
-	instruction |= (s << 12)
-	instruction |= (t << 11)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulc(s, t, x)
+
 def cmpaxh(r, s, x):
-	assert 0 <= r and r < 2
-	assert 0 <= s and s < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xc100
-	instruction |= (r << 12)
-	instruction |= (s << 11)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().cmpaxh(r, s, x)
+
 def mulcmvz(s, t, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xc200
-	instruction |= (s << 12)
-	instruction |= (t << 11)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulcmvz(s, t, r, x)
+
 def mulcac(s, t, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xc400
-	instruction |= (s << 12)
-	instruction |= (t << 11)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulcac(s, t, r, x)
+
 def mulcmv(s, t, r, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xc600
-	instruction |= (s << 12)
-	instruction |= (t << 11)
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().mulcmv(s, t, r, x)
+
 def maddx(s, t, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xe000
-	instruction |= (s << 9)
-	instruction |= (t << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().maddx(s, t, x)
+
 def msubx(s, t, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xe400
-	instruction |= (s << 9)
-	instruction |= (t << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().msubx(s, t, x)
+
 def maddc(s, t, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xe800
-	instruction |= (s << 9)
-	instruction |= (t << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().maddc(s, t, x)
+
 def msubc(s, t, x):
-	assert 0 <= s and s < 2
-	assert 0 <= t and t < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xec00
-	instruction |= (s << 9)
-	instruction |= (t << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().msubc(s, t, x)
+
 def lsl16(r, x):
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xf000
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().lsl16(r, x)
+
 def madd(s, x):
-	assert 0 <= s and s < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xf200
-	instruction |= (s << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().madd(s, x)
+
 def lsr16(r, x):
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xf400
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().lsr16(r, x)
+
 def msub(s, x):
-	assert 0 <= s and s < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xf600
-	instruction |= (s << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().msub(s, x)
+
 def addpaxz(s, d, x):
-	assert 0 <= s and s < 2
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xf800
-	instruction |= (s << 9)
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().addpaxz(s, d, x)
+
 def clrl(r, x):
-	assert 0 <= r and r < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xfc00
-	instruction |= (r << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().clrl(r, x)
+
 def movpz(d, x):
-	assert 0 <= d and d < 2
-	assert 0 <= x and x < 256
-        
-	instruction = 0xfe00
-	instruction |= (d << 8)
-	instruction |= (x << 0)
-	instructions.append((instruction, 16))
-    
+	current().movpz(d, x)
+
 def ext_nop(x):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= x and x < 4
-	
-	extension = 0x0
-	extension |= (x << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_nop(x)
+
 def ext_dr(r):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= r and r < 4
-	
-	extension = 0x4
-	extension |= (r << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_dr(r)
+
 def ext_ir(r):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= r and r < 4
-	
-	extension = 0x8
-	extension |= (r << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ir(r)
+
 def ext_nr(r):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= r and r < 4
-	
-	extension = 0xc
-	extension |= (r << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_nr(r)
+
 def ext_mv(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 4
-	assert 0 <= s and s < 4
-	
-	extension = 0x10
-	extension |= (d << 2)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_mv(d, s)
+
 def ext_s(s, d):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= s and s < 4
-	assert 0 <= d and d < 4
-	
-	extension = 0x20
-	extension |= (s << 3)
-	extension |= (d << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_s(s, d)
+
 def ext_sn(s, d):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= s and s < 4
-	assert 0 <= d and d < 4
-	
-	extension = 0x24
-	extension |= (s << 3)
-	extension |= (d << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_sn(s, d)
+
 def ext_l(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 8
-	assert 0 <= s and s < 4
-	
-	extension = 0x40
-	extension |= (d << 3)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_l(d, s)
+
 def ext_ln(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 8
-	assert 0 <= s and s < 4
-	
-	extension = 0x44
-	extension |= (d << 3)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ln(d, s)
+
 def ext_ls(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 4
-	assert 0 <= s and s < 2
-	
-	extension = 0x80
-	extension |= (d << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ls(d, s)
+
 def ext_sl(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 4
-	assert 0 <= s and s < 2
-	
-	extension = 0x82
-	extension |= (d << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_sl(d, s)
+
 def ext_lsn(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 4
-	assert 0 <= s and s < 2
-	
-	extension = 0x84
-	extension |= (d << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_lsn(d, s)
+
 def ext_sln(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 4
-	assert 0 <= s and s < 2
-	
-	extension = 0x86
-	extension |= (d << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_sln(d, s)
+
 def ext_lsm(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 4
-	assert 0 <= s and s < 2
-	
-	extension = 0x88
-	extension |= (d << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_lsm(d, s)
+
 def ext_slm(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 4
-	assert 0 <= s and s < 2
-	
-	extension = 0x8a
-	extension |= (d << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_slm(d, s)
+
 def ext_lsnm(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 4
-	assert 0 <= s and s < 2
-	
-	extension = 0x8c
-	extension |= (d << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_lsnm(d, s)
+
 def ext_slnm(d, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 4
-	assert 0 <= s and s < 2
-	
-	extension = 0x8e
-	extension |= (d << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_slnm(d, s)
+
 def ext_ld(d, r, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 2
-	assert 0 <= r and r < 2
-	assert 0 <= s and s < 4
-	
-	extension = 0xc0
-	extension |= (d << 5)
-	extension |= (r << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ld(d, r, s)
+
 def ext_ldax(s, r):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	
-	extension = 0xc3
-	extension |= (s << 5)
-	extension |= (r << 4)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ldax(s, r)
+
 def ext_ldn(d, r, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 2
-	assert 0 <= r and r < 2
-	assert 0 <= s and s < 4
-	
-	extension = 0xc4
-	extension |= (d << 5)
-	extension |= (r << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ldn(d, r, s)
+
 def ext_ldaxn(s, r):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	
-	extension = 0xc7
-	extension |= (s << 5)
-	extension |= (r << 4)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ldaxn(s, r)
+
 def ext_ldm(d, r, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 2
-	assert 0 <= r and r < 2
-	assert 0 <= s and s < 4
-	
-	extension = 0xc8
-	extension |= (d << 5)
-	extension |= (r << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ldm(d, r, s)
+
 def ext_ldaxm(s, r):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	
-	extension = 0xcb
-	extension |= (s << 5)
-	extension |= (r << 4)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ldaxm(s, r)
+
 def ext_ldnm(d, r, s):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= d and d < 2
-	assert 0 <= r and r < 2
-	assert 0 <= s and s < 4
-	
-	extension = 0xcc
-	extension |= (d << 5)
-	extension |= (r << 4)
-	extension |= (s << 0)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
-    
+	current().ext_ldnm(d, r, s)
+
 def ext_ldaxnm(s, r):
-	# Validate that last instruction can have extension
-	if not instructions:
-		raise ValueError("No main instruction to extend")
-	
-	last_instruction, size = instructions[-1]
-	if (last_instruction >> 12) < 4:
-		raise ValueError("Last instruction cannot have extension (first nybble < 4)")
-	
-	if (last_instruction & 0xFF) != 0:
-		raise ValueError("Last instruction already has an extension")
-	
-	assert 0 <= s and s < 2
-	assert 0 <= r and r < 2
-	
-	extension = 0xcf
-	extension |= (s << 5)
-	extension |= (r << 4)
-	
-	# Modify last instruction by ORing in the extension
-	instructions[-1] = (last_instruction | extension, size)
+	current().ext_ldaxnm(s, r)
 
+def label(name):
+	current().label(name)
 
 def get_label():
-    return sum(i[1] for i in instructions) // 16
+	return current().get_label()
 
 def assemble():
-    byte_list = []
-    length = 0
-
-    for instruction in instructions:
-        length += instruction[1] // 8
-        for byte in range(instruction[1] // 8):
-            byte_list.append((instruction[0] >> ((instruction[1] // 8 - byte - 1) * 8)) & 0xff)
-
-    return (byte_list, length)
+	return current().assemble()
 
 def get_num_bytes():
-    return sum(i[1] // 8 for i in instructions)
+	return current().get_num_bytes()
 
 def get_num_instructions():
-    return len(instructions)
-            
+	return current().get_num_instructions()
+
 def reset():
-    global instructions
-    instructions = []
+	current().reset()
@@ -0,0 +1,945 @@
+
+# This file is automatically generated by generate_disassembler.py.
+# Do not edit it manually.
+
+import sys
+import numpy as np
+
+# turns DSP code back into calls to the functions in assembler.py, with their operand order, so a listing
+# can go straight back into a test generator. decode() works on a whole dump at once, only formatting
+# goes instruction by instruction.
+
+# per opcode: the assembler's name, the size in words, and the (shift, mask) of every operand of the
+# instruction's value. the last opcode is for words that aren't any instruction
+INSTRUCTIONS = (
+    ('nop', 1, ()),
+    ('dar', 1, ((0, 0x3),)),
+    ('iar', 1, ((0, 0x3),)),
+    ('addarn', 1, ((2, 0x3), (0, 0x3))),
+    ('halt', 1, ()),
+    ('loop', 1, ((0, 0x1f),)),
+    ('bloop', 2, ((16, 0x1f), (0, 0xffff))),
+    ('lri', 2, ((16, 0x1f), (0, 0xffff))),
+    ('lr', 2, ((16, 0x1f), (0, 0xffff))),
+    ('sr', 2, ((16, 0x1f), (0, 0xffff))),
+    ('if_cc', 1, ((0, 0xf),)),
+    ('jmp_cc', 2, ((16, 0xf), (0, 0xffff))),
+    ('call_cc', 2, ((16, 0xf), (0, 0xffff))),
+    ('ret_cc', 1, ((0, 0xf),)),
+    ('rti_cc', 1, ((0, 0xf),)),
+    ('asrn', 1, ()),
+    ('lsrn', 1, ()),
+    ('asrnr', 1, ((8, 0x1), (0, 0x0))),
+    ('asrnrx', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('lsrnr', 1, ((8, 0x1), (0, 0x0))),
+    ('lsrnrx', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('addi', 2, ((24, 0x1), (0, 0xffff))),
+    ('xori', 2, ((24, 0x1), (0, 0xffff))),
+    ('andi', 2, ((24, 0x1), (0, 0xffff))),
+    ('ori', 2, ((24, 0x1), (0, 0xffff))),
+    ('cmpi', 2, ((24, 0x1), (0, 0xffff))),
+    ('andcf', 2, ((24, 0x1), (0, 0xffff))),
+    ('andf', 2, ((24, 0x1), (0, 0xffff))),
+    ('ilrr', 1, ((8, 0x1), (0, 0x3))),
+    ('ilrrd', 1, ((8, 0x1), (0, 0x3))),
+    ('ilrri', 1, ((8, 0x1), (0, 0x3))),
+    ('ilrrn', 1, ((8, 0x1), (0, 0x3))),
+    ('addis', 1, ((8, 0x1), (0, 0xff))),
+    ('cmpis', 1, ((8, 0x1), (0, 0xff))),
+    ('lris', 1, ((8, 0x7), (0, 0xff))),
+    ('loopi', 1, ((0, 0xff),)),
+    ('bloopi', 2, ((16, 0xff), (0, 0xffff))),
+    ('sbclr', 1, ((0, 0x7),)),
+    ('sbset', 1, ((0, 0x7),)),
+    ('lsl', 1, ((8, 0x1), (0, 0x3f))),
+    ('lsr', 1, ((8, 0x1), (0, 0x3f))),
+    ('asl', 1, ((8, 0x1), (0, 0x3f))),
+    ('asr', 1, ((8, 0x1), (0, 0x3f))),
+    ('si', 2, ((16, 0xff), (0, 0xffff))),
+    ('callrcc', 1, ((5, 0x7), (0, 0xf))),
+    ('jmpr_cc', 1, ((5, 0x7), (0, 0xf))),
+    ('lrr', 1, ((5, 0x3), (0, 0x1f))),
+    ('lrrd', 1, ((5, 0x3), (0, 0x1f))),
+    ('lrri', 1, ((5, 0x3), (0, 0x1f))),
+    ('lrrn', 1, ((5, 0x3), (0, 0x1f))),
+    ('srr', 1, ((5, 0x3), (0, 0x1f))),
+    ('srrd', 1, ((5, 0x3), (0, 0x1f))),
+    ('srri', 1, ((5, 0x3), (0, 0x1f))),
+    ('srrn', 1, ((5, 0x3), (0, 0x1f))),
+    ('mrr', 1, ((5, 0x1f), (0, 0x1f))),
+    ('lrs', 1, ((8, 0x7), (0, 0xff))),
+    ('srs', 1, ((8, 0x3), (0, 0xff))),
+    ('srsh', 1, ((8, 0x1), (0, 0xff))),
+    ('xorc', 1, ((8, 0x1), (0, 0x0))),
+    ('xorr', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('andr', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('orr', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('andc', 1, ((8, 0x1), (0, 0x0))),
+    ('orc', 1, ((8, 0x1), (0, 0x0))),
+    ('addr', 1, ((9, 0x3), (8, 0x1), (0, 0x0))),
+    ('addax', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('add', 1, ((8, 0x1), (0, 0x0))),
+    ('addp', 1, ((8, 0x1), (0, 0x0))),
+    ('subr', 1, ((9, 0x3), (8, 0x1), (0, 0x0))),
+    ('subax', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('subarn', 1, ((0, 0x3),)),
+    ('sub', 1, ((8, 0x1), (0, 0x0))),
+    ('subp', 1, ((8, 0x1), (0, 0x0))),
+    ('movr', 1, ((9, 0x3), (8, 0x1), (0, 0x0))),
+    ('movax', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('mov', 1, ((8, 0x1), (0, 0x0))),
+    ('movp', 1, ((8, 0x1), (0, 0x0))),
+    ('addaxl', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('incm', 1, ((8, 0x1), (0, 0x0))),
+    ('inc', 1, ((8, 0x1), (0, 0x0))),
+    ('decm', 1, ((8, 0x1), (0, 0x0))),
+    ('dec', 1, ((8, 0x1), (0, 0x0))),
+    ('neg', 1, ((8, 0x1), (0, 0x0))),
+    ('_not', 1, ((8, 0x1), (0, 0x0))),
+    ('movnp', 1, ((8, 0x1), (0, 0x0))),
+    ('nx', 1, ((11, 0x1), (0, 0x0))),
+    ('clr', 1, ((11, 0x1), (0, 0x0))),
+    ('cmp', 1, ((0, 0x0),)),
+    ('mulaxh', 1, ((0, 0x0),)),
+    ('clrp', 1, ((0, 0x0),)),
+    ('tstprod', 1, ((0, 0x0),)),
+    ('tstaxh', 1, ((8, 0x1), (0, 0x0))),
+    ('m2', 1, ((0, 0x0),)),
+    ('m0', 1, ((0, 0x0),)),
+    ('clr15', 1, ((0, 0x0),)),
+    ('set15', 1, ((0, 0x0),)),
+    ('set16', 1, ((0, 0x0),)),
+    ('set40', 1, ((0, 0x0),)),
+    ('mul', 1, ((11, 0x1), (0, 0x0))),
+    ('asr16', 1, ((11, 0x1), (0, 0x0))),
+    ('mulmvz', 1, ((11, 0x1), (8, 0x1), (0, 0x0))),
+    ('mulac', 1, ((11, 0x1), (8, 0x1), (0, 0x0))),
+    ('mulmv', 1, ((11, 0x1), (8, 0x1), (0, 0x0))),
+    ('mulx', 1, ((12, 0x1), (11, 0x1), (0, 0x0))),
+    ('abs', 1, ((11, 0x1), (0, 0x0))),
+    ('tst', 1, ((11, 0x1), (0, 0x0))),
+    ('mulxmvz', 1, ((12, 0x1), (11, 0x1), (8, 0x1), (0, 0x0))),
+    ('mulxac', 1, ((12, 0x1), (11, 0x1), (8, 0x1), (0, 0x0))),
+    ('mulxmv', 1, ((12, 0x1), (11, 0x1), (8, 0x1), (0, 0x0))),
+    ('mulc', 1, ((12, 0x1), (11, 0x1), (0, 0x0))),
+    ('cmpaxh', 1, ((12, 0x1), (11, 0x1), (0, 0x0))),
+    ('mulcmvz', 1, ((12, 0x1), (11, 0x1), (8, 0x1), (0, 0x0))),
+    ('mulcac', 1, ((12, 0x1), (11, 0x1), (8, 0x1), (0, 0x0))),
+    ('mulcmv', 1, ((12, 0x1), (11, 0x1), (8, 0x1), (0, 0x0))),
+    ('maddx', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('msubx', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('maddc', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('msubc', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('lsl16', 1, ((8, 0x1), (0, 0x0))),
+    ('madd', 1, ((8, 0x1), (0, 0x0))),
+    ('lsr16', 1, ((8, 0x1), (0, 0x0))),
+    ('msub', 1, ((8, 0x1), (0, 0x0))),
+    ('addpaxz', 1, ((9, 0x1), (8, 0x1), (0, 0x0))),
+    ('clrl', 1, ((8, 0x1), (0, 0x0))),
+    ('movpz', 1, ((8, 0x1), (0, 0x0))),
+    ('unknown', 1, ((0, 0xffff),)),
+)
+
+MNEMONICS = tuple(name for name, size, operands in INSTRUCTIONS)
+SIZES = np.array([size for name, size, operands in INSTRUCTIONS], dtype=np.uint8)
+OPERANDS = tuple(operands for name, size, operands in INSTRUCTIONS)
+UNKNOWN = len(INSTRUCTIONS) - 1
+
+# the spec's letter for every operand, in the same order. i is an immediate, a an address, r a register and so on
+OPERAND_KINDS = (
+    '',
+    'a',
+    'a',
+    'sd',
+    '',
+    'r',
+    'ra',
+    'ri',
+    'rm',
+    'rm',
+    'c',
+    'ca',
+    'ca',
+    'c',
+    'c',
+    '',
+    '',
+    'dx',
+    'sdx',
+    'dx',
+    'sdx',
+    'di',
+    'ri',
+    'ri',
+    'ri',
+    'ri',
+    'ri',
+    'ri',
+    'ra',
+    'ds',
+    'ds',
+    'ds',
+    'di',
+    'di',
+    'ri',
+    'i',
+    'ia',
+    'i',
+    'i',
+    'rs',
+    'rs',
+    'rs',
+    'rs',
+    'im',
+    'rc',
+    'rc',
+    'ar',
+    'ar',
+    'ar',
+    'ar',
+    'ar',
+    'ar',
+    'ar',
+    'ar',
+    'ds',
+    'rm',
+    'rm',
+    'sm',
+    'dx',
+    'srx',
+    'srx',
+    'srx',
+    'rx',
+    'rx',
+    'sdx',
+    'sdx',
+    'dx',
+    'dx',
+    'sdx',
+    'sdx',
+    'd',
+    'dx',
+    'dx',
+    'sdx',
+    'sdx',
+    'dx',
+    'dx',
+    'sdx',
+    'dx',
+    'dx',
+    'dx',
+    'dx',
+    'dx',
+    'dx',
+    'dx',
+    'yx',
+    'rx',
+    'x',
+    'x',
+    'x',
+    'x',
+    'rx',
+    'x',
+    'x',
+    'x',
+    'x',
+    'x',
+    'x',
+    'sx',
+    'rx',
+    'srx',
+    'srx',
+    'srx',
+    'stx',
+    'dx',
+    'rx',
+    'strx',
+    'strx',
+    'strx',
+    'stx',
+    'rsx',
+    'strx',
+    'strx',
+    'strx',
+    'stx',
+    'stx',
+    'stx',
+    'stx',
+    'rx',
+    'sx',
+    'rx',
+    'sx',
+    'sdx',
+    'rx',
+    'dx',
+    'i',
+)
+
+EXTENSION_INSTRUCTIONS = (
+    ('ext_nop', ((0, 0x0),)),
+    ('ext_dr', ((0, 0x3),)),
+    ('ext_ir', ((0, 0x3),)),
+    ('ext_nr', ((0, 0x3),)),
+    ('ext_mv', ((2, 0x3), (0, 0x3))),
+    ('ext_s', ((3, 0x3), (0, 0x3))),
+    ('ext_sn', ((3, 0x3), (0, 0x3))),
+    ('ext_l', ((3, 0x7), (0, 0x3))),
+    ('ext_ln', ((3, 0x7), (0, 0x3))),
+    ('ext_ls', ((4, 0x3), (0, 0x1))),
+    ('ext_sl', ((4, 0x3), (0, 0x1))),
+    ('ext_lsn', ((4, 0x3), (0, 0x1))),
+    ('ext_sln', ((4, 0x3), (0, 0x1))),
+    ('ext_lsm', ((4, 0x3), (0, 0x1))),
+    ('ext_slm', ((4, 0x3), (0, 0x1))),
+    ('ext_lsnm', ((4, 0x3), (0, 0x1))),
+    ('ext_slnm', ((4, 0x3), (0, 0x1))),
+    ('ext_ld', ((5, 0x1), (4, 0x1), (0, 0x3))),
+    ('ext_ldax', ((5, 0x1), (4, 0x1))),
+    ('ext_ldn', ((5, 0x1), (4, 0x1), (0, 0x3))),
+    ('ext_ldaxn', ((5, 0x1), (4, 0x1))),
+    ('ext_ldm', ((5, 0x1), (4, 0x1), (0, 0x3))),
+    ('ext_ldaxm', ((5, 0x1), (4, 0x1))),
+    ('ext_ldnm', ((5, 0x1), (4, 0x1), (0, 0x3))),
+    ('ext_ldaxnm', ((5, 0x1), (4, 0x1))),
+)
+
+EXTENSION_MNEMONICS = tuple(name for name, operands in EXTENSION_INSTRUCTIONS)
+EXTENSION_OPERANDS = tuple(operands for name, operands in EXTENSION_INSTRUCTIONS)
+
+# the extension opcode of every value of the low byte. like decoder.d, a byte no extension matches is a nop
+EXTENSIONS = np.array([
+    0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3,
+    4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4,
+    5, 5, 5, 5, 6, 6, 6, 6, 5, 5, 5, 5, 6, 6, 6, 6,
+    5, 5, 5, 5, 6, 6, 6, 6, 5, 5, 5, 5, 6, 6, 6, 6,
+    7, 7, 7, 7, 8, 8, 8, 8, 7, 7, 7, 7, 8, 8, 8, 8,
+    7, 7, 7, 7, 8, 8, 8, 8, 7, 7, 7, 7, 8, 8, 8, 8,
+    7, 7, 7, 7, 8, 8, 8, 8, 7, 7, 7, 7, 8, 8, 8, 8,
+    7, 7, 7, 7, 8, 8, 8, 8, 7, 7, 7, 7, 8, 8, 8, 8,
+    9, 9, 10, 10, 11, 11, 12, 12, 13, 13, 14, 14, 15, 15, 16, 16,
+    9, 9, 10, 10, 11, 11, 12, 12, 13, 13, 14, 14, 15, 15, 16, 16,
+    9, 9, 10, 10, 11, 11, 12, 12, 13, 13, 14, 14, 15, 15, 16, 16,
+    9, 9, 10, 10, 11, 11, 12, 12, 13, 13, 14, 14, 15, 15, 16, 16,
+    17, 17, 17, 18, 19, 19, 19, 20, 21, 21, 21, 22, 23, 23, 23, 24,
+    17, 17, 17, 18, 19, 19, 19, 20, 21, 21, 21, 22, 23, 23, 23, 24,
+    17, 17, 17, 18, 19, 19, 19, 20, 21, 21, 21, 22, 23, 23, 23, 24,
+    17, 17, 17, 18, 19, 19, 19, 20, 21, 21, 21, 22, 23, 23, 23, 24,
+], dtype=np.int16)
+
+def decode_instruction(instruction):
+    index = 0
+    index |= ((instruction >> 13) & 1) << 0
+    index |= ((instruction >> 14) & 1) << 1
+    index |= ((instruction >> 15) & 1) << 2
+
+    if index == 0: return generated_table_1(instruction)
+    if index == 1: return generated_table_2(instruction)
+    if index == 2: return generated_table_3(instruction)
+    if index == 3: return generated_table_4(instruction)
+    if index == 4: return generated_table_5(instruction)
+    if index == 5: return generated_table_6(instruction)
+    if index == 6: return generated_table_7(instruction)
+    if index == 7: return generated_table_8(instruction)
+    return UNKNOWN
+
+def generated_table_1(instruction):
+    index = 0
+    index |= ((instruction >> 11) & 1) << 0
+    index |= ((instruction >> 12) & 1) << 1
+
+    if index == 0: return generated_table_9(instruction)
+    if index == 1: return 34  # LRIS
+    if index == 2: return generated_table_10(instruction)
+    if index == 3: return generated_table_11(instruction)
+    return UNKNOWN
+
+def generated_table_9(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+    index |= ((instruction >> 10) & 1) << 1
+
+    if index == 0: return generated_table_12(instruction)
+    if index == 1: return generated_table_13(instruction)
+    if index == 2: return 32  # ADDIS
+    if index == 3: return 33  # CMPIS
+    return UNKNOWN
+
+def generated_table_12(instruction):
+    index = 0
+    index |= ((instruction >> 5) & 1) << 0
+    index |= ((instruction >> 6) & 1) << 1
+    index |= ((instruction >> 7) & 1) << 2
+    index |= ((instruction >> 8) & 1) << 3
+
+    if index == 0: return generated_table_14(instruction)
+    if index == 1: return 4  # HALT
+    if index == 2: return 5  # LOOP
+    if index == 3: return 6  # BLOOP
+    if index == 4: return 7  # LRI
+    if index == 6: return 8  # LR
+    if index == 7: return 9  # SR
+    return UNKNOWN
+
+def generated_table_14(instruction):
+    index = 0
+    index |= ((instruction >> 4) & 1) << 0
+
+    if index == 0: return generated_table_15(instruction)
+    if index == 1: return 3  # ADDARN
+    return UNKNOWN
+
+def generated_table_15(instruction):
+    index = 0
+    index |= ((instruction >> 2) & 1) << 0
+    index |= ((instruction >> 3) & 1) << 1
+
+    if index == 0: return 0  # NOP
+    if index == 1: return 1  # DAR
+    if index == 2: return 2  # IAR
+    if index == 3: return 70  # SUBARN
+    return UNKNOWN
+
+def generated_table_13(instruction):
+    index = 0
+    index |= ((instruction >> 4) & 1) << 0
+    index |= ((instruction >> 5) & 1) << 1
+    index |= ((instruction >> 6) & 1) << 2
+    index |= ((instruction >> 7) & 1) << 3
+
+    if index == 0: return 21  # ADDI
+    if index == 1: return generated_table_16(instruction)
+    if index == 2: return 22  # XORI
+    if index == 4: return 23  # ANDI
+    if index == 6: return 24  # ORI
+    if index == 7: return 10  # IF_cc
+    if index == 8: return 25  # CMPI
+    if index == 9: return 11  # JMP_cc
+    if index == 10: return 27  # ANDF
+    if index == 11: return 12  # CALL_cc
+    if index == 12: return generated_table_17(instruction)
+    if index == 13: return 13  # RET_cc
+    if index == 15: return 14  # RTI_cc
+    return UNKNOWN
+
+def generated_table_16(instruction):
+    index = 0
+    index |= ((instruction >> 2) & 1) << 0
+    index |= ((instruction >> 3) & 1) << 1
+
+    if index == 0: return 28  # ILRR
+    if index == 1: return 29  # ILRRD
+    if index == 2: return 30  # ILRRI
+    if index == 3: return 31  # ILRRN
+    return UNKNOWN
+
+def generated_table_17(instruction):
+    index = 0
+    index |= ((instruction >> 0) & 1) << 0
+    index |= ((instruction >> 1) & 1) << 1
+    index |= ((instruction >> 2) & 1) << 2
+    index |= ((instruction >> 3) & 1) << 3
+
+    if index == 0: return 26  # ANDCF
+    if index == 10: return 16  # LSRN
+    if index == 11: return 15  # ASRN
+    return UNKNOWN
+
+def generated_table_10(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+    index |= ((instruction >> 10) & 1) << 1
+
+    if index == 0: return generated_table_18(instruction)
+    if index == 1: return generated_table_19(instruction)
+    if index == 2: return generated_table_20(instruction)
+    if index == 3: return generated_table_21(instruction)
+    return UNKNOWN
+
+def generated_table_18(instruction):
+    index = 0
+    index |= ((instruction >> 8) & 1) << 0
+
+    if index == 0: return 35  # LOOPI
+    if index == 1: return 36  # BLOOPI
+    return UNKNOWN
+
+def generated_table_19(instruction):
+    index = 0
+    index |= ((instruction >> 3) & 1) << 0
+    index |= ((instruction >> 4) & 1) << 1
+    index |= ((instruction >> 5) & 1) << 2
+    index |= ((instruction >> 6) & 1) << 3
+    index |= ((instruction >> 7) & 1) << 4
+    index |= ((instruction >> 8) & 1) << 5
+
+    if index == 0: return 37  # SBCLR
+    if index == 32: return 38  # SBSET
+    return UNKNOWN
+
+def generated_table_20(instruction):
+    index = 0
+    index |= ((instruction >> 6) & 1) << 0
+    index |= ((instruction >> 7) & 1) << 1
+
+    if index == 0: return 39  # LSL
+    if index == 1: return 40  # LSR
+    if index == 2: return 41  # ASL
+    if index == 3: return 42  # ASR
+    return UNKNOWN
+
+def generated_table_21(instruction):
+    index = 0
+    index |= ((instruction >> 8) & 1) << 0
+
+    if index == 0: return 43  # SI
+    if index == 1: return generated_table_22(instruction)
+    return UNKNOWN
+
+def generated_table_22(instruction):
+    index = 0
+    index |= ((instruction >> 4) & 1) << 0
+
+    if index == 0: return 45  # JMPR_cc
+    if index == 1: return 44  # CALLRCC
+    return UNKNOWN
+
+def generated_table_11(instruction):
+    index = 0
+    index |= ((instruction >> 10) & 1) << 0
+
+    if index == 0: return generated_table_23(instruction)
+    if index == 1: return 54  # MRR
+    return UNKNOWN
+
+def generated_table_23(instruction):
+    index = 0
+    index |= ((instruction >> 7) & 1) << 0
+    index |= ((instruction >> 8) & 1) << 1
+    index |= ((instruction >> 9) & 1) << 2
+
+    if index == 0: return 46  # LRR
+    if index == 1: return 47  # LRRD
+    if index == 2: return 48  # LRRI
+    if index == 3: return 49  # LRRN
+    if index == 4: return 50  # SRR
+    if index == 5: return 51  # SRRD
+    if index == 6: return 52  # SRRI
+    if index == 7: return 53  # SRRN
+    return UNKNOWN
+
+def generated_table_2(instruction):
+    index = 0
+    index |= ((instruction >> 11) & 1) << 0
+    index |= ((instruction >> 12) & 1) << 1
+
+    if index == 0: return 55  # LRS
+    if index == 1: return generated_table_24(instruction)
+    if index == 2: return generated_table_25(instruction)
+    if index == 3: return generated_table_26(instruction)
+    return UNKNOWN
+
+def generated_table_24(instruction):
+    index = 0
+    index |= ((instruction >> 10) & 1) << 0
+
+    if index == 0: return 57  # SRSH
+    if index == 1: return 56  # SRS
+    return UNKNOWN
+
+def generated_table_25(instruction):
+    index = 0
+    index |= ((instruction >> 7) & 1) << 0
+    index |= ((instruction >> 10) & 1) << 1
+
+    if index == 0: return 59  # XORR
+    if index == 1: return generated_table_27(instruction)
+    if index == 2: return 60  # ANDR
+    if index == 3: return 20  # LSRNRX
+    return UNKNOWN
+
+def generated_table_27(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 58  # XORC
+    if index == 1: return 83  # NOT
+    return UNKNOWN
+
+def generated_table_26(instruction):
+    index = 0
+    index |= ((instruction >> 7) & 1) << 0
+    index |= ((instruction >> 10) & 1) << 1
+
+    if index == 0: return 61  # ORR
+    if index == 1: return 18  # ASRNRX
+    if index == 2: return generated_table_28(instruction)
+    if index == 3: return generated_table_29(instruction)
+    return UNKNOWN
+
+def generated_table_28(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 62  # ANDC
+    if index == 1: return 63  # ORC
+    return UNKNOWN
+
+def generated_table_29(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 19  # LSRNR
+    if index == 1: return 17  # ASRNR
+    return UNKNOWN
+
+def generated_table_3(instruction):
+    index = 0
+    index |= ((instruction >> 11) & 1) << 0
+    index |= ((instruction >> 12) & 1) << 1
+
+    if index == 0: return 64  # ADDR
+    if index == 1: return generated_table_30(instruction)
+    if index == 2: return 68  # SUBR
+    if index == 3: return generated_table_31(instruction)
+    return UNKNOWN
+
+def generated_table_30(instruction):
+    index = 0
+    index |= ((instruction >> 10) & 1) << 0
+
+    if index == 0: return 65  # ADDAX
+    if index == 1: return generated_table_32(instruction)
+    return UNKNOWN
+
+def generated_table_32(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 66  # ADD
+    if index == 1: return 67  # ADDP
+    return UNKNOWN
+
+def generated_table_31(instruction):
+    index = 0
+    index |= ((instruction >> 10) & 1) << 0
+
+    if index == 0: return 69  # SUBAX
+    if index == 1: return generated_table_33(instruction)
+    return UNKNOWN
+
+def generated_table_33(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 71  # SUB
+    if index == 1: return 72  # SUBP
+    return UNKNOWN
+
+def generated_table_4(instruction):
+    index = 0
+    index |= ((instruction >> 11) & 1) << 0
+    index |= ((instruction >> 12) & 1) << 1
+
+    if index == 0: return 73  # MOVR
+    if index == 1: return generated_table_34(instruction)
+    if index == 2: return generated_table_35(instruction)
+    if index == 3: return generated_table_36(instruction)
+    return UNKNOWN
+
+def generated_table_34(instruction):
+    index = 0
+    index |= ((instruction >> 10) & 1) << 0
+
+    if index == 0: return 74  # MOVAX
+    if index == 1: return generated_table_37(instruction)
+    return UNKNOWN
+
+def generated_table_37(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 75  # MOV
+    if index == 1: return 76  # MOVP
+    return UNKNOWN
+
+def generated_table_35(instruction):
+    index = 0
+    index |= ((instruction >> 10) & 1) << 0
+
+    if index == 0: return 77  # ADDAXL
+    if index == 1: return generated_table_38(instruction)
+    return UNKNOWN
+
+def generated_table_38(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 78  # INCM
+    if index == 1: return 79  # INC
+    return UNKNOWN
+
+def generated_table_36(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+    index |= ((instruction >> 10) & 1) << 1
+
+    if index == 0: return 80  # DECM
+    if index == 1: return 81  # DEC
+    if index == 2: return 82  # NEG
+    if index == 3: return 84  # MOVNP
+    return UNKNOWN
+
+def generated_table_5(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+    index |= ((instruction >> 10) & 1) << 1
+    index |= ((instruction >> 12) & 1) << 2
+
+    if index == 0: return generated_table_39(instruction)
+    if index == 1: return generated_table_40(instruction)
+    if index == 2: return generated_table_41(instruction)
+    if index == 3: return generated_table_42(instruction)
+    if index == 4: return generated_table_43(instruction)
+    if index == 5: return 100  # MULMVZ
+    if index == 6: return 101  # MULAC
+    if index == 7: return 102  # MULMV
+    return UNKNOWN
+
+def generated_table_39(instruction):
+    index = 0
+    index |= ((instruction >> 8) & 1) << 0
+
+    if index == 0: return 85  # NX
+    if index == 1: return 86  # CLR
+    return UNKNOWN
+
+def generated_table_40(instruction):
+    index = 0
+    index |= ((instruction >> 8) & 1) << 0
+    index |= ((instruction >> 11) & 1) << 1
+
+    if index == 0: return 87  # CMP
+    if index == 1: return 88  # MULAXH
+    if index == 2: return 92  # M2
+    if index == 3: return 93  # M0
+    return UNKNOWN
+
+def generated_table_41(instruction):
+    index = 0
+    index |= ((instruction >> 8) & 1) << 0
+    index |= ((instruction >> 11) & 1) << 1
+
+    if index == 0: return 89  # CLRP
+    if index == 1: return 90  # TSTPROD
+    if index == 2: return 94  # CLR15
+    if index == 3: return 95  # SET15
+    return UNKNOWN
+
+def generated_table_42(instruction):
+    index = 0
+    index |= ((instruction >> 11) & 1) << 0
+
+    if index == 0: return 91  # TSTAXH
+    if index == 1: return generated_table_44(instruction)
+    return UNKNOWN
+
+def generated_table_44(instruction):
+    index = 0
+    index |= ((instruction >> 8) & 1) << 0
+
+    if index == 0: return 96  # SET16
+    if index == 1: return 97  # SET40
+    return UNKNOWN
+
+def generated_table_43(instruction):
+    index = 0
+    index |= ((instruction >> 8) & 1) << 0
+
+    if index == 0: return 98  # MUL
+    if index == 1: return 99  # ASR16
+    return UNKNOWN
+
+def generated_table_6(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+    index |= ((instruction >> 10) & 1) << 1
+
+    if index == 0: return generated_table_45(instruction)
+    if index == 1: return 106  # MULXMVZ
+    if index == 2: return 107  # MULXAC
+    if index == 3: return 108  # MULXMV
+    return UNKNOWN
+
+def generated_table_45(instruction):
+    index = 0
+    index |= ((instruction >> 8) & 1) << 0
+
+    if index == 0: return 103  # MULX
+    if index == 1: return generated_table_46(instruction)
+    return UNKNOWN
+
+def generated_table_46(instruction):
+    index = 0
+    index |= ((instruction >> 12) & 1) << 0
+
+    if index == 0: return 104  # ABS
+    if index == 1: return 105  # TST
+    return UNKNOWN
+
+def generated_table_7(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+    index |= ((instruction >> 10) & 1) << 1
+
+    if index == 0: return generated_table_47(instruction)
+    if index == 1: return 111  # MULCMVZ
+    if index == 2: return 112  # MULCAC
+    if index == 3: return 113  # MULCMV
+    return UNKNOWN
+
+def generated_table_47(instruction):
+    index = 0
+    index |= ((instruction >> 8) & 1) << 0
+
+    if index == 0: return 109  # MULC
+    if index == 1: return 110  # CMPAXH
+    return UNKNOWN
+
+def generated_table_8(instruction):
+    index = 0
+    index |= ((instruction >> 10) & 1) << 0
+    index |= ((instruction >> 11) & 1) << 1
+    index |= ((instruction >> 12) & 1) << 2
+
+    if index == 0: return 114  # MADDX
+    if index == 1: return 115  # MSUBX
+    if index == 2: return 116  # MADDC
+    if index == 3: return 117  # MSUBC
+    if index == 4: return generated_table_48(instruction)
+    if index == 5: return generated_table_49(instruction)
+    if index == 6: return 122  # ADDPAXZ
+    if index == 7: return generated_table_50(instruction)
+    return UNKNOWN
+
+def generated_table_48(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 118  # LSL16
+    if index == 1: return 119  # MADD
+    return UNKNOWN
+
+def generated_table_49(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 120  # LSR16
+    if index == 1: return 121  # MSUB
+    return UNKNOWN
+
+def generated_table_50(instruction):
+    index = 0
+    index |= ((instruction >> 9) & 1) << 0
+
+    if index == 0: return 123  # CLRL
+    if index == 1: return 124  # MOVPZ
+    return UNKNOWN
+
+# the opcode of every first word there is
+OPCODES = np.array([decode_instruction(word) for word in range(0x10000)], dtype=np.int16)
+
+# decodes words, big endian u16s that start with an instruction, all at once. returns the address, opcode,
+# extension opcode (-1 if it has none) and value of every instruction, where a two word instruction's
+# value is both words as one u32. a two word instruction cut off at the end gets a second word of 0.
+def decode(words, origin=0):
+    words = np.asarray(words, dtype=np.uint16)
+    opcodes = OPCODES[words]
+    is_long = SIZES[opcodes] == 2
+
+    # a word starts an instruction unless it's the second word of a two word one. in a run of words that
+    # would each start a two word instruction, that's every other word from the first one in the run
+    position = np.arange(len(words))
+    run_start = np.ones(len(words), dtype=bool)
+    run_start[1:] = ~is_long[:-1]
+    run_start = np.maximum.accumulate(np.where(run_start, position, 0))
+    starts = np.flatnonzero((position - run_start) % 2 == 0)
+
+    first = words[starts].astype(np.uint32)
+    second = np.append(words, np.uint16(0))[starts + 1].astype(np.uint32)
+    values = np.where(is_long[starts], (first << 16) | second, first)
+
+    # main instructions starting with 3 have a 7 bit extension, the ones above it an 8 bit one
+    nybble = first >> 12
+    extension_bytes = first & np.where(nybble == 3, 0x7f, 0xff)
+    extensions = np.where(nybble >= 3, EXTENSIONS[extension_bytes], -1)
+
+    return starts + origin, opcodes[starts], extensions, values
+
+# printf style, which formats quicker than str.format. the x field of a main instruction always shows up
+# as 0, the extension follows the instruction on its own
+def operand_format(mask):
+    return '0' if mask == 0 else '%#x' if mask > 0xff else '%d'
+
+FORMATS = tuple(f"{name}({', '.join(operand_format(mask) for shift, mask in operands)})" for name, size, operands in INSTRUCTIONS)
+EXTENSION_FORMATS = tuple(f"; {name}({', '.join(operand_format(mask) for shift, mask in operands)})" for name, operands in EXTENSION_INSTRUCTIONS)
+
+def operand_values(value, operands):
+    return [(value >> shift) & mask for shift, mask in operands if mask != 0]
+
+def format_instruction(opcode, extension, value):
+    text = FORMATS[opcode] % tuple(operand_values(value, OPERANDS[opcode]))
+    if extension >= 0:
+        first = value >> (16 * (int(SIZES[opcode]) - 1))
+        text += EXTENSION_FORMATS[extension] % tuple(operand_values(first & 0xff, EXTENSION_OPERANDS[extension]))
+    return text
+
+# formats every instruction with the same opcode in one go, with the operands pulled out of values by numpy
+def format_column(format, operands, values):
+    columns = [column.tolist() for column in operand_values(values, operands)]
+    return list(map(format.__mod__, zip(*columns))) if len(columns) != 0 else format
+
+# returns a line of text for every instruction in words. the value of an instruction is all there is to its
+# text, and dumps use the same few instructions over and over, so each distinct value is only formatted once
+def disassemble(words, origin=0):
+    addresses, opcodes, extensions, values = decode(words, origin)
+    values, first_index, inverse = np.unique(values, return_index=True, return_inverse=True)
+    opcodes = opcodes[first_index]
+    extensions = extensions[first_index]
+
+    texts = np.empty(len(values), dtype=object)
+    for opcode in np.unique(opcodes).tolist():
+        selected = np.flatnonzero(opcodes == opcode)
+        texts[selected] = format_column(FORMATS[opcode], OPERANDS[opcode], values[selected])
+
+    suffixes = np.full(len(values), '', dtype=object)
+    first = values >> (16 * (SIZES[opcodes].astype(np.uint32) - 1))
+    for extension in np.unique(extensions[extensions >= 0]).tolist():
+        selected = np.flatnonzero(extensions == extension)
+        suffixes[selected] = format_column(EXTENSION_FORMATS[extension], EXTENSION_OPERANDS[extension], first[selected] & 0xff)
+
+    return (address_prefixes(addresses) + (texts + suffixes)[inverse]).tolist()
+
+# the DSP's addresses are 16 bits, so the text for all of them is made once and looked up from then on
+ADDRESS_PREFIXES = None
+
+def address_prefixes(addresses):
+    global ADDRESS_PREFIXES
+    if len(addresses) != 0 and addresses[-1] > 0xffff:
+        prefixes = np.empty(len(addresses), dtype=object)
+        prefixes[:] = list(map('%04x: '.__mod__, addresses.tolist()))
+        return prefixes
+
+    if ADDRESS_PREFIXES is None:
+        ADDRESS_PREFIXES = np.empty(0x10000, dtype=object)
+        ADDRESS_PREFIXES[:] = list(map('%04x: '.__mod__, range(0x10000)))
+
+    return ADDRESS_PREFIXES[addresses]
+
+if __name__ == "__main__":
+    # usage: disassembler.py <dump> [origin]
+    # the dump is raw big endian words, like an IRAM image
+    with open(sys.argv[1], 'rb') as dump:
+        words = np.frombuffer(dump.read(), dtype='>u2')
+
+    origin = int(sys.argv[2], 0) if len(sys.argv) > 2 else 0
+    print('\n'.join(disassemble(words, origin)))
@@ -12,13 +12,82 @@ def generate_operand_insertion(operand):
 def generate_extension_operand_insertion(operand):
     return f'extension |= ({operand.char.lower()} << {operand.low_index})'
 
+# the address fields that may be given as a label, and are filled in by assemble(). lri's immediate
+# counts too, so an address can be loaded into a register for jmpr and callr
+LABELED_ADDRESSES = { 'bloop': 'a', 'bloopi': 'a', 'jmp_cc': 'a', 'call_cc': 'a', 'lri': 'i' }
+
+def generate_label_fixup(operand):
+    size = operand.high_index - operand.low_index + 1
+    name = operand.char.lower()
+    return f'''if isinstance({name}, (str, tuple)):
+\t\t\tself.add_fixup({name}, {operand.low_index}, {size})
+\t\t\t{name} = 0'''
+
+def generate_parameters(operands):
+    return ', '.join(['self'] + [op.char.lower() for op in reversed(operands)])
+
+def generate_arguments(operands):
+    return ', '.join([op.char.lower() for op in reversed(operands)])
+
 with open('assembler.py', 'w+') as f:
     f.write('''
 # This file is automatically generated by generate_assembler.py. 
 # Do not edit it manually.
-            
-instructions = []
+
+import contextlib
+import threading
+
+# every Assembler is its own program, so any number of them can be built at once. instructions are
+# encoded straight into code as big endian words, labels and sizes come from its length, so they're
+# O(1) no matter how big the program gets.
+#
+# origin is the word address code will be loaded at. the address of bloop, bloopi, jmp_cc and call_cc, and
+# the immediate of lri, can be a label name, or ref(name, offset), and is filled in by assemble() once every
+# label is known.
+class Assembler:
+\tdef __init__(self, origin=0):
+\t\tself.origin = origin
+\t\tself.code = bytearray()
+\t\tself.num_instructions = 0
+\t\tself.last_instruction_offset = 0
+\t\tself.labels = {}
+\t\tself.fixups = []
+
+\tdef emit(self, instruction, num_bytes):
+\t\tself.last_instruction_offset = len(self.code)
+\t\tself.num_instructions += 1
+\t\tself.code.extend(instruction.to_bytes(num_bytes, 'big'))
+
+\tdef label(self, name):
+\t\tif name in self.labels:
+\t\t\traise ValueError(f"Label {name} is already defined")
+
+\t\tself.labels[name] = self.get_label()
+
+\t# the instruction that's about to be emitted has target in the given field
+\tdef add_fixup(self, target, shift, size):
+\t\tname, offset = (target, 0) if isinstance(target, str) else target
+\t\tself.fixups.append((len(self.code), shift, size, name, offset))
+
+\tdef resolve_fixups(self):
+\t\tfor instruction_offset, shift, size, name, offset in self.fixups:
+\t\t\tif name not in self.labels:
+\t\t\t\traise ValueError(f"Label {name} is never defined")
+
+\t\t\taddress = self.labels[name] + offset
+\t\t\tif not 0 <= address < (1 << size):
+\t\t\t\traise ValueError(f"Label {name} is out of range: {address}")
+
+\t\t\tinstruction_size = 4
+\t\t\tinstruction = int.from_bytes(self.code[instruction_offset:instruction_offset + instruction_size], 'big')
+\t\t\tinstruction &= ~(((1 << size) - 1) << shift)
+\t\t\tinstruction |= address << shift
+\t\t\tself.code[instruction_offset:instruction_offset + instruction_size] = instruction.to_bytes(instruction_size, 'big')
+
+\t\tself.fixups = []
 ''')
+
+    names = []
     
     for instruction in instructions:
         opcode = instruction.opcode
@@ -27,13 +96,15 @@ instructions = []
         name = opcode.lower()
         if name == 'not':
             name = '_not'
+        names.append((name, operands))
         f.write(f'''    
-def {name}({', '.join([f'{op.char.lower()}' for op in reversed(operands)])}):
-\t{'\n\t'.join([generate_operand_assertion(op) for op in reversed(operands)])}
+\tdef {name}({generate_parameters(operands)}):
+\t\t{'\n\t\t'.join([generate_label_fixup(op) for op in reversed(operands) if LABELED_ADDRESSES.get(name) == op.char.lower()])}
+\t\t{'\n\t\t'.join([generate_operand_assertion(op) for op in reversed(operands)])}
         
-\tinstruction = {hex(instruction.fixed_repr)}
-\t{'\n\t'.join([generate_operand_insertion(op) for op in reversed(operands)])}
-\tinstructions.append((instruction, {instruction.size}))
+\t\tinstruction = {hex(instruction.fixed_repr)}
+\t\t{'\n\t\t'.join([generate_operand_insertion(op) for op in reversed(operands)])}
+\t\tself.emit(instruction, {instruction.size // 8})
 ''')
     
     
@@ -43,51 +114,102 @@ def {name}({', '.join([f'{op.char.lower()}' for op in reversed(operands)])}):
         operands = ext_instruction.operands
 
         name = f'ext_{opcode.lower()}'
+        names.append((name, operands))
         f.write(f'''    
-def {name}({', '.join([f'{op.char.lower()}' for op in reversed(operands)])}):
-\t# Validate that last instruction can have extension
-\tif not instructions:
-\t\traise ValueError("No main instruction to extend")
-\t
-\tlast_instruction, size = instructions[-1]
-\tif (last_instruction >> 12) < 4:
-\t\traise ValueError("Last instruction cannot have extension (first nybble < 4)")
-\t
-\tif (last_instruction & 0xFF) != 0:
-\t\traise ValueError("Last instruction already has an extension")
-\t
-\t{'\n\t'.join([generate_operand_assertion(op) for op in reversed(operands)])}
-\t
-\textension = {hex(ext_instruction.fixed_repr)}
-\t{'\n\t'.join([generate_extension_operand_insertion(op) for op in reversed(operands)])}
-\t
-\t# Modify last instruction by ORing in the extension
-\tinstructions[-1] = (last_instruction | extension, size)
+\tdef {name}({generate_parameters(operands)}):
+\t\t# Validate that last instruction can have extension
+\t\tif self.num_instructions == 0:
+\t\t\traise ValueError("No main instruction to extend")
+\t\t
+\t\tlast_instruction = int.from_bytes(self.code[self.last_instruction_offset:], 'big')
+\t\tif (last_instruction >> 12) < 3:
+\t\t\traise ValueError("Last instruction cannot have extension (first nybble < 3)")
+\t\t
+\t\t# like decoder.d, instructions starting with 3 only have the low 7 bits for their extension
+\t\textension_mask = 0x7F if (last_instruction >> 12) == 3 else 0xFF
+\t\tif (last_instruction & extension_mask) != 0:
+\t\t\traise ValueError("Last instruction already has an extension")
+\t\t
+\t\t{'\n\t\t'.join([generate_operand_assertion(op) for op in reversed(operands)])}
+\t\t
+\t\textension = {hex(ext_instruction.fixed_repr)}
+\t\t{'\n\t\t'.join([generate_extension_operand_insertion(op) for op in reversed(operands)])}
+\t\tif (extension & ~extension_mask) != 0:
+\t\t\traise ValueError("Extension doesn't fit in the 7 bits an instruction starting with 3 has")
+\t\t
+\t\t# Modify last instruction by ORing in the extension
+\t\tself.code[self.last_instruction_offset:] = (last_instruction | extension).to_bytes(len(self.code) - self.last_instruction_offset, 'big')
 ''')
 
     f.write(f'''
 
-def get_label():
-    return sum(i[1] for i in instructions) // 16
+\tdef get_label(self):
+\t\treturn self.origin + len(self.code) // 2
 
-def assemble():
-    byte_list = []
-    length = 0
+\t# returns the program as bytes and its length in bytes
+\tdef assemble(self):
+\t\tself.resolve_fixups()
+\t\treturn (bytes(self.code), len(self.code))
 
-    for instruction in instructions:
-        length += instruction[1] // 8
-        for byte in range(instruction[1] // 8):
-            byte_list.append((instruction[0] >> ((instruction[1] // 8 - byte - 1) * 8)) & 0xff)
+\tdef get_num_bytes(self):
+\t\treturn len(self.code)
+
+\tdef get_num_instructions(self):
+\t\treturn self.num_instructions
+            
+\tdef reset(self):
+\t\tself.code.clear()
+\t\tself.num_instructions = 0
+\t\tself.last_instruction_offset = 0
+\t\tself.labels = {{}}
+\t\tself.fixups = []
+
+# a label plus a number of words, for addresses like the last word of a loop body
+def ref(name, offset=0):
+\treturn (name, offset)
+
+# the module level functions below build on the current thread's current assembler, which is a
+# thread's own Assembler unless using() has swapped another one in
+local = threading.local()
 
-    return (byte_list, length)
+def current():
+\tif getattr(local, 'assembler', None) is None:
+\t\tlocal.assembler = Assembler()
+
+\treturn local.assembler
+
+@contextlib.contextmanager
+def using(assembler):
+\tprevious = getattr(local, 'assembler', None)
+\tlocal.assembler = assembler
+\ttry:
+\t\tyield assembler
+\tfinally:
+\t\tlocal.assembler = previous
+''')
+
+    for name, operands in names:
+        f.write(f'''
+def {name}({generate_arguments(operands)}):
+\tcurrent().{name}({generate_arguments(operands)})
+''')
+
+    f.write(f'''
+def label(name):
+\tcurrent().label(name)
+
+def get_label():
+\treturn current().get_label()
+
+def assemble():
+\treturn current().assemble()
 
 def get_num_bytes():
-    return sum(i[1] // 8 for i in instructions)
+\treturn current().get_num_bytes()
 
 def get_num_instructions():
-    return len(instructions)
-            
+\treturn current().get_num_instructions()
+
 def reset():
-    global instructions
-    instructions = []
-''')
\ No newline at end of file
+\tcurrent().reset()
+''')
@@ -16,8 +16,6 @@ class Table:
     def __repr__(self):
         return f'Table(size={self.size}, mask={self.mask:x}, table={self.table})'
     
-instructions, extension_instructions = parse_spec.get_instructions('tools/dsp_codegen/spec')
-
 def check_for_overlapping_encodings(instructions):
     """Check if any two instructions have overlapping encodings and error out if found."""
     for i, inst1 in enumerate(instructions):
@@ -39,8 +37,6 @@ def check_for_overlapping_encodings(instructions):
                         print(f"  Common fixed bits: 0x{common_fixed_bits:0{inst1.size//4}x}")
                         sys.exit(1)
 
-check_for_overlapping_encodings(instructions)
-
 def pext(value, mask):
     result = 0
 
@@ -267,18 +263,23 @@ def write_out_table(f, function_name, table):
     for child in children:
         write_out_table(f, child[0], child[1])
 
-table = generate_table_for(instructions)
-with open(sys.argv[1], 'w+') as f:
-    f.write('// This file is automatically generated by generate_decoder.py.\n// Do not edit it manually.\n\n')
+# generate_disassembler.py builds on the tables above, so only write the decoder when run directly
+if __name__ == "__main__":
+    instructions, extension_instructions = parse_spec.get_instructions('tools/dsp_codegen/spec')
+    check_for_overlapping_encodings(instructions)
 
-    f.write('module emu.hw.dsp.jit.emission.decoder;\n\n')
-    f.write('import util.bitop;\n')
-    f.write('import util.number;\n')
-    f.write('import util.log;\n')
+    table = generate_table_for(instructions)
+    with open(sys.argv[1], 'w+') as f:
+        f.write('// This file is automatically generated by generate_decoder.py.\n// Do not edit it manually.\n\n')
 
-    f.write('\n')
+        f.write('module emu.hw.dsp.jit.emission.decoder;\n\n')
+        f.write('import util.bitop;\n')
+        f.write('import util.number;\n')
+        f.write('import util.log;\n')
+
+        f.write('\n')
 
-    write_out_instruction_structs(f, instructions, extension_instructions)
-    write_extension_decoder(f, extension_instructions)
-    write_out_table(f, 'decode_instruction', table)
-    write_main_decoder_function(f)
\ No newline at end of file
+        write_out_instruction_structs(f, instructions, extension_instructions)
+        write_extension_decoder(f, extension_instructions)
+        write_out_table(f, 'decode_instruction', table)
+        write_main_decoder_function(f)
\ No newline at end of file
@@ -0,0 +1,201 @@
+from parse_spec import *
+from generate_decoder import Table, check_for_overlapping_encodings, generate_table_for, generate_extension_table_for
+
+instructions, extension_instructions = get_instructions('tools/dsp_codegen/spec')
+check_for_overlapping_encodings(instructions)
+
+# the same names generate_assembler.py gives the instructions
+def assembler_name(instruction):
+    name = instruction.opcode.lower()
+    if name == 'not':
+        name = '_not'
+    return name
+
+# (shift, mask) of every operand in the assembler's parameter order. the x field of a main instruction is
+# its extension, which is disassembled on its own, so its mask is 0 and it always shows up as 0
+def generate_operands(operands):
+    fields = []
+    for op in reversed(operands):
+        size = op.high_index - op.low_index + 1
+        mask = 0 if op.char == 'x' else (1 << size) - 1
+        fields.append(f'({op.low_index}, {mask:#x})')
+    return f"({', '.join(fields)}{',' if len(fields) == 1 else ''})"
+
+def fresh_table_function_name():
+    fresh_table_function_name_counter = 0
+    while True:
+        fresh_table_function_name_counter += 1
+        yield f'generated_table_{fresh_table_function_name_counter}'
+fresh_table_function_name = fresh_table_function_name()
+
+# the same decision tree as decode_instruction in decoder.d, returning opcode numbers instead
+def write_out_table(f, function_name, table):
+    children = []
+
+    f.write(f'def {function_name}(instruction):\n')
+    f.write('    index = 0\n')
+    j = 0
+    for i in range(table.mask.bit_length()):
+        if (table.mask & (1 << i)) != 0:
+            f.write(f'    index |= ((instruction >> {i}) & 1) << {j}\n')
+            j += 1
+
+    f.write('\n')
+    for case_number in range(table.size):
+        entry = table[case_number]
+        if isinstance(entry, Instruction):
+            f.write(f'    if index == {case_number}: return {instructions.index(entry)}  # {entry.opcode}\n')
+        elif isinstance(entry, Table):
+            child_function_name = next(fresh_table_function_name)
+            f.write(f'    if index == {case_number}: return {child_function_name}(instruction)\n')
+            children.append((child_function_name, entry))
+
+    f.write('    return UNKNOWN\n\n')
+
+    for child in children:
+        write_out_table(f, child[0], child[1])
+
+extension_table = generate_extension_table_for(extension_instructions)
+extension_nop = [e.opcode for e in extension_instructions].index('NOP')
+
+with open('disassembler.py', 'w+') as f:
+    f.write(f'''
+# This file is automatically generated by generate_disassembler.py.
+# Do not edit it manually.
+
+import sys
+import numpy as np
+
+# turns DSP code back into calls to the functions in assembler.py, with their operand order, so a listing
+# can go straight back into a test generator. decode() works on a whole dump at once, only formatting
+# goes instruction by instruction.
+
+# per opcode: the assembler's name, the size in words, and the (shift, mask) of every operand of the
+# instruction's value. the last opcode is for words that aren't any instruction
+INSTRUCTIONS = (
+{''.join(f"    ('{assembler_name(i)}', {i.size // 16}, {generate_operands(i.operands)}),\n" for i in instructions)}    ('unknown', 1, ((0, 0xffff),)),
+)
+
+MNEMONICS = tuple(name for name, size, operands in INSTRUCTIONS)
+SIZES = np.array([size for name, size, operands in INSTRUCTIONS], dtype=np.uint8)
+OPERANDS = tuple(operands for name, size, operands in INSTRUCTIONS)
+UNKNOWN = len(INSTRUCTIONS) - 1
+
+# the spec's letter for every operand, in the same order. i is an immediate, a an address, r a register and so on
+OPERAND_KINDS = (
+{''.join(f"    '{''.join(op.char for op in reversed(i.operands))}',\n" for i in instructions)}    'i',
+)
+
+EXTENSION_INSTRUCTIONS = (
+{''.join(f"    ('ext_{e.opcode.lower()}', {generate_operands(e.operands)}),\n" for e in extension_instructions)})
+
+EXTENSION_MNEMONICS = tuple(name for name, operands in EXTENSION_INSTRUCTIONS)
+EXTENSION_OPERANDS = tuple(operands for name, operands in EXTENSION_INSTRUCTIONS)
+
+# the extension opcode of every value of the low byte. like decoder.d, a byte no extension matches is a nop
+EXTENSIONS = np.array([
+{''.join(f"    {', '.join(str(extension_instructions.index(e) if e is not None else extension_nop) for e in extension_table[row:row + 16])},\n" for row in range(0, 256, 16))}], dtype=np.int16)
+
+''')
+
+    write_out_table(f, 'decode_instruction', generate_table_for(instructions))
+
+    f.write(f'''# the opcode of every first word there is
+OPCODES = np.array([decode_instruction(word) for word in range(0x10000)], dtype=np.int16)
+
+# decodes words, big endian u16s that start with an instruction, all at once. returns the address, opcode,
+# extension opcode (-1 if it has none) and value of every instruction, where a two word instruction's
+# value is both words as one u32. a two word instruction cut off at the end gets a second word of 0.
+def decode(words, origin=0):
+    words = np.asarray(words, dtype=np.uint16)
+    opcodes = OPCODES[words]
+    is_long = SIZES[opcodes] == 2
+
+    # a word starts an instruction unless it's the second word of a two word one. in a run of words that
+    # would each start a two word instruction, that's every other word from the first one in the run
+    position = np.arange(len(words))
+    run_start = np.ones(len(words), dtype=bool)
+    run_start[1:] = ~is_long[:-1]
+    run_start = np.maximum.accumulate(np.where(run_start, position, 0))
+    starts = np.flatnonzero((position - run_start) % 2 == 0)
+
+    first = words[starts].astype(np.uint32)
+    second = np.append(words, np.uint16(0))[starts + 1].astype(np.uint32)
+    values = np.where(is_long[starts], (first << 16) | second, first)
+
+    # main instructions starting with 3 have a 7 bit extension, the ones above it an 8 bit one
+    nybble = first >> 12
+    extension_bytes = first & np.where(nybble == 3, 0x7f, 0xff)
+    extensions = np.where(nybble >= 3, EXTENSIONS[extension_bytes], -1)
+
+    return starts + origin, opcodes[starts], extensions, values
+
+# printf style, which formats quicker than str.format. the x field of a main instruction always shows up
+# as 0, the extension follows the instruction on its own
+def operand_format(mask):
+    return '0' if mask == 0 else '%#x' if mask > 0xff else '%d'
+
+FORMATS = tuple(f"{{name}}({{', '.join(operand_format(mask) for shift, mask in operands)}})" for name, size, operands in INSTRUCTIONS)
+EXTENSION_FORMATS = tuple(f"; {{name}}({{', '.join(operand_format(mask) for shift, mask in operands)}})" for name, operands in EXTENSION_INSTRUCTIONS)
+
+def operand_values(value, operands):
+    return [(value >> shift) & mask for shift, mask in operands if mask != 0]
+
+def format_instruction(opcode, extension, value):
+    text = FORMATS[opcode] % tuple(operand_values(value, OPERANDS[opcode]))
+    if extension >= 0:
+        first = value >> (16 * (int(SIZES[opcode]) - 1))
+        text += EXTENSION_FORMATS[extension] % tuple(operand_values(first & 0xff, EXTENSION_OPERANDS[extension]))
+    return text
+
+# formats every instruction with the same opcode in one go, with the operands pulled out of values by numpy
+def format_column(format, operands, values):
+    columns = [column.tolist() for column in operand_values(values, operands)]
+    return list(map(format.__mod__, zip(*columns))) if len(columns) != 0 else format
+
+# returns a line of text for every instruction in words. the value of an instruction is all there is to its
+# text, and dumps use the same few instructions over and over, so each distinct value is only formatted once
+def disassemble(words, origin=0):
+    addresses, opcodes, extensions, values = decode(words, origin)
+    values, first_index, inverse = np.unique(values, return_index=True, return_inverse=True)
+    opcodes = opcodes[first_index]
+    extensions = extensions[first_index]
+
+    texts = np.empty(len(values), dtype=object)
+    for opcode in np.unique(opcodes).tolist():
+        selected = np.flatnonzero(opcodes == opcode)
+        texts[selected] = format_column(FORMATS[opcode], OPERANDS[opcode], values[selected])
+
+    suffixes = np.full(len(values), '', dtype=object)
+    first = values >> (16 * (SIZES[opcodes].astype(np.uint32) - 1))
+    for extension in np.unique(extensions[extensions >= 0]).tolist():
+        selected = np.flatnonzero(extensions == extension)
+        suffixes[selected] = format_column(EXTENSION_FORMATS[extension], EXTENSION_OPERANDS[extension], first[selected] & 0xff)
+
+    return (address_prefixes(addresses) + (texts + suffixes)[inverse]).tolist()
+
+# the DSP's addresses are 16 bits, so the text for all of them is made once and looked up from then on
+ADDRESS_PREFIXES = None
+
+def address_prefixes(addresses):
+    global ADDRESS_PREFIXES
+    if len(addresses) != 0 and addresses[-1] > 0xffff:
+        prefixes = np.empty(len(addresses), dtype=object)
+        prefixes[:] = list(map('%04x: '.__mod__, addresses.tolist()))
+        return prefixes
+
+    if ADDRESS_PREFIXES is None:
+        ADDRESS_PREFIXES = np.empty(0x10000, dtype=object)
+        ADDRESS_PREFIXES[:] = list(map('%04x: '.__mod__, range(0x10000)))
+
+    return ADDRESS_PREFIXES[addresses]
+
+if __name__ == "__main__":
+    # usage: disassembler.py <dump> [origin]
+    # the dump is raw big endian words, like an IRAM image
+    with open(sys.argv[1], 'rb') as dump:
+        words = np.frombuffer(dump.read(), dtype='>u2')
+
+    origin = int(sys.argv[2], 0) if len(sys.argv) > 2 else 0
+    print('\\n'.join(disassemble(words, origin)))
+''')
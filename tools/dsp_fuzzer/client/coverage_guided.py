@@ -0,0 +1,111 @@
+import fuzz
+import numpy as np
+import os
+
+# instead of sending a fixed number of blind tests, send a family in rounds and keep track of which
+# (opcode, SR mode in, SR flags out) combinations the console's results have covered so far. later rounds
+# are mostly mutations of the tests that hit the rarest combinations, and a family stops once a few
+# rounds in a row haven't covered anything new.
+
+# column of SR (register 0x13) in the 31 initial values / results, register 18 isn't sent
+SR_INDEX = 18
+
+# carry, overflow, zero, sign, above s32, top two bits, logic zero, overflow sticky (saturation)
+SR_FLAGS = 0x00ff
+# multiply modify (0x2000), 40 bit mode (0x4000), unsigned multiply (0x8000)
+SR_MODES = 0xe000
+
+ROUND_SIZE = 64
+PLATEAU_ROUNDS = 3
+
+# a family may use up to this many times its blind count before it's cut off
+BUDGET = 4
+
+# how many registers a mutation rerolls on average, and how often it changes the SR modes
+MUTATED_REGISTERS = 3
+MODE_FLIP_PROBABILITY = 0.25
+
+# the first instruction word stands in for the opcode, so register and condition operands count too
+def coverage_keys(instructions, initial, results):
+    opcode = instructions[:, 0].astype(np.uint64)
+    modes = (initial[:, SR_INDEX] & SR_MODES).astype(np.uint64)
+    flags = (results[:, SR_INDEX] & SR_FLAGS).astype(np.uint64)
+    return (opcode << 32) | (modes << 16) | flags
+
+def mutate(np_rng, instructions, initial, weights, count):
+    parents = np_rng.choice(len(instructions), size=count, p=weights / weights.sum())
+    mutated = initial[parents].copy()
+
+    rerolled = np_rng.random(mutated.shape) < MUTATED_REGISTERS / 31
+    mutated[rerolled] = fuzz.edge_biased_values(np_rng, np.count_nonzero(rerolled))
+
+    flipped = np_rng.random(count) < MODE_FLIP_PROBABILITY
+    mutated[flipped, SR_INDEX] ^= np_rng.integers(1, 8, size=np.count_nonzero(flipped), dtype=np.uint16) << 13
+
+    return instructions[parents], mutated
+
+# returns the number of tests sent and the number of combinations covered, or None if the connection dropped
+def generate_family(ip, filename, test_case, count, seed):
+    max_tests = count * BUDGET
+
+    # blind tests are drawn from the same (family, seed, index) stream as the blind mode
+    iram_code_bytes, iram_code_length, test_size, test_case_index, accumulator_indices, num_slots, slot_stride, accumulators, tests_bytes, _ = fuzz.do_tests(test_case, max_tests, seed)
+    template = (iram_code_bytes, iram_code_length, test_size, test_case_index, accumulator_indices, num_slots, slot_stride)
+
+    blind_instructions = np.frombuffer(tests_bytes, dtype='>u2').reshape(max_tests, test_size // 2).astype(np.uint16)
+    blind_initial = np.asarray(accumulators, dtype=np.uint16).reshape(max_tests, 31)
+    num_blind = 0
+
+    np_rng = np.random.default_rng(fuzz.test_rng(test_case.__name__, seed, 'mutations').getrandbits(64))
+
+    hits = {}
+    corpus = []
+    records = []
+    num_tests = 0
+    stale_rounds = 0
+
+    while num_tests < max_tests and stale_rounds < PLATEAU_ROUNDS:
+        round_size = min(ROUND_SIZE, max_tests - num_tests)
+
+        # the first round is all blind, after that a quarter of every round keeps exploring blindly
+        num_mutated = 0 if len(corpus) == 0 else round_size * 3 // 4
+        instructions = blind_instructions[num_blind:num_blind + round_size - num_mutated]
+        initial = blind_initial[num_blind:num_blind + round_size - num_mutated]
+        num_blind += round_size - num_mutated
+
+        if num_mutated != 0:
+            corpus_instructions = np.vstack([entry[0] for entry in corpus])
+            corpus_initial = np.vstack([entry[1] for entry in corpus])
+            # the fewer results a combination has, the more likely its tests are to be mutated again
+            weights = np.array([1 / hits[entry[2]] for entry in corpus])
+
+            mutated_instructions, mutated_initial = mutate(np_rng, corpus_instructions, corpus_initial, weights, num_mutated)
+            instructions = np.vstack([instructions, mutated_instructions])
+            initial = np.vstack([initial, mutated_initial])
+
+        try:
+            results = fuzz.run_tests(ip, template, instructions, initial)
+        except (ConnectionError, OSError) as e:
+            print("Connection failed:", e)
+            return None
+
+        records.append(fuzz.test_records(instructions, results, initial))
+        num_tests += len(initial)
+
+        num_covered = len(hits)
+        for index, key in enumerate(coverage_keys(instructions, initial, results).tolist()):
+            if key not in hits:
+                hits[key] = 0
+                corpus.append((instructions[index:index + 1], initial[index:index + 1], key))
+            hits[key] += 1
+
+        stale_rounds = stale_rounds + 1 if len(hits) == num_covered else 0
+        print(f"{test_case.__name__}: {num_tests} tests, {len(hits)} combinations covered (+{len(hits) - num_covered})")
+
+    with open(f"{filename}.partial", "wb") as f:
+        f.write(test_size.to_bytes(2, 'little'))
+        for record in records:
+            f.write(record)
+    os.replace(f"{filename}.partial", filename)
+
+    return num_tests, len(hits)
@@ -3,127 +3,264 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + "/dsp_codegen")
 
 import assembler
+import functools
+import numpy as np
 import socket
 import random
 import struct
+import threading
 
-def generate_pseudo_values(count):
-    values = []
+# the generators the instruction generators draw from, one pair per thread so families can be generated
+# side by side. do_tests points them at fresh ones for every test
+local = threading.local()
+
+def rng():
+    if getattr(local, 'rng', None) is None:
+        local.rng = random.Random()
+
+    return local.rng
+
+def np_rng():
+    if getattr(local, 'np_rng', None) is None:
+        local.np_rng = np.random.default_rng(rng().getrandbits(64))
+
+    return local.np_rng
+
+# every test gets its own generator, so (family, seed, index) reproduces a single test without
+# generating the ones before it, and a family can be split up across processes or resumed anywhere
+def test_rng(family, seed, index):
+    return random.Random(f"{family}:{seed}:{index}")
+
+def use_test_rng(family, seed, index):
+    local.rng = test_rng(family, seed, index)
+    local.np_rng = np.random.default_rng(local.rng.getrandbits(64))
+
+EDGE_VALUES = np.array([
+    0, 1,
+    0x7f, 0x80, 0x81,
+    0xfe, 0xff, 0x100, 0x101,
+    0x7f00, 0x7fff, 0x8000, 0x8001,
+    0xfffe, 0xffff,
+], dtype=np.uint16)
+
+# every edge value is as likely as the others, and a uniform value is 7 times as likely as any one of them
+UNIFORM_WEIGHT = 7
+
+# the edge values in [low, high], and how likely a value is to be one of them once the distribution above
+# is conditioned on landing in the range. the uniform part only lands in it (high - low + 1) / 0x10000 of the time
+@functools.lru_cache(maxsize=None)
+def edge_range(low, high):
+    edges = EDGE_VALUES[(EDGE_VALUES >= low) & (EDGE_VALUES <= high)]
+    uniform_weight = UNIFORM_WEIGHT * (high - low + 1) / 0x10000
+    return edges, len(edges) / (len(edges) + uniform_weight)
+
+# count edge biased u16s in [low, high] in one go
+def edge_biased_values(np_rng, count, low=0, high=0xffff):
+    edges, edge_probability = edge_range(low, high)
+
+    values = np_rng.integers(low, high, size=count, dtype=np.uint16, endpoint=True)
+    is_edge = np_rng.random(count) < edge_probability
+    if len(edges) != 0:
+        values[is_edge] = edges[np_rng.integers(0, len(edges), size=np.count_nonzero(is_edge))]
 
-    if random.randint(0, 50) == 0:
-        random_number = random.randint(0, 0xffff)
-        return [random_number] * count
-    
-    for i in range(count):
-        match random.randint(0, 20):
-            case 0:
-                values.append(0)
-            case 1:
-                values.append(1)
-            case 2:
-                values.append(0xfe)
-            case 3:
-                values.append(0xff)
-            case 4:
-                values.append(0x100)
-            case 4:
-                values.append(0x101)
-            case 5:
-                values.append(0x7f)
-            case 6:
-                values.append(0x80)
-            case 7:
-                values.append(0x81)
-            case 8:
-                values.append(0xfffe)
-            case 9:
-                values.append(0xffff)
-            case 10:
-                values.append(0x7f00)
-            case 11:
-                values.append(0x7fff)
-            case 12:
-                values.append(0x8000)
-            case 13:
-                values.append(0x8001)
-            case _:
-                values.append(random.randint(0, 0xffff))
-    
-    # return [0] * 1
     return values
 
-def load_accumulators():
+# a single value from the same distribution, numpy's per call overhead isn't worth it for one
+def edge_biased_value(rng, low=0, high=0xffff):
+    edges, edge_probability = edge_range(low, high)
+
+    if rng.random() < edge_probability:
+        return int(edges[rng.randrange(len(edges))])
+
+    return rng.randint(low, high)
+
+def generate_pseudo_values(count, np_rng):
+    # now and then every value is the same
+    if np_rng.integers(0, 51) == 0:
+        return [int(np_rng.integers(0, 0xffff, endpoint=True))] * count
+
+    return edge_biased_values(np_rng, count).tolist()
+
+def load_accumulators(program):
     labels = []
 
-    accumulator_values = generate_pseudo_values(32)
+    accumulator_values = generate_pseudo_values(32, np_rng())
     # load ACM0 and ACM1 first
     for i in reversed(range(32)):
         if i == 18:
-            # assembler.lri(18, 0)
+            # program.lri(18, 0)
             continue
-        labels.append(assembler.get_num_bytes() + 2)
-        assembler.lri(i, accumulator_values[i])
+        labels.append(program.get_num_bytes() + 2)
+        program.lri(i, accumulator_values[i])
     
     return reversed(labels)
 
-def store_accumulators():
+def store_registers(program):
     for i in range(32):
         if i == 18:
             continue
 
         if i == 30:
-            assembler.lri(16, 0)
-            assembler.lri(17, 0)
-            assembler.lri(19, 0)
+            program.lri(16, 0)
+            program.lri(17, 0)
+            program.lri(19, 0)
     
-        assembler.lri(18, 0)
-        assembler.sr(i, i)
-
+        program.lri(18, 0)
+        program.sr(i, i)
 
+def send_registers(program):
     for i in range(32):
         if i == 18:
             continue
 
-        # assembler.lri(18, 0x69)
-        assembler.lri(18, 0)
-        assembler.lrs(0, i)
-        assembler.lri(18, 0xff)
-
-        assembler.si(0xfc, i)
-        # assembler.si(0xfd, i)
-        assembler.sr(0x18, 0xfffd)
-
-        label = assembler.get_label()
-        assembler.lrs(6, 0xfc)
-        assembler.andcf(0, 0x8000)
-        assembler.jmp_cc(0b1101, label)
-
-def do_tests(instruction_generator, num_tests):
-    assembler.reset()
-    [instruction_generator() for _ in range(num_tests)]
-    tests_bytes = assembler.assemble()[0]
-    test_size = assembler.get_num_bytes() // num_tests
-
-    assembler.reset()
-    # assembler.si(0xfd, 0x42)
-    # assembler.si(0xfc, 0x42)
-    # assembler.jmp_cc(0b1111, 0)
-    accumulator_indices = load_accumulators()
-    test_case_index = assembler.get_num_bytes()
-    instruction_generator()
-
-
-    # assembler.instructions.append([
+        # program.lri(18, 0x69)
+        program.lri(18, 0)
+        program.lrs(0, i)
+        program.lri(18, 0xff)
+
+        program.si(0xfc, i)
+        # program.si(0xfd, i)
+        program.sr(0x18, 0xfffd)
+
+        label = program.get_label()
+        program.lrs(6, 0xfc)
+        program.andcf(0, 0x8000)
+        program.jmp_cc(0b1101, label)
+
+def store_accumulators(program):
+    store_registers(program)
+    send_registers(program)
+
+# with more than one slot, the template is num_slots copies of [CR][load registers][test][store registers]
+# slot_stride bytes apart, and the server patches a test into every slot before it boots the DSP. each
+# slot leaves the address of the next one in RETURN_REGISTER and jumps to the mailbox loop they all
+# share, which sends the registers and jumps back through it. the last slot comes back to the same
+# spin the single slot harness ends in.
+#
+# the harness leaves CR at 0xff and doesn't load it with the other registers, so the first slot saves
+# the CR the DSP booted with and every other slot puts it back before it loads the registers. that way
+# every test starts like it would right after a boot, apart from whatever the previous test itself left
+# on the stacks. a test that refers to its own addresses only works in the slot it was assembled for, so
+# families with labels always get a single slot.
+IRAM_SIZE = 8192
+RETURN_REGISTER = 0
+
+# the DRAM word CR is kept in between slots. store_registers dumps every register but CR to the address
+# of the same number, so CR's own is free
+BOOT_CR_ADDRESS = 18
+
+def start_slot(program, slot):
+    if slot == 0:
+        program.sr(18, BOOT_CR_ADDRESS)
+    else:
+        program.lr(18, BOOT_CR_ADDRESS)
+
+def store_slot(program, next_slot):
+    store_registers(program)
+    program.lri(RETURN_REGISTER, next_slot)
+    program.jmp_cc(0b1111, 'mailbox')
+
+def mailbox_loop(program):
+    program.label('mailbox')
+    send_registers(program)
+    program.jmpr_cc(RETURN_REGISTER, 0b1111)
+
+    program.label('done')
+    program.lrs(6, 0xfc)
+    program.jmp_cc(0b1111, 'done')
+
+# how many slots of test_size byte tests fit in IRAM next to the mailbox loop, and how far apart they are.
+# test_case_index is where the test starts in the single slot template, which has no CR in front
+def slot_layout(test_case_index, test_size):
+    slot = assembler.Assembler()
+    start_slot(slot, 1)
+    store_slot(slot, 'done')
+    slot_stride = test_case_index + test_size + slot.get_num_bytes()
+
+    shared = assembler.Assembler()
+    mailbox_loop(shared)
+    return (IRAM_SIZE - shared.get_num_bytes()) // slot_stride, slot_stride
+
+# num_slots is how many tests the DSP runs per boot. by default it's as many as fit in IRAM, or 1 for
+# families whose tests use labels
+def do_tests(instruction_generator, num_tests, seed=0, num_slots=None):
+    family = instruction_generator.__name__
+
+    # the template's own test and initial values are overwritten by every test case
+    use_test_rng(family, seed, 'template')
+    program = assembler.Assembler()
+    # program.si(0xfd, 0x42)
+    # program.si(0xfc, 0x42)
+    # program.jmp_cc(0b1111, 0)
+    accumulator_indices = load_accumulators(program)
+    test_case_index = program.get_num_bytes()
+
+    with assembler.using(program):
+        instruction_generator()
+
+
+    # program.code.extend([
     #     0x00, 0xf2, 0x00, 0x81, 0x00, 0x4e, 0x00, 0x84
     # ])
 
-    store_accumulators()
-
-    label = assembler.get_label()
-    assembler.lrs(6, 0xfc)
-    assembler.jmp_cc(0b1111, label)
-
-    bytes_data, length = assembler.assemble()
+    # every test is its own program, placed where it'll be patched over the template's test, so labels
+    # resolve to the addresses it runs at. the family's generator writes to whichever program is current.
+    # test i's instructions and initial values both come from test_rng(family, seed, i)
+    tests = []
+    test_cases_accumulators = []
+    uses_labels = False
+    for index in range(num_tests):
+        use_test_rng(family, seed, index)
+        test = assembler.Assembler(test_case_index // 2)
+        with assembler.using(test):
+            instruction_generator()
+        uses_labels |= len(test.fixups) != 0
+        tests.append(test.assemble()[0])
+        test_cases_accumulators.extend(generate_pseudo_values(31, np_rng()))
+    tests_bytes = b''.join(tests)
+    test_size = len(tests_bytes) // num_tests
+
+    max_slots, slot_stride = slot_layout(test_case_index, test_size)
+    if num_slots is None:
+        num_slots = 1 if uses_labels else max(1, min(max_slots, num_tests))
+    elif num_slots > 1 and uses_labels:
+        raise ValueError(f"{family} uses labels, so its tests can only run in a single slot")
+    elif num_slots > max_slots:
+        raise ValueError(f"{num_slots} slots of {slot_stride} bytes don't fit in IRAM, at most {max_slots} do")
+
+    if num_slots == 1:
+        slot_stride = 0
+        store_accumulators(program)
+
+        label = program.get_label()
+        program.lrs(6, 0xfc)
+        program.jmp_cc(0b1111, label)
+    else:
+        # the template starts over with CR saved in front of the first slot. it's the same generator, so
+        # it's the same template as above, and tests without labels run the same wherever they are
+        use_test_rng(family, seed, 'template')
+        program = assembler.Assembler()
+        start_slot(program, 0)
+        accumulator_indices = load_accumulators(program)
+        test_case_index = program.get_num_bytes()
+
+        with assembler.using(program):
+            instruction_generator()
+
+        # the other slots' tests are overwritten just like the first one's
+        for slot in range(1, num_slots):
+            store_slot(program, f'slot_{slot}')
+
+            program.label(f'slot_{slot}')
+            start_slot(program, slot)
+            load_accumulators(program)
+            with assembler.using(program):
+                instruction_generator()
+
+        store_slot(program, 'done')
+        mailbox_loop(program)
+
+    bytes_data, length = program.assemble()
     print(bytes_data)
 
     # length = len(bytes_data)
@@ -138,8 +275,6 @@ def do_tests(instruction_generator, num_tests):
 
 
 
-    test_cases_accumulators = generate_pseudo_values(31 * num_tests)
-
     # test_cases_accumulators = [
     #     0xd202, 0x00ff, 0x5007, 0x74b5,
     #     0x0000, 0x7fff, 0xfe6e, 0x08e4,
@@ -172,77 +307,224 @@ def do_tests(instruction_generator, num_tests):
     # ]
 
 
-    return bytes_data, length, test_size, test_case_index, list(accumulator_indices), test_cases_accumulators, tests_bytes, num_tests
+    return bytes_data, length, test_size, test_case_index, list(accumulator_indices), num_slots, slot_stride, test_cases_accumulators, tests_bytes, num_tests
+
+PORT = 1234
+
+# "ip" or "ip:port", so a local_server on another port can stand in for the console
+def address(ip):
+    host, _, port = ip.partition(':')
+    return host, int(port) if port else PORT
+
+# how many packets may be queued on the console before we wait for a reply
+MAX_PACKETS_IN_FLIGHT = 2
+
+def recv_exactly(s, num_bytes):
+    data = bytearray()
+    while len(data) < num_bytes:
+        chunk = s.recv(num_bytes - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+
+    return data
 
-def send_to_wii(ip, filename, iram_code_bytes, iram_code_length, test_case_length, test_case_index, accumulator_indices, test_cases_accumulators, test_cases_data, num_tests):
+# one connection per packet, for servers that close the socket after every reply. with a timeout, a
+# server that goes that many seconds without sending anything raises TimeoutError
+def exchange_per_connection(ip, packets, reply_sizes, timeout=None):
+    for packet, reply_size in zip(packets, reply_sizes):
+        s = socket.create_connection(address(ip), timeout)
+        print("packet size:", len(packet))
+        s.sendall(packet)
+
+        data = recv_exactly(s, reply_size)
+        s.close()
+
+        if data is None:
+            return
+        yield data
+
+# one connection for every packet. a sender thread keeps the next packet queued on the console while
+# the current one runs, the calling thread collects the replies in order.
+def exchange_pipelined(ip, packets, reply_sizes, timeout=None):
+    s = socket.create_connection(address(ip), timeout)
+    in_flight = threading.Semaphore(MAX_PACKETS_IN_FLIGHT)
+    closed = threading.Event()
+    failure = []
+
+    # whatever stops the sender, the socket is shut down so the receive loop doesn't wait for a reply to
+    # a packet that was never sent. anything but a dropped connection is raised again in the caller
+    def sender():
+        try:
+            for packet in packets:
+                in_flight.acquire()
+                if closed.is_set():
+                    return
+
+                print("packet size:", len(packet))
+                s.sendall(packet)
+        except OSError as e:
+            print("Failed to send packet:", e)
+            shutdown()
+        except BaseException as e:
+            failure.append(e)
+            shutdown()
+
+    def shutdown():
+        try:
+            s.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    sender_thread = threading.Thread(target=sender, daemon=True)
+    sender_thread.start()
+
+    try:
+        for reply_size in reply_sizes:
+            data = recv_exactly(s, reply_size)
+            if data is None:
+                return
+
+            in_flight.release()
+            yield data
+    finally:
+        # wake the sender up if it's still blocked on the semaphore or the socket
+        closed.set()
+        in_flight.release()
+        shutdown()
+        sender_thread.join()
+        s.close()
+
+        if failure:
+            raise failure[0]
+
+# sends tests first_test..num_tests to the console in as few packets as fit, and yields
+# (batch_start, batch_end, results) for every batch the console answers. accumulators is a
+# (num_tests, 31) array of initial values and test_cases_data the tests' instructions back to back.
+def run_batches(ip, iram_code_bytes, iram_code_length, test_case_length, test_case_index, accumulator_indices, num_slots, slot_stride, accumulators, test_cases_data, num_tests, pipelined=True, first_test=0, timeout=None):
     MAX_PACKET_SIZE = 60000
-    port = 1234
 
     header_size = 2 + 2 + 2 + 2 + 2  # magic + test_case_length + test_case_index + num_tests + iram_code_length
+    if num_slots != 1:
+        header_size += 2 + 2  # num_slots + slot_stride
     fixed_size = header_size + iram_code_length + len(accumulator_indices) * 2
     test_data_per_test = 31 * 2 + test_case_length  # 31 accumulator values + test case data
     print("Calculated packet size: calculation: ", fixed_size, "+", test_data_per_test, "*", num_tests, "=", fixed_size + test_data_per_test * num_tests)
     
-    max_tests_per_packet = (MAX_PACKET_SIZE - fixed_size) // test_data_per_test
+    # every boot fills all num_slots slots, so packets hold a whole number of boots
+    max_tests_per_packet = (MAX_PACKET_SIZE - fixed_size) // test_data_per_test // num_slots * num_slots
     print(max_tests_per_packet)
     if max_tests_per_packet <= 0:
-        raise ValueError("Packet size too large even for a single test case")
-    
-    all_results = []
+        raise ValueError("Packet size too large even for a single boot")
     
-    for batch_start in range(0, num_tests, max_tests_per_packet):
-        batch_end = min(batch_start + max_tests_per_packet, num_tests)
-        batch_size = batch_end - batch_start
-        
-        print(f"Sending batch {batch_start//max_tests_per_packet + 1}: tests {batch_start} to {batch_end-1}")
-        
-        packet = bytearray()
-        packet.extend(struct.pack('>H', 0xBEEF))  # magic
-        packet.extend(struct.pack('>H', test_case_length))  # test_case_length
-        packet.extend(struct.pack('>H', test_case_index))  # test_case_index
-        packet.extend(struct.pack('>H', batch_size))  # num_test_cases (for this batch)
-        packet.extend(struct.pack('>H', iram_code_length))  # iram_code_length
-        packet.extend(iram_code_bytes)  # iram_code
-        
-        for i in range(batch_start * 31, batch_end * 31):
-            packet.extend(struct.pack('>H', test_cases_accumulators[i]))  # test_cases_accumulators
-        
-        for val in accumulator_indices:
-            packet.extend(struct.pack('>H', val))  # test_cases_accumulator_indices
-        
-        batch_test_data = test_cases_data[batch_start * test_case_length:batch_end * test_case_length]
-        packet.extend(batch_test_data)  # test_cases_data
-
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.connect((ip, port))
-        print("packet size:", len(packet))
-        s.sendall(packet)
-
-        expected_bytes = 31 * batch_size * 2
-        data = bytearray()
-        while len(data) < expected_bytes:
-            chunk = s.recv(expected_bytes - len(data))
-            if not chunk:
-                print("Connection closed prematurely")
-                return
-            data.extend(chunk)
-
-        batch_results = struct.unpack(f'>{len(data)//2}H', data)
-        all_results.extend(batch_results)
-        
-        s.close()
-
-    with open(f"{filename}", "wb+") as f:
+    batches = [(batch_start, min(batch_start + max_tests_per_packet, num_tests)) for batch_start in range(first_test, num_tests, max_tests_per_packet)]
+
+    # the last batch is padded up to a whole boot by running its last test again, and those results are dropped
+    def padded_size(batch_start, batch_end):
+        return -(-(batch_end - batch_start) // num_slots) * num_slots
+
+    # everything on the wire is big endian u16s, so convert once and slice per batch
+    accumulators = np.asarray(accumulators, dtype='>u2').reshape(num_tests, 31)
+    indices_bytes = np.asarray(accumulator_indices, dtype='>u2').tobytes()
+    test_cases_bytes = bytes(test_cases_data)
+
+    # built lazily, so the next packet is assembled while the console runs the previous one
+    def packets():
+        for batch_start, batch_end in batches:
+            batch_size = padded_size(batch_start, batch_end)
+            padding = batch_size - (batch_end - batch_start)
+
+            print(f"Sending batch {(batch_start - first_test)//max_tests_per_packet + 1}: tests {batch_start} to {batch_end-1}")
+
+            # magic, test_case_length, test_case_index, num_test_cases (for this batch), iram_code_length, and
+            # for a template with more than one slot, num_slots, slot_stride
+            if num_slots == 1:
+                header = struct.pack('>5H', 0xBEEF, test_case_length, test_case_index, batch_size, iram_code_length)
+            else:
+                header = struct.pack('>7H', 0xBEF0, test_case_length, test_case_index, batch_size, iram_code_length, num_slots, slot_stride)
+
+            yield b''.join([
+                header,
+                bytes(iram_code_bytes),                                                         # iram_code
+                accumulators[batch_start:batch_end].tobytes(),                                  # test_cases_accumulators
+                accumulators[batch_end - 1].tobytes() * padding,
+                indices_bytes,                                                                  # test_cases_accumulator_indices
+                test_cases_bytes[batch_start * test_case_length:batch_end * test_case_length],  # test_cases_data
+                test_cases_bytes[(batch_end - 1) * test_case_length:batch_end * test_case_length] * padding,
+            ])
+
+    reply_sizes = [31 * padded_size(batch_start, batch_end) * 2 for batch_start, batch_end in batches]
+    exchange = exchange_pipelined if pipelined else exchange_per_connection
+
+    for (batch_start, batch_end), data in zip(batches, exchange(ip, packets(), reply_sizes, timeout)):
+        yield batch_start, batch_end, np.frombuffer(data, dtype='>u2').reshape(-1, 31)[:batch_end - batch_start]
+
+# how long run_tests waits for the console to say anything. a test that never gets to the mailbox leaves
+# main.c spinning forever, and without a timeout the client would wait on it just as long
+RUN_TESTS_TIMEOUT = 30
+
+# runs every row of instructions / initial as a test on top of the iram in template, which is the first
+# seven values do_tests returns, and returns the (num_tests, 31) results. raises TimeoutError if the
+# console stops answering
+def run_tests(ip, template, instructions, initial, timeout=RUN_TESTS_TIMEOUT):
+    iram_code_bytes, iram_code_length, test_case_length, test_case_index, accumulator_indices, num_slots, slot_stride = template
+
+    results = np.zeros_like(initial)
+    num_finished = 0
+    try:
+        for batch_start, batch_end, batch_results in run_batches(ip, iram_code_bytes, iram_code_length, test_case_length, test_case_index, accumulator_indices, num_slots, slot_stride, initial, instructions.astype('>u2').tobytes(), len(initial), timeout=timeout):
+            results[batch_start:batch_end] = batch_results
+            num_finished = batch_end
+    except TimeoutError as e:
+        raise TimeoutError(f"{ip} stopped answering after {num_finished} / {len(initial)} tests, the DSP is probably stuck") from e
+
+    if num_finished != len(initial):
+        raise ConnectionError(f"connection closed after {num_finished} / {len(initial)} tests")
+
+    return results
+
+# each record is [instructions][31 results][31 initial values], all little endian u16s
+def test_records(instructions, results, accumulators):
+    return np.hstack([instructions, results, accumulators]).astype('<u2').tobytes()
+
+# results are appended to <filename>.partial one acknowledged batch at a time and the file is renamed to
+# <filename> once every test is in. if the connection drops, the tests before the failed batch are kept
+# and a later call with first_test set to the number of finished tests picks up where this one stopped.
+# on_batch_done(batch_start, batch_end) is called after each batch has been written out.
+def send_to_wii(ip, filename, iram_code_bytes, iram_code_length, test_case_length, test_case_index, accumulator_indices, num_slots, slot_stride, test_cases_accumulators, test_cases_data, num_tests, pipelined=True, first_test=0, on_batch_done=None):
+    accumulators = np.asarray(test_cases_accumulators, dtype=np.uint16).reshape(num_tests, 31)
+    instructions = np.frombuffer(bytes(test_cases_data), dtype='>u2').reshape(num_tests, test_case_length // 2)
+    record_size = 2 * (test_case_length // 2 + 31 + 31)
+
+    partial_filename = f"{filename}.partial"
+    if first_test == 0:
+        f = open(partial_filename, "wb+")
         f.write(test_case_length.to_bytes(2, 'little'))
-        for i in range(num_tests):
-            for j in range(0, test_case_length, 2):
-                f.write((test_cases_data[i * test_case_length + j + 1] + (test_cases_data[i * test_case_length + j] << 8)).to_bytes(2, 'little'))
-
-            for j in range(31):
-                f.write(all_results[i * 31 + j].to_bytes(2, 'little'))
-            
-            for j in range(31):
-                f.write(test_cases_accumulators[i * 31 + j].to_bytes(2, 'little'))
+    else:
+        # anything past first_test was written but never recorded as done, so drop it
+        f = open(partial_filename, "r+b")
+        f.truncate(2 + first_test * record_size)
+        f.seek(0, os.SEEK_END)
+
+    num_finished = first_test
+    with f:
+        try:
+            for batch_start, batch_end, results in run_batches(ip, iram_code_bytes, iram_code_length, test_case_length, test_case_index, accumulator_indices, num_slots, slot_stride, accumulators, test_cases_data, num_tests, pipelined, first_test):
+                f.write(test_records(instructions[batch_start:batch_end], results, accumulators[batch_start:batch_end]))
+                f.flush()
+
+                num_finished = batch_end
+                if on_batch_done is not None:
+                    on_batch_done(batch_start, batch_end)
+        except OSError as e:
+            print("Connection failed:", e)
+
+    if num_finished != num_tests:
+        print(f"Connection closed prematurely, {num_finished} / {num_tests} tests are saved in {partial_filename}")
+        return False
+
+    os.replace(partial_filename, filename)
+    return True
 
 if __name__ == "__main__":
     send_to_wii(sys.argv[1], "test.bin", *do_tests(lambda: assembler.nop(), 1))
\ No newline at end of file
@@ -2,21 +2,26 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + "/dsp_codegen")
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import assembler
+import coverage_guided
+import functools
 import fuzz
+import hashlib
+import inspect
+import json
+import queue
 import random
+import threading
 
 def r(low, high):
-    return random.randint(low, high)
+    return fuzz.rng().randint(low, high)
 
 def i(low, high):
-    while True:
-        value = fuzz.generate_pseudo_values(1)[0]
-        if low <= value <= high:
-            return value
+    return fuzz.edge_biased_value(fuzz.rng(), low, high)
 
 def c(low, high):
-    return random.randint(low, high)
+    return fuzz.rng().randint(low, high)
 
 def sanity():
     assembler.nop()
@@ -124,7 +129,7 @@ def iar():
     assembler.iar(r(0, 3))
 
 def if_cc():
-    long_form = random.choice([True, False])
+    long_form = fuzz.rng().choice([True, False])
     if long_form:
         assembler.if_cc(c(0, 15))
         assembler.andi(0, 0x8c00) # 0x8c00 is clr15
@@ -161,7 +166,7 @@ def lsr16():
     assembler.lsr16(r(0, 1), 0)
 
 def lri():
-    rand = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     assembler.lri(rand(), i(0, 0xffff))
 
 def lris():
@@ -210,7 +215,7 @@ def movr():
     assembler.movr(r(0, 1), r(0, 1), 0)
 
 def mrr():
-    rand = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     assembler.mrr(rand(), rand())
 
 def msub():
@@ -378,10 +383,9 @@ def bloop():
     assembler.inc(1, 0)
     assembler.inc(1, 0)
 
-    label = assembler.get_label()
-    end_label = label + 3 + 62
-    assembler.bloop(1, end_label)
+    assembler.bloop(1, assembler.ref('loop_end', -1))
     assembler.addi(0, 0x100)
+    assembler.label('loop_end')
 
     assembler.clr(1, 0)
     assembler.inc(1, 0)
@@ -395,82 +399,78 @@ def bloop():
     assembler.inc(1, 0)
     assembler.inc(1, 0)
 
-    label = assembler.get_label()
-    end_label = label + 3 + 62
-    assembler.bloop(1, end_label)
+    assembler.bloop(1, assembler.ref('loop_end_2', -1))
     assembler.addi(0, 0x1000)
+    assembler.label('loop_end_2')
 
 bloop.count = 1
 
 def bloopi():
-    label = assembler.get_label()
-    end_label = label + 3 + 62
-    print(end_label)
-
-    assembler.bloopi(3, end_label)
+    assembler.bloopi(3, assembler.ref('loop_end', -1))
     assembler.addi(0, 0x100)
+    assembler.label('loop_end')
 
-    label = assembler.get_label()
-    end_label = label + 3 + 62
-
-    assembler.bloopi(10, end_label)
+    assembler.bloopi(10, assembler.ref('loop_end_2', -1))
     assembler.addi(0, 0x1000)
+    assembler.label('loop_end_2')
 
-    label = assembler.get_label()
-    end_label_outer = label + 3 + 62
-    end_label_inner = label + 7 + 62
-
-    assembler.bloopi(3, end_label_outer)
+    assembler.bloopi(3, assembler.ref('outer_end', -1))
     assembler.addi(0, 0x200)
-    assembler.bloopi(4, end_label_inner)
+    assembler.label('outer_end')
+    assembler.bloopi(4, assembler.ref('inner_end', -1))
     assembler.addi(0, 0x2)
+    assembler.label('inner_end')
 
 bloopi.count = 1
 
 def jmp_cc():
-    target = 4 + 62
-    assembler.jmp_cc(c(0, 15), target)
+    assembler.jmp_cc(c(0, 15), 'target')
     assembler.addi(0, 0x888)
+    assembler.label('target')
     assembler.addi(1, 0x888)
     assembler.addi(1, 0x2345)
 
 def jmpr_cc():
-    target = 7 + 62
     rand = r(4, 7)
-    assembler.lri(rand, target)
+    assembler.lri(rand, 'target')
     assembler.jmpr_cc(rand, c(0, 15))
     assembler.addi(0, 0x666)
     assembler.addi(1, 0x666)
+    assembler.label('target')
     assembler.addi(1, 0x6789)
 
 jmpr_cc.count = 1
 
 def call_cc():
-    target = 5 + 62
-    assembler.call_cc(c(0, 15), target)
+    # lands on the immediate of the second addi
+    assembler.label('start')
+    assembler.call_cc(c(0, 15), assembler.ref('start', 5))
     assembler.addi(0, 0x888)
     assembler.addi(1, 0x888)
     assembler.addi(1, 0x2345)
 
 def callr_cc():
-    target = 6 + 62
-    assembler.lri(r(4, 7), target)
+    # lands on the immediate of the second addi
+    assembler.label('start')
+    assembler.lri(r(4, 7), assembler.ref('start', 6))
     assembler.callrcc(r(4, 7), c(0, 15))
     assembler.addi(0, 0x666)
     assembler.addi(1, 0x666)
     assembler.addi(1, 0x6789)
 
 def ret_cc():
-    assembler.call_cc(15, 66)
-    assembler.jmp_cc(15, 71)  # always jump to skip ret on second pass
+    assembler.call_cc(15, 'subroutine')
+    assembler.jmp_cc(15, 'after_ret')  # always jump to skip ret on second pass
+    assembler.label('subroutine')
     assembler.addi(0, 0x888)
     assembler.addi(1, 0x888)
     assembler.ret_cc(c(0, 15))
+    assembler.label('after_ret')
     assembler.addi(0, 0x999)
     assembler.addi(1, 0x999)
 
 def lr_sr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_addr = i(0x100, 0xFFF)
     
@@ -482,7 +482,7 @@ def lr_sr():
     assembler.lr(reg2, test_addr)
 
 def lrr_sr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_addr = i(0x100, 0xFFF)
     
@@ -496,7 +496,7 @@ def lrr_sr():
     assembler.lrr(addr_reg, dest_reg)
 
 def lrrd_sr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_addr = i(0x100, 0xFFF)
     
@@ -510,7 +510,7 @@ def lrrd_sr():
     assembler.lrrd(addr_reg, dest_reg)
 
 def lrri_sr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_addr = i(0x100, 0xFFF)
     
@@ -524,7 +524,7 @@ def lrri_sr():
     assembler.lrri(addr_reg, dest_reg)
 
 def lrrn_sr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_addr = i(0x100, 0xFFF)
     
@@ -538,7 +538,7 @@ def lrrn_sr():
     assembler.lrrn(addr_reg, dest_reg)
 
 def lrs_sr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_cr = i(0x01, 0x0F)
     test_offset = i(0x00, 0xFF)
@@ -552,7 +552,7 @@ def lrs_sr():
     assembler.lrs(r(0, 7), test_offset)
 
 def srr_lr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_addr = i(0x100, 0xFFF)
     
@@ -566,7 +566,7 @@ def srr_lr():
     assembler.lr(dest_reg, test_addr)
 
 def srrd_lr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_addr = i(0x100, 0xFFF)
     
@@ -580,7 +580,7 @@ def srrd_lr():
     assembler.lr(dest_reg, test_addr)
 
 def srri_lr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_addr = i(0x100, 0xFFF)
     
@@ -594,7 +594,7 @@ def srri_lr():
     assembler.lr(dest_reg, test_addr) 
 
 def srrn_lr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_addr = i(0x100, 0xFFF)
     test_ix = i(0x01, 0x0F)
@@ -610,7 +610,7 @@ def srrn_lr():
     assembler.lr(dest_reg, test_addr)
 
 def srsh_lr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_cr = i(0x01, 0x0F)
     test_offset = i(0x00, 0xFF)
@@ -625,7 +625,7 @@ def srsh_lr():
     assembler.lr(dest_reg, test_addr)
 
 def srs_lr():
-    rand_reg = lambda : random.sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
+    rand_reg = lambda : fuzz.rng().sample([x for x in list(range(32)) if not x in [12, 13, 14, 15, 18]], 1)[0]
     test_value = i(0x1000, 0xFFFF)
     test_cr = i(0x01, 0x0F)
     test_offset = i(0x00, 0xFF)
@@ -640,11 +640,13 @@ def srs_lr():
     assembler.lr(dest_reg, test_addr)
 
 def rti_cc():
-    assembler.call_cc(15, 66)
-    assembler.jmp_cc(15, 71)
+    assembler.call_cc(15, 'subroutine')
+    assembler.jmp_cc(15, 'after_ret')
+    assembler.label('subroutine')
     assembler.addi(0, 0x888)
     assembler.addi(1, 0x888)
     assembler.rti_cc(c(0, 15))
+    assembler.label('after_ret')
     assembler.addi(0, 0x999)
     assembler.addi(1, 0x999)
 
@@ -1129,20 +1131,126 @@ test_cases = [
     ext_ldaxnm,
 ]
 
-# if len(sys.argv) < 2:
-test_cases = [tc for tc in test_cases if tc.__name__.startswith(sys.argv[2]) or len(sys.argv) == 2]
-
-if len(test_cases) == 0:
-    print("No test cases matched the filter.")
-    exit(0)
-
-# check for compilation first
-for test_case in test_cases:
-    test_case()
-
-for test_case in test_cases:
-    count = getattr(test_case, 'count', 100)
-    print(f"Generating test case: {test_case.__name__} ({count} iterations)")
-    fuzz.send_to_wii(sys.argv[1], f"source/test/dsp/tests/{test_case.__name__}.bin", *fuzz.do_tests(test_case, count))
-
-print("All done!")
\ No newline at end of file
+TESTS_DIRECTORY = "source/test/dsp/tests"
+MANIFEST = f"{TESTS_DIRECTORY}/manifest.json"
+
+# per family: hash of the generator's source and the harness it runs in, the seed it was assembled with, the test count, and the
+# ranges of tests the console has already answered
+def load_manifest():
+    if not os.path.exists(MANIFEST):
+        return {}
+
+    with open(MANIFEST, 'r') as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    with open(f"{MANIFEST}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(f"{MANIFEST}.tmp", MANIFEST)
+
+# everything a family's tests depend on besides its own source. a change to any of it makes every
+# family's tests different, so they're all generated again
+HARNESS = [fuzz, assembler, coverage_guided, r, i, c]
+
+@functools.lru_cache(maxsize=None)
+def harness_source():
+    return ''.join(inspect.getsource(part) for part in HARNESS)
+
+def source_hash(test_case):
+    return hashlib.sha256((harness_source() + inspect.getsource(test_case)).encode()).hexdigest()
+
+def num_completed(entry):
+    return max((end for start, end in entry['completed']), default=0)
+
+# the same seed makes a resumed family assemble to exactly the same tests it had before
+def assemble_family(test_case, count, seed):
+    return fuzz.do_tests(test_case, count, seed)
+
+# families are assembled in worker processes ahead of time, and every target pulls the next assembled
+# family off the queue as soon as it's done with the previous one. with coverage set, every family is
+# sent in rounds by coverage_guided instead, with its count as the budget's baseline.
+def generate(test_cases, ips, coverage=False):
+    mode = 'coverage' if coverage else 'blind'
+    manifest = load_manifest()
+    manifest_lock = threading.Lock()
+    pending = queue.Queue()
+
+    with ProcessPoolExecutor() as assemblers:
+        for test_case in test_cases:
+            name = test_case.__name__
+            count = getattr(test_case, 'count', 100)
+            hash = source_hash(test_case)
+
+            entry = manifest.get(name)
+            if entry is None or entry['source_hash'] != hash or entry['count'] != count or entry.get('mode', 'blind') != mode:
+                entry = { 'source_hash': hash, 'seed': random.getrandbits(32), 'count': count, 'mode': mode, 'completed': [] }
+                manifest[name] = entry
+            elif num_completed(entry) == count:
+                if os.path.exists(f"{TESTS_DIRECTORY}/{name}.bin"):
+                    print(f"Skipping test case: {name} (up to date)")
+                    continue
+
+                entry['completed'] = []
+            elif coverage or not os.path.exists(f"{TESTS_DIRECTORY}/{name}.bin.partial"):
+                entry['completed'] = []
+
+            # coverage guided families assemble their tests round by round
+            if coverage:
+                pending.put((test_case, entry, None))
+            else:
+                pending.put((test_case, entry, assemblers.submit(assemble_family, test_case, count, entry['seed'])))
+
+        save_manifest(manifest)
+
+        def run_target(ip):
+            while True:
+                try:
+                    test_case, entry, assembled = pending.get_nowait()
+                except queue.Empty:
+                    return
+
+                if coverage:
+                    print(f"Generating test case: {test_case.__name__} (coverage guided, up to {entry['count'] * coverage_guided.BUDGET} iterations) on {ip}")
+                    finished = coverage_guided.generate_family(ip, f"{TESTS_DIRECTORY}/{test_case.__name__}.bin", test_case, entry['count'], entry['seed'])
+                    if finished is not None:
+                        with manifest_lock:
+                            # a coverage guided family is all or nothing, so it's complete as soon as it's written
+                            entry['completed'] = [[0, entry['count']]]
+                            entry['num_tests'], entry['num_covered'] = finished
+                            save_manifest(manifest)
+                    continue
+
+                first_test = num_completed(entry)
+                print(f"Generating test case: {test_case.__name__} ({entry['count']} iterations, resuming at {first_test}) on {ip}")
+
+                def on_batch_done(batch_start, batch_end):
+                    with manifest_lock:
+                        entry['completed'].append([batch_start, batch_end])
+                        save_manifest(manifest)
+
+                fuzz.send_to_wii(ip, f"{TESTS_DIRECTORY}/{test_case.__name__}.bin", *assembled.result(), first_test=first_test, on_batch_done=on_batch_done)
+
+        with ThreadPoolExecutor(max_workers=len(ips)) as targets:
+            list(targets.map(run_target, ips))
+
+if __name__ == "__main__":
+    # usage: test_generator.py [--coverage] <ip>[,<ip>...] [family prefix]
+    coverage = '--coverage' in sys.argv
+    if coverage:
+        sys.argv.remove('--coverage')
+
+    ips = sys.argv[1].split(',')
+
+    # if len(sys.argv) < 2:
+    test_cases = [tc for tc in test_cases if len(sys.argv) == 2 or tc.__name__.startswith(sys.argv[2])]
+
+    if len(test_cases) == 0:
+        print("No test cases matched the filter.")
+        exit(0)
+
+    # check for compilation first. every family gets its own program, since families reuse label names
+    for test_case in test_cases:
+        with assembler.using(assembler.Assembler()):
+            test_case()
+
+    generate(test_cases, ips, coverage)
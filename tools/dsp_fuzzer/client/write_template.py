@@ -0,0 +1,19 @@
+import struct
+import sys
+import fuzz
+
+# usage: write_template.py <output>
+# writes the single slot template the fuzzer runs a one word test in, for source/test/dsp/fuzz_runner.d to
+# patch the test vectors in source/test/dsp/tests into. all big endian u16s:
+#   test_case_index, test_case_length, 31 accumulator indices, iram_code_length, iram_code
+
+if __name__ == "__main__":
+    iram_code_bytes, iram_code_length, test_case_length, test_case_index, accumulator_indices, num_slots, slot_stride = fuzz.do_tests(lambda: fuzz.assembler.nop(), 1, num_slots=1)[:7]
+
+    with open(sys.argv[1], 'wb') as f:
+        f.write(struct.pack('>2H', test_case_index, test_case_length))
+        f.write(struct.pack('>31H', *accumulator_indices))
+        f.write(struct.pack('>H', iram_code_length))
+        f.write(bytes(iram_code_bytes))
+
+    print(f"Wrote a {iram_code_length} byte template to {sys.argv[1]}")
@@ -0,0 +1,174 @@
+import argparse
+import socketserver
+import struct
+import subprocess
+import threading
+
+# A stand-in for dsp_fuzzer/server that runs on the host. It speaks the same 0xBEEF / 0xBEF0 packet protocol
+# as server/source/main.c, patches every test case into the iram image the same way, and hands the image
+# to a backend instead of the console's DSP.
+
+HEADER_SIZE = 10
+
+# 0xBEF0 packets carry a template with num_slots tests slot_stride bytes apart, and 4 more header bytes
+SLOTS_HEADER_SIZE = 4
+
+# returns the initial register values as the results, for testing the protocol and the client
+class EchoBackend:
+    def run(self, iram_code, cases):
+        return [value for case in cases for value in case]
+
+# runs a long lived child process. for every boot the child gets on stdin:
+#   u16 iram_code_length, iram_code, u16 num_mails   (big endian)
+# and must answer on stdout with num_mails big endian u16 mailbox values, like the DSP would send them.
+# the emulator's child is source/test/dsp/fuzz_runner.d, built with `dub build --config=dsp-fuzz-runner`
+# and run with --command ./dsp_fuzz_runner. it exits when a boot halts or hangs, so a dead child is
+# started again on the next boot.
+class SubprocessBackend:
+    def __init__(self, command):
+        self.command = command
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        self.process = subprocess.Popen(self.command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def run(self, iram_code, cases):
+        # connections are served on their own threads, but there is only one child
+        with self.lock:
+            return self.run_locked(iram_code, cases)
+
+    def run_locked(self, iram_code, cases):
+        num_mails = 31 * len(cases)
+
+        if self.process.poll() is not None:
+            self.start()
+
+        self.process.stdin.write(struct.pack('>H', len(iram_code)))
+        self.process.stdin.write(iram_code)
+        self.process.stdin.write(struct.pack('>H', num_mails))
+        self.process.stdin.flush()
+
+        data = self.process.stdout.read(num_mails * 2)
+        if len(data) != num_mails * 2:
+            raise RuntimeError(f"backend returned {len(data)} bytes, expected {num_mails * 2}")
+
+        return list(struct.unpack(f'>{num_mails}H', data))
+
+def recv_exactly(rfile, num_bytes):
+    data = rfile.read(num_bytes)
+    if len(data) != num_bytes:
+        return None
+
+    return data
+
+class FuzzRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        print(f"Connection from {self.client_address[0]}:{self.client_address[1]}")
+
+        # like the console, keep answering packets until the client hangs up
+        while True:
+            header = recv_exactly(self.rfile, HEADER_SIZE)
+            if header is None:
+                print("Client closed the connection")
+                return
+
+            if not self.handle_packet(header):
+                return
+
+    def handle_packet(self, header):
+        magic, test_case_length, test_case_index, num_test_cases, iram_code_length = struct.unpack('>5H', header)
+        print(f"Received header: magic=0x{magic:04X}, test_case_length={test_case_length}, test_case_index={test_case_index}, num_test_cases={num_test_cases}, iram_code_length={iram_code_length}")
+
+        if magic == 0xBEEF:
+            num_slots, slot_stride = 1, 0
+        elif magic == 0xBEF0:
+            slots_header = recv_exactly(self.rfile, SLOTS_HEADER_SIZE)
+            if slots_header is None:
+                print("Failed to receive the slot layout")
+                return False
+
+            num_slots, slot_stride = struct.unpack('>2H', slots_header)
+            print(f"Slot layout: num_slots={num_slots}, slot_stride={slot_stride}")
+        else:
+            print(f"Invalid magic in header: 0x{magic:04X}")
+            return False
+
+        last_slot_offset = (num_slots - 1) * slot_stride
+        if iram_code_length > 8192 or num_slots == 0 or test_case_index + last_slot_offset + test_case_length > iram_code_length:
+            print(f"Invalid iram layout: iram_code_length={iram_code_length}, test_case_index={test_case_index}, test_case_length={test_case_length}, num_slots={num_slots}, slot_stride={slot_stride}")
+            return False
+
+        # every boot fills all num_slots slots, like main.c, so the client pads its packets to a whole number of boots
+        if num_test_cases % num_slots != 0:
+            print(f"Invalid test count: num_test_cases={num_test_cases} isn't a multiple of num_slots={num_slots}")
+            return False
+
+        remaining_bytes = iram_code_length + (31 * num_test_cases * 2) + (31 * 2) + (test_case_length * num_test_cases)
+        body = recv_exactly(self.rfile, remaining_bytes)
+        if body is None:
+            print("Failed to receive remaining data")
+            return False
+
+        offset = 0
+        iram_code = bytearray(body[offset:offset + iram_code_length])
+        offset += iram_code_length
+
+        test_cases_accumulators = struct.unpack_from(f'>{31 * num_test_cases}H', body, offset)
+        offset += 31 * num_test_cases * 2
+
+        test_cases_accumulator_indices = struct.unpack_from('>31H', body, offset)
+        offset += 31 * 2
+
+        test_cases_data = body[offset:]
+
+        # every initial value is written at its index in every slot, so all of those have to be in the iram too
+        for j, index in enumerate(test_cases_accumulator_indices):
+            if index + 2 + last_slot_offset > iram_code_length:
+                print(f"Invalid accumulator index: test_cases_accumulator_indices[{j}]={index}, num_slots={num_slots}, slot_stride={slot_stride}, iram_code_length={iram_code_length}")
+                return False
+
+        # every boot runs num_slots cases, one per slot
+        results = []
+        for first_case in range(0, num_test_cases, num_slots):
+            cases = []
+            for slot, i in enumerate(range(first_case, first_case + num_slots)):
+                slot_offset = slot * slot_stride
+                iram_code[test_case_index + slot_offset:test_case_index + slot_offset + test_case_length] = test_cases_data[i * test_case_length:(i + 1) * test_case_length]
+
+                case = test_cases_accumulators[i * 31:(i + 1) * 31]
+                for index, value in zip(test_cases_accumulator_indices, case):
+                    struct.pack_into('>H', iram_code, index + slot_offset, value)
+                cases.append(case)
+
+            results.extend(self.server.backend.run(bytes(iram_code), cases))
+
+        self.wfile.write(struct.pack(f'>{len(results)}H', *results))
+        return True
+
+class FuzzServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, backend):
+        super().__init__(address, FuzzRequestHandler)
+        self.backend = backend
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the DSP fuzz server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1234)
+    parser.add_argument('--backend', choices=['echo', 'subprocess'], default='echo')
+    parser.add_argument('--command', help="command to run for the subprocess backend")
+    args = parser.parse_args()
+
+    if args.backend == 'subprocess':
+        if args.command is None:
+            parser.error("--command is required for the subprocess backend")
+        backend = SubprocessBackend(args.command)
+    else:
+        backend = EchoBackend()
+
+    with FuzzServer((args.host, args.port), backend) as server:
+        print(f"Listening on {args.host}:{args.port} with the {args.backend} backend")
+        server.serve_forever()
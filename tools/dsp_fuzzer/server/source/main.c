@@ -9,6 +9,11 @@
 static lwp_t httd_handle = (lwp_t) NULL;
 
 void* httpd(void* arg);
+static void handle_connection(int csock);
+static bool handle_packet(int csock, u8* header);
+
+// 0xBEF0 packets carry a template with num_slots tests slot_stride bytes apart, and 4 more header bytes
+#define SLOTS_HEADER_SIZE 4
 
 static uint8_t ATTRIBUTE_ALIGN(32) iram_code[8192];
 int main(int argc, char** argv) {
@@ -90,172 +95,7 @@ void* httpd(void* arg) {
                     }
 
                     printf("Connecting port %d from %s\n", client.sin_port, inet_ntoa(client.sin_addr));
-                    
-                    // First read the header to get sizes
-                    u8 header[10];
-                    int header_received = net_recv(csock, header, 10, 0);
-                    
-                    if (header_received != 10) {
-                        printf("Failed to receive header: %d bytes\n", header_received);
-                        net_close(csock);
-                        continue;
-                    }
-                    
-                    // Parse header to get expected packet size
-                    u16 magic = (header[0] << 8) | header[1];
-                    u16 test_case_length = (header[2] << 8) | header[3];
-                    u16 test_case_index = (header[4] << 8) | header[5];
-                    u16 num_test_cases = (header[6] << 8) | header[7];
-                    u16 iram_code_length = (header[8] << 8) | header[9];
-                    printf("Received header: magic=0x%04X, test_case_length=%d, test_case_index=%d, num_test_cases=%d, iram_code_length=%d\n",
-                           magic, test_case_length, test_case_index, num_test_cases, iram_code_length);
-                    
-                    if (magic != 0xBEEF) {
-                        printf("Invalid magic in header: 0x%04X\n", magic);
-                        net_close(csock);
-                        continue;
-                    }
-                    
-                    int remaining_bytes = iram_code_length + (31 * num_test_cases * 2) + (31 * 2) + (test_case_length * num_test_cases);
-                    int total_size = 10 + remaining_bytes;
-                    
-                    printf("Expected total packet size: %d bytes\n", total_size);
-                    
-                    // Allocate buffer for full packet
-                    u8* full_packet = malloc(total_size);
-                    if (!full_packet) {
-                        printf("Failed to allocate %d bytes\n", total_size);
-                        net_close(csock);
-                        continue;
-                    }
-                    
-                    // Copy header to full packet
-                    memcpy(full_packet, header, 10);
-                    
-                    // Read remaining data
-                    int total_received = 10;
-                    while (total_received < total_size) {
-                        int bytes_received = net_recv(csock, full_packet + total_received, total_size - total_received, 0);
-                        if (bytes_received <= 0) {
-                            printf("Failed to receive remaining data: %d\n", bytes_received);
-                            break;
-                        }
-
-                        total_received += bytes_received;
-                    }
-                    
-                    if (total_received == total_size) {
-                        printf("Received complete packet: %d bytes\n", total_size);
-                        
-                        if (total_received < 10) {
-                            printf("Packet too short: %d bytes\n", total_size);
-                            return;
-                        }
-
-                        int offset = 0;
-                        
-                        u16 magic = (full_packet[offset] << 8) | full_packet[offset + 1];
-                        offset += 2;
-                        
-                        if (magic != 0xBEEF) {
-                            printf("Invalid magic: 0x%04X\n", magic);
-                            return;
-                        }
-
-                        u16 test_case_length = (full_packet[offset] << 8) | full_packet[offset + 1];
-                        offset += 2;
-                        
-                        u16 test_case_index = (full_packet[offset] << 8) | full_packet[offset + 1];
-                        offset += 2;
-                        
-                        u16 num_test_cases = (full_packet[offset] << 8) | full_packet[offset + 1];
-                        offset += 2;
-                        
-                        u16 iram_code_length = (full_packet[offset] << 8) | full_packet[offset + 1];
-                        offset += 2;
-
-                        int expected_length = 10 + iram_code_length + (31 * num_test_cases * 2) + (31 * 2) + (test_case_length * num_test_cases);
-                        if (total_size != expected_length) {
-                            printf("Invalid packet length: %d (expected %d)\n", total_size, expected_length);
-                            return;
-                        }
-
-                        u8* iram_code_unaligned = &full_packet[offset];
-                        offset += iram_code_length;
-                        memcpy(iram_code, iram_code_unaligned, iram_code_length);
-                        
-                        u16* test_cases_accumulators = (u16*)&full_packet[offset];
-                        offset += 31 * num_test_cases * 2;
-                        
-                        u16* test_cases_accumulator_indices = (u16*)&full_packet[offset];
-                        offset += 31 * 2;
-                        
-                        u8* test_cases_data = &full_packet[offset];
-                        
-                        printf("Parsed DSP command:\n");
-                        printf("  test_case_length: %d\n", test_case_length);
-                        printf("  test_case_index: %d\n", test_case_index);
-                        printf("  num_test_cases: %d\n", num_test_cases);
-                        printf("  iram_code_length: %d\n", iram_code_length);
-
-                        u16* result_data = malloc(31 * 2 * num_test_cases);
-                        dsptask_t task;
-
-                        int kkk = 0;
-                        for (int i = 0; i < num_test_cases; i++) {
-                            DSP_Init();
-                            AUDIO_Init(NULL);
-                            AUDIO_StopDMA();
-                            AUDIO_SetDSPSampleRate(AI_SAMPLERATE_48KHZ);
-                            DSP_Reset();
-
-                            memset(&task, 0, sizeof(dsptask_t));
-                            memcpy(&iram_code[test_case_index], &test_cases_data[i * test_case_length], test_case_length);
-                            
-                            // printf the first few bytes iram code for debugging
-                            // for (int j = 0; j < (iram_code_length < 16 ? iram_code_length : 16); j++) {
-                                // printf("%02X ", iram_code[j]);
-                            // }
-
-                            for (int j = 0; j < 31; j++) {
-                                uint16_t idx = test_cases_accumulator_indices[j];
-                                uint16_t acc = test_cases_accumulators[i * 31 + j];
-                                memcpy(&iram_code[idx], &acc, 2);
-                            }
-                            task.prio = 255;
-                            task.iram_maddr = (void*)MEM_VIRTUAL_TO_PHYSICAL(iram_code);
-                            task.iram_len = iram_code_length;
-                            task.iram_addr = 0x0000;
-                            task.dram_maddr = (void*)MEM_VIRTUAL_TO_PHYSICAL(0x80000000);
-                            task.dram_len = 8192;
-                            task.dram_addr = 0x0000;
-                            task.init_vec = 0;
-                            task.res_cb = NULL;
-                            task.req_cb = NULL;
-                            task.init_cb = NULL;
-                            task.done_cb = NULL;
-
-		                    DCFlushRange(iram_code, iram_code_length);
-                            DSP_AddTask(&task);
-
-                            for (int j = 0; j < 31; j++) {
-                                printf("%x\n", j);
-                                while(!DSP_CheckMailFrom());
-                                uint32_t mb = DSP_ReadMailFrom();
-                                
-                                result_data[i * 31 + j] = mb & 0xFFFF;
-                            }
-                            printf("Test case %d done\n", i + 1);
-                        }
-                        
-                        net_send(csock, result_data, 31 * 2 * num_test_cases, 0);
-                        free(result_data);
-                    } else {
-                        printf("Incomplete packet: %d/%d bytes\n", total_received, total_size);
-                    }
-                    
-                    free(full_packet);
-
+                    handle_connection(csock);
                     net_close(csock);
                 }
             }
@@ -264,3 +104,222 @@ void* httpd(void* arg) {
 
     return NULL;
 }
+
+// net_recv may return less than asked for, especially when the client pipelines packets
+static int recv_all(int csock, u8* buffer, int length) {
+    int total_received = 0;
+    while (total_received < length) {
+        int bytes_received = net_recv(csock, buffer + total_received, length - total_received, 0);
+        if (bytes_received <= 0) {
+            return bytes_received;
+        }
+
+        total_received += bytes_received;
+    }
+
+    return total_received;
+}
+
+static int send_all(int csock, u8* buffer, int length) {
+    int total_sent = 0;
+    while (total_sent < length) {
+        int bytes_sent = net_send(csock, buffer + total_sent, length - total_sent, 0);
+        if (bytes_sent <= 0) {
+            return bytes_sent;
+        }
+
+        total_sent += bytes_sent;
+    }
+
+    return total_sent;
+}
+
+// a connection carries any number of packets back to back, each one answered in order. clients
+// that send a single packet and close the socket work exactly as before.
+static void handle_connection(int csock) {
+    while (true) {
+        // First read the header to get sizes
+        u8 header[10];
+        int header_received = recv_all(csock, header, 10);
+
+        if (header_received == 0) {
+            printf("Client closed the connection\n");
+            return;
+        }
+
+        if (header_received != 10) {
+            printf("Failed to receive header: %d bytes\n", header_received);
+            return;
+        }
+
+        if (!handle_packet(csock, header)) {
+            return;
+        }
+    }
+}
+
+static bool handle_packet(int csock, u8* header) {
+    // Parse header to get expected packet size
+    u16 magic = (header[0] << 8) | header[1];
+    u16 test_case_length = (header[2] << 8) | header[3];
+    u16 test_case_index = (header[4] << 8) | header[5];
+    u16 num_test_cases = (header[6] << 8) | header[7];
+    u16 iram_code_length = (header[8] << 8) | header[9];
+    printf("Received header: magic=0x%04X, test_case_length=%d, test_case_index=%d, num_test_cases=%d, iram_code_length=%d\n",
+           magic, test_case_length, test_case_index, num_test_cases, iram_code_length);
+    
+    int header_size = 10;
+    u16 num_slots = 1;
+    u16 slot_stride = 0;
+    if (magic == 0xBEF0) {
+        u8 slots_header[SLOTS_HEADER_SIZE];
+        if (recv_all(csock, slots_header, SLOTS_HEADER_SIZE) != SLOTS_HEADER_SIZE) {
+            printf("Failed to receive the slot layout\n");
+            return false;
+        }
+
+        num_slots = (slots_header[0] << 8) | slots_header[1];
+        slot_stride = (slots_header[2] << 8) | slots_header[3];
+        header_size += SLOTS_HEADER_SIZE;
+        printf("Slot layout: num_slots=%d, slot_stride=%d\n", num_slots, slot_stride);
+    } else if (magic != 0xBEEF) {
+        printf("Invalid magic in header: 0x%04X\n", magic);
+        return false;
+    }
+
+    // u32, so a bogus num_slots and slot_stride can't overflow their way past the check
+    u32 last_slot_offset = (u32)(num_slots - 1) * slot_stride;
+    if (iram_code_length > sizeof(iram_code) || num_slots == 0 || test_case_index + last_slot_offset + test_case_length > iram_code_length) {
+        printf("Invalid iram layout: iram_code_length=%d, test_case_index=%d, test_case_length=%d, num_slots=%d, slot_stride=%d\n",
+               iram_code_length, test_case_index, test_case_length, num_slots, slot_stride);
+        return false;
+    }
+
+    // every boot fills all num_slots slots. a slot left out would still hold the last boot's test and send
+    // 31 mails nobody reads, so the client pads its packets to a whole number of boots
+    if (num_test_cases % num_slots != 0) {
+        printf("Invalid test count: num_test_cases=%d isn't a multiple of num_slots=%d\n", num_test_cases, num_slots);
+        return false;
+    }
+    
+    int remaining_bytes = iram_code_length + (31 * num_test_cases * 2) + (31 * 2) + (test_case_length * num_test_cases);
+    int total_size = header_size + remaining_bytes;
+    
+    printf("Expected total packet size: %d bytes\n", total_size);
+    
+    // Allocate buffer for full packet
+    u8* full_packet = malloc(total_size);
+    if (!full_packet) {
+        printf("Failed to allocate %d bytes\n", total_size);
+        return false;
+    }
+    
+    // Copy header to full packet
+    memcpy(full_packet, header, 10);
+    
+    // Read remaining data
+    int bytes_received = recv_all(csock, full_packet + header_size, remaining_bytes);
+    if (bytes_received != remaining_bytes) {
+        printf("Failed to receive remaining data: %d\n", bytes_received);
+        free(full_packet);
+        return false;
+    }
+
+    printf("Received complete packet: %d bytes\n", total_size);
+
+    int offset = header_size;
+
+    u8* iram_code_unaligned = &full_packet[offset];
+    offset += iram_code_length;
+    memcpy(iram_code, iram_code_unaligned, iram_code_length);
+    
+    u16* test_cases_accumulators = (u16*)&full_packet[offset];
+    offset += 31 * num_test_cases * 2;
+    
+    u16* test_cases_accumulator_indices = (u16*)&full_packet[offset];
+    offset += 31 * 2;
+    
+    u8* test_cases_data = &full_packet[offset];
+
+    // every initial value is written at its index in every slot, so all of those have to be in the iram too
+    for (int j = 0; j < 31; j++) {
+        if (test_cases_accumulator_indices[j] + 2 + last_slot_offset > iram_code_length) {
+            printf("Invalid accumulator index: test_cases_accumulator_indices[%d]=%d, num_slots=%d, slot_stride=%d, iram_code_length=%d\n",
+                   j, test_cases_accumulator_indices[j], num_slots, slot_stride, iram_code_length);
+            free(full_packet);
+            return false;
+        }
+    }
+    
+    printf("Parsed DSP command:\n");
+    printf("  test_case_length: %d\n", test_case_length);
+    printf("  test_case_index: %d\n", test_case_index);
+    printf("  num_test_cases: %d\n", num_test_cases);
+    printf("  iram_code_length: %d\n", iram_code_length);
+    printf("  num_slots: %d\n", num_slots);
+    printf("  slot_stride: %d\n", slot_stride);
+
+    u16* result_data = malloc(31 * 2 * num_test_cases);
+    dsptask_t task;
+
+    // every boot runs num_slots cases, one per slot, and the DSP sends all of their results in order
+    for (int i = 0; i < num_test_cases; i += num_slots) {
+        DSP_Init();
+        AUDIO_Init(NULL);
+        AUDIO_StopDMA();
+        AUDIO_SetDSPSampleRate(AI_SAMPLERATE_48KHZ);
+        DSP_Reset();
+
+        memset(&task, 0, sizeof(dsptask_t));
+        for (int slot = 0; slot < num_slots; slot++) {
+            int slot_offset = slot * slot_stride;
+            memcpy(&iram_code[test_case_index + slot_offset], &test_cases_data[(i + slot) * test_case_length], test_case_length);
+
+            for (int j = 0; j < 31; j++) {
+                uint16_t idx = test_cases_accumulator_indices[j];
+                uint16_t acc = test_cases_accumulators[(i + slot) * 31 + j];
+                memcpy(&iram_code[idx + slot_offset], &acc, 2);
+            }
+        }
+        
+        // printf the first few bytes iram code for debugging
+        // for (int j = 0; j < (iram_code_length < 16 ? iram_code_length : 16); j++) {
+            // printf("%02X ", iram_code[j]);
+        // }
+        task.prio = 255;
+        task.iram_maddr = (void*)MEM_VIRTUAL_TO_PHYSICAL(iram_code);
+        task.iram_len = iram_code_length;
+        task.iram_addr = 0x0000;
+        task.dram_maddr = (void*)MEM_VIRTUAL_TO_PHYSICAL(0x80000000);
+        task.dram_len = 8192;
+        task.dram_addr = 0x0000;
+        task.init_vec = 0;
+        task.res_cb = NULL;
+        task.req_cb = NULL;
+        task.init_cb = NULL;
+        task.done_cb = NULL;
+
+        DCFlushRange(iram_code, iram_code_length);
+        DSP_AddTask(&task);
+
+        for (int j = 0; j < 31 * num_slots; j++) {
+            printf("%x\n", j % 31);
+            while(!DSP_CheckMailFrom());
+            uint32_t mb = DSP_ReadMailFrom();
+            
+            result_data[i * 31 + j] = mb & 0xFFFF;
+        }
+        printf("Test cases %d to %d done\n", i + 1, i + num_slots);
+    }
+    
+    int bytes_sent = send_all(csock, (u8*) result_data, 31 * 2 * num_test_cases);
+    free(result_data);
+    free(full_packet);
+
+    if (bytes_sent != 31 * 2 * num_test_cases) {
+        printf("Failed to send results: %d\n", bytes_sent);
+        return false;
+    }
+
+    return true;
+}
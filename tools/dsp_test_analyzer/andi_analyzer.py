@@ -1,39 +1,31 @@
 import sys
+import dsp_math
+import numpy as np
 import test_analyzer
 
-def unsigned_24bit_to_signed(val):
-    if val & 0x800000:
-        val -= 0x1000000
-    return val
-
-print(unsigned_24bit_to_signed(0xffffff))
-
 test_file = test_analyzer.parse_test_file(sys.argv[1])
 
-num_failures = 0
-
-for test_case in test_file.test_cases:
-    expected_ac = test_case.expected_state.ac_full((test_case.instructions[0] >> 8) & 1)
-    expected_ac_md = test_case.expected_state.ac_md((test_case.instructions[0] >> 8) & 1)
-    original_s32 = (test_case.initial_state.sr() >> 4) & 1
-    exepcted_s32 = (test_case.expected_state.sr() >> 4) & 1
+initial = test_file.initial_state
+expected = test_file.expected_state
+accumulator = dsp_math.accumulator_index(test_file.instructions)
 
-    actual_s32 = (expected_ac >> 31) != 0 and (expected_ac >> 31) != 0x1ff
+expected_ac = expected.ac_full(accumulator)
+expected_ac_md = expected.ac_md(accumulator)
+original_s32 = dsp_math.sr_flag(initial.sr(), dsp_math.SR_ABOVE_S32)
+expected_s32 = dsp_math.sr_flag(expected.sr(), dsp_math.SR_ABOVE_S32)
 
-    if actual_s32 != exepcted_s32:
-        num_failures += 1
-        print("  Failure!")
-        print(f"    Original S32: {original_s32}")
-        print(f"    Expected S32: {exepcted_s32}")
-        print(f"    Actual S32:   {actual_s32}")
-        print(f"    Expected Acc: {expected_ac:010x}")
-        print(f"    Expected Acc MD: {expected_ac_md:010x}")
-        print(f"    shift by 31: {expected_ac >> 31:010x}")
+# the top nine bits aren't all the same, so the value doesn't fit in an s32
+actual_s32 = ((expected_ac >> 31) != 0) & ((expected_ac >> 31) != 0x1ff)
 
+failures = actual_s32 != expected_s32
 
-    # if exepcted_s32:
-        # print("yes: " + hex(expected_ac) + " md: " + hex(expected_ac_md))
-    # else:
-        # print("no:  " + hex(expected_ac) + " md: " + hex(expected_ac_md))
+for i in np.flatnonzero(failures):
+    print("  Failure!")
+    print(f"    Original S32: {original_s32[i]}")
+    print(f"    Expected S32: {expected_s32[i]}")
+    print(f"    Actual S32:   {actual_s32[i]}")
+    print(f"    Expected Acc: {expected_ac[i]:010x}")
+    print(f"    Expected Acc MD: {expected_ac_md[i]:010x}")
+    print(f"    shift by 31: {expected_ac[i] >> 31:010x}")
 
-print(f"Total Failures: {num_failures} / {len(test_file.test_cases)}")
+print(f"Total Failures: {np.count_nonzero(failures)} / {len(test_file.test_cases)}")
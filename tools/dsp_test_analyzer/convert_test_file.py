@@ -0,0 +1,22 @@
+import sys
+import test_file_v2
+
+# usage: convert_test_file.py [--deflate] <input> <output>
+# converts a v1 .bin from dsp_fuzzer to the columnar v2 format, or a v2 file back to v1 for
+# source/test/dsp/test.d, which only reads v1.
+
+if __name__ == "__main__":
+    deflate = '--deflate' in sys.argv
+    if deflate:
+        sys.argv.remove('--deflate')
+
+    input_filename, output_filename = sys.argv[1], sys.argv[2]
+
+    if test_file_v2.is_v2(input_filename):
+        test_file = test_file_v2.TestFileV2(input_filename)
+        test_file_v2.write_v1(output_filename, test_file.instruction_length, test_file.instructions(), test_file.expected(), test_file.initial())
+        print(f"Converted {test_file.num_cases} test cases in {input_filename} to v1")
+    else:
+        instruction_length, instructions, expected, initial = test_file_v2.read_v1(input_filename)
+        test_file_v2.write_v2(output_filename, instruction_length, instructions, expected, initial, deflate)
+        print(f"Converted {len(initial)} test cases in {input_filename} to v2{' (deflated)' if deflate else ''}")
@@ -0,0 +1,48 @@
+import numpy as np
+
+# DSP arithmetic on int64 columns from test_analyzer, one value per test case. everything works on
+# plain python ints too. 40 bit values stay well inside int64, and negative intermediates wrap the same
+# way python's big ints do once they're masked.
+
+MASK_40 = (1 << 40) - 1
+
+SR_CARRY     = 0
+SR_OVERFLOW  = 1
+SR_ZERO      = 2
+SR_SIGN      = 3
+SR_ABOVE_S32 = 4
+
+def wrap(value, bits=40):
+    return value & ((1 << bits) - 1)
+
+def add(a, b, bits=40):
+    return wrap(a + b, bits)
+
+# a - b as the DSP does it, a + ~b + 1
+def sub(a, b, bits=40):
+    return wrap(a + wrap(~b, bits) + 1, bits)
+
+def carry_out(sum, bits=40):
+    return (sum >> bits) & 1
+
+def overflow_from(a, b, sum, bits):
+    a   = wrap(a, bits)
+    b   = wrap(b, bits)
+    sum = wrap(sum, bits)
+
+    return ((a ^ sum) & (b ^ sum) & (1 << (bits - 1))) >> (bits - 1)
+
+def sign_extend(value, bits):
+    sign = 1 << (bits - 1)
+    return (wrap(value, bits) ^ sign) - sign
+
+# the product register as the analyzers have always assembled it, with both middle parts at bit 16
+def product(prod_hi, prod_m1, prod_m2, prod_lo):
+    return (prod_hi << 32) + (prod_m1 << 16) + (prod_m2 << 16) + prod_lo
+
+def sr_flag(sr, bit):
+    return (sr >> bit) & 1
+
+# the accumulator an instruction works on, from bit 8 of its first word
+def accumulator_index(instructions):
+    return (np.asarray(instructions)[..., 0] >> 8) & 1
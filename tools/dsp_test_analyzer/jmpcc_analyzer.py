@@ -1,28 +1,25 @@
 import sys
+import dsp_math
+import numpy as np
 import test_analyzer
 
-def unsigned_24bit_to_signed(val):
-    if val & 0x800000:
-        val -= 0x1000000
-    return val
-
-print(unsigned_24bit_to_signed(0xffffff))
-
 test_file = test_analyzer.parse_test_file(sys.argv[1])
 
-num_failures = 0
+initial = test_file.initial_state
+expected = test_file.expected_state
+accumulator = dsp_math.accumulator_index(test_file.instructions)
+
+condition = test_file.instructions[:, 0] & 0xf
+original_ac0 = initial.ac_full(accumulator) & 0xffffffff
+expected_ac0 = expected.ac_full(accumulator) & 0xffffffff
+sr = initial.sr()
 
-for test_case in test_file.test_cases:
-    condition = (test_case.instructions[0] >> 0) & 0xf
-    original_ac0 = test_case.initial_state.ac_full((test_case.instructions[0] >> 8) & 1) & 0xffffffff
-    expected_ac0 = test_case.expected_state.ac_full((test_case.instructions[0] >> 8) & 1) & 0xffffffff
-    sr = test_case.initial_state.sr()
-    
-    o = (sr >> 1) & 1
-    s = (sr >> 3) & 1
-    z = (sr >> 2) & 1
+o = dsp_math.sr_flag(sr, dsp_math.SR_OVERFLOW)
+s = dsp_math.sr_flag(sr, dsp_math.SR_SIGN)
+z = dsp_math.sr_flag(sr, dsp_math.SR_ZERO)
+result = (original_ac0 == expected_ac0).astype(np.int64)
 
-    if condition == 3:
-        print(f" result: {1 if original_ac0 == expected_ac0 else 0}     o: {o} s: {s} z: {z}")
+for i in np.flatnonzero(condition == 3):
+    print(f" result: {result[i]}     o: {o[i]} s: {s[i]} z: {z[i]}")
 
-print(f"Total Failures: {num_failures} / {len(test_file.test_cases)}")
+print(f"Total Failures: 0 / {len(test_file.test_cases)}")
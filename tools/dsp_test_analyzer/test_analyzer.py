@@ -1,45 +1,69 @@
-import struct
-from typing import List
+import numpy as np
+import test_file_v2
 
+NUM_REGISTERS = 31
+
+# every DSP register but 18 is in the files, so the ones above it are one column further left. there's no
+# column for 18 at all, and asking for it would otherwise read SR from column 18
+def register_column(register):
+    register = np.asarray(register)
+    if (register == 18).any():
+        raise ValueError("register 18 isn't in the test files")
+
+    return register - (register > 18)
+
+# the registers of a single test case, or of every test case at once. with a single case the accessors
+# return python ints, otherwise int64 arrays with one value per case. index arguments may be arrays with
+# one index per case too, like (instructions[:, 0] >> 8) & 1.
 class DspTestState:
-    def __init__(self):
-        self.reg = [0] * 32
-    
+    def __init__(self, registers):
+        self.registers = registers
+
+    def reg(self, register):
+        column = register_column(register)
+        if self.registers.ndim == 1:
+            return int(self.registers[column])
+
+        if np.ndim(column) == 0:
+            return self.registers[:, column].astype(np.int64)
+
+        return np.take_along_axis(self.registers, np.asarray(column)[:, np.newaxis], axis=1)[:, 0].astype(np.int64)
+
     def prod_lo(self):
-        return self.reg[20]
+        return self.reg(20)
 
     def prod_m1(self):
-        return self.reg[21]
+        return self.reg(21)
 
     def prod_m2(self):
-        return self.reg[23]
+        return self.reg(23)
 
     def prod_hi(self):
-        return self.reg[22] & 0xff
+        return self.reg(22) & 0xff
 
     def prod(self):
         return (self.prod_hi() << 32) + (self.prod_m2() << 16) + (self.prod_m1() << 16) + self.prod_lo()
-    
+
     def ac_lo(self, index):
-        return self.reg[28 + index]
-    
+        return self.reg(28 + index)
+
     def ac_md(self, index):
-        return self.reg[30 + index]
-    
+        return self.reg(30 + index)
+
     def ac_hi(self, index):
-        return self.reg[16 + index] & 0xff
+        return self.reg(16 + index) & 0xff
 
     def ac_full(self, index):
         return (self.ac_hi(index) << 32) | (self.ac_md(index) << 16) | self.ac_lo(index)
 
     def ax_hi(self, index):
-        return self.reg[26 + index]
+        return self.reg(26 + index)
 
     def ax_lo(self, index):
-        return self.reg[24 + index]
+        return self.reg(24 + index)
 
     def sr(self):
-        return self.reg[19]
+        return self.reg(19)
 
 class DspTestCase:
     def __init__(self, instructions, initial_state, expected_state):
@@ -47,50 +71,61 @@ class DspTestCase:
         self.initial_state = initial_state
         self.expected_state = expected_state
 
+# a view of one record at a time, for the analyzers that go through the cases one by one
+class DspTestCases:
+    def __init__(self, records):
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        record = self.records[index]
+        return DspTestCase(record['instructions'].tolist(), DspTestState(record['initial']), DspTestState(record['expected']))
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+# records has one entry per case with fields instructions, expected[31] and initial[31], laid out like
+# the v1 file itself. instructions, initial_state and expected_state cover every case at once.
 class DspTestFile:
-    def __init__(self):
-        self.instruction_length = 0
-        self.test_cases = []
+    def __init__(self, instruction_length, records):
+        self.instruction_length = instruction_length
+        self.records = records
+        self.instructions = records['instructions']
+        self.initial_state = DspTestState(records['initial'])
+        self.expected_state = DspTestState(records['expected'])
+        self.test_cases = DspTestCases(records)
+
+def record_dtype(instruction_length):
+    return np.dtype([
+        ('instructions', '<u2', (instruction_length // 2,)),
+        ('expected',     '<u2', (NUM_REGISTERS,)),
+        ('initial',      '<u2', (NUM_REGISTERS,)),
+    ])
+
+def parse_v2_test_file(filepath: str) -> DspTestFile:
+    v2 = test_file_v2.TestFileV2(filepath)
+
+    records = np.zeros(v2.num_cases, dtype=record_dtype(v2.instruction_length))
+    records['instructions'] = v2.instructions()
+    records['expected'] = v2.expected()
+    records['initial'] = v2.initial()
+
+    return DspTestFile(v2.instruction_length, records)
 
 def parse_test_file(filepath: str) -> DspTestFile:
-    test_file = DspTestFile()
-    
+    if test_file_v2.is_v2(filepath):
+        return parse_v2_test_file(filepath)
+
     with open(filepath, 'rb') as f:
         file_data = f.read()
-    
-    offset = 0
-    
-    # Read instruction length (u16)
-    test_file.instruction_length = struct.unpack('<H', file_data[offset:offset + 2])[0]
-    offset += 2
-    
-    # Parse test cases
-    while offset + test_file.instruction_length + (31 * 2 * 2) <= len(file_data):
-        test_case = DspTestCase([], DspTestState(), DspTestState())
-        
-        # Read instructions
-        instructions_bytes = file_data[offset:offset + test_file.instruction_length]
-        test_case.instructions = list(struct.unpack(f'<{test_file.instruction_length // 2}H', instructions_bytes))
-        offset += test_file.instruction_length
-        
-        # Read expected state (31 u16 values)
-        for i in range(32):
-            if i == 18:
-                test_case.expected_state.reg[i] = 0
-                continue
-
-            test_case.expected_state.reg[i] = struct.unpack('<H', file_data[offset:offset + 2])[0]
-            offset += 2
-        
-        # Read initial state (31 u16 values)  
-        for i in range(32):
-            if i == 18:
-                test_case.expected_state.reg[i] = 0
-                continue
-
-            test_case.initial_state.reg[i] = struct.unpack('<H', file_data[offset:offset + 2])[0]
-            offset += 2
-        
-        test_file.test_cases.append(test_case)
-    
-    return test_file
\ No newline at end of file
+
+    instruction_length = int.from_bytes(file_data[0:2], 'little')
+    dtype = record_dtype(instruction_length)
+
+    # like the old reader, a truncated record at the end is ignored
+    num_cases = (len(file_data) - 2) // dtype.itemsize
+    records = np.frombuffer(file_data, dtype=dtype, count=num_cases, offset=2)
+
+    return DspTestFile(instruction_length, records)
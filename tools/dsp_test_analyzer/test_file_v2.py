@@ -0,0 +1,124 @@
+import mmap
+import struct
+import zlib
+import numpy as np
+
+# the v1 .bin written by dsp_fuzzer is a stream of [instructions][31 expected][31 initial] records, so
+# a reader has to walk the whole file. v2 stores the same u16s column by column instead, with a section
+# table up front, so one register can be loaded on its own and, uncompressed, case n can be read straight
+# out of an mmap. everything is little endian.
+#
+#   header:   magic "DSPT", u16 version, u16 flags, u16 instruction_length (bytes), u16 reserved, u32 num_cases
+#   sections: u32 offset, u32 stored size for every column, in order:
+#               instruction word 0 .. instruction_length / 2 - 1
+#               initial register 0 .. 30
+#               expected register 0 .. 30
+#   columns:  num_cases u16s each, deflated separately when FLAG_DEFLATE is set
+#
+# like v1, the 31 registers are every DSP register except 18.
+
+MAGIC = b'DSPT'
+VERSION = 2
+
+FLAG_DEFLATE = 1
+
+HEADER = struct.Struct('<4sHHHHI')
+SECTION = struct.Struct('<II')
+
+NUM_REGISTERS = 31
+
+def is_v2(filename):
+    with open(filename, 'rb') as f:
+        return f.read(4) == MAGIC
+
+# returns instruction_length and the (num_cases, words) instructions and (num_cases, 31) expected and initial arrays
+def read_v1(filename):
+    with open(filename, 'rb') as f:
+        data = f.read()
+
+    instruction_length = struct.unpack_from('<H', data, 0)[0]
+    record_words = instruction_length // 2 + NUM_REGISTERS * 2
+    num_cases = (len(data) - 2) // (record_words * 2)
+
+    records = np.frombuffer(data, dtype='<u2', count=num_cases * record_words, offset=2).reshape(num_cases, record_words)
+    words = instruction_length // 2
+    return instruction_length, records[:, :words], records[:, words:words + NUM_REGISTERS], records[:, words + NUM_REGISTERS:]
+
+def write_v1(filename, instruction_length, instructions, expected, initial):
+    with open(filename, 'wb') as f:
+        f.write(struct.pack('<H', instruction_length))
+        f.write(np.hstack([instructions, expected, initial]).astype('<u2').tobytes())
+
+def write_v2(filename, instruction_length, instructions, expected, initial, deflate=False):
+    num_cases = len(initial)
+    columns = list(np.asarray(instructions).reshape(num_cases, instruction_length // 2).T) + list(np.asarray(initial).T) + list(np.asarray(expected).T)
+
+    stored = []
+    for column in columns:
+        data = np.ascontiguousarray(column, dtype='<u2').tobytes()
+        stored.append(zlib.compress(data, 9) if deflate else data)
+
+    offset = HEADER.size + SECTION.size * len(columns)
+    sections = []
+    for data in stored:
+        sections.append(SECTION.pack(offset, len(data)))
+        offset += len(data)
+
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, FLAG_DEFLATE if deflate else 0, instruction_length, 0, num_cases))
+        f.write(b''.join(sections))
+        f.write(b''.join(stored))
+
+class TestFileV2:
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            self.file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.flags, self.instruction_length, _, self.num_cases = HEADER.unpack_from(self.file, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filename} is not a v{VERSION} test file")
+
+        self.num_words = self.instruction_length // 2
+        num_columns = self.num_words + NUM_REGISTERS * 2
+        self.sections = [SECTION.unpack_from(self.file, HEADER.size + SECTION.size * i) for i in range(num_columns)]
+
+    def is_deflated(self):
+        return self.flags & FLAG_DEFLATE != 0
+
+    # zero copy into the mmap when the file isn't deflated
+    def column(self, index):
+        offset, size = self.sections[index]
+        if self.is_deflated():
+            return np.frombuffer(zlib.decompress(self.file[offset:offset + size]), dtype='<u2')
+
+        return np.frombuffer(self.file, dtype='<u2', count=self.num_cases, offset=offset)
+
+    def instruction_word(self, word):
+        return self.column(word)
+
+    def initial_register(self, register):
+        return self.column(self.num_words + register)
+
+    def expected_register(self, register):
+        return self.column(self.num_words + NUM_REGISTERS + register)
+
+    def instructions(self):
+        return np.stack([self.instruction_word(word) for word in range(self.num_words)], axis=1).reshape(self.num_cases, self.num_words)
+
+    def initial(self):
+        return np.stack([self.initial_register(register) for register in range(NUM_REGISTERS)], axis=1)
+
+    def expected(self):
+        return np.stack([self.expected_register(register) for register in range(NUM_REGISTERS)], axis=1)
+
+    # returns the instructions, expected and initial values of case n. uncompressed this only touches the
+    # 31 * 2 + words u16s that belong to it
+    def case(self, n):
+        if not 0 <= n < self.num_cases:
+            raise IndexError(f"case {n} is out of range, the file has {self.num_cases}")
+
+        if self.is_deflated():
+            return self.instructions()[n], self.expected()[n], self.initial()[n]
+
+        values = [struct.unpack_from('<H', self.file, offset + n * 2)[0] for offset, size in self.sections]
+        return values[:self.num_words], values[self.num_words + NUM_REGISTERS:], values[self.num_words:self.num_words + NUM_REGISTERS]
@@ -0,0 +1,186 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/dsp_codegen")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/dsp_fuzzer/client")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/dsp_fuzzer/local_server")
+
+from concurrent.futures import ThreadPoolExecutor
+import assembler
+import disassembler
+import fuzz
+import local_server
+import numpy as np
+import test_analyzer
+import threading
+
+# shrinks a failing test case down to the inputs that matter. the case is run on a reference (the console)
+# and a candidate, and input registers and immediate operands are zeroed or simplified for as long as the
+# two still disagree.
+#
+# the candidate has to speak the fuzz protocol too. that's a local_server, a second console, or the emulator:
+# a candidate of "emulator" starts a local_server in here on the emulator's fuzz runner (built with
+# `dub build --config=dsp-fuzz-runner`), and "emulator=<command>" runs that command as the runner instead.
+#
+# usage: test_reducer.py <test file> <case index> <reference ip> <candidate ip[:port] | emulator[=<command>]> [output file]
+
+# where dub leaves the emulator's fuzz runner
+DEFAULT_RUNNER = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + "/dsp_fuzz_runner"
+
+# returns the ip[:port] to run the candidate's tests on, starting a local_server on the emulator if it's asked for
+def start_candidate(candidate):
+    if candidate != "emulator" and not candidate.startswith("emulator="):
+        return candidate
+
+    command = candidate[len("emulator="):] or DEFAULT_RUNNER
+    server = local_server.FuzzServer(('127.0.0.1', 0), local_server.SubprocessBackend(command))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"127.0.0.1:{server.server_address[1]}"
+
+# a value is simpler than another if it has fewer bits set, or the same number of bits and is smaller
+def complexity(value):
+    return bin(value).count('1'), value
+
+def simpler_values(value):
+    candidates = { 0, 1, value & 0x8000, value & 0xff00, value & 0x00ff, value >> 1 }
+    candidates |= { value & ~(1 << bit) for bit in range(16) if value & (1 << bit) }
+    return sorted((candidate for candidate in candidates if complexity(candidate) < complexity(value)), key=complexity)
+
+# the spec's letter for the operand that's a plain value, per instruction. it's i everywhere but si, whose
+# i is the low byte of the address it stores to. sbclr and sbset's i picks the bit they change, so they have none
+VALUE_KINDS = { 'si': 'm', 'sbclr': None, 'sbset': None }
+
+# the immediate values in a test's instructions, as (word, shift, mask) with the shift within that word.
+# opcodes, registers, addresses and conditions are never touched, so a reduced case runs the same
+# instructions as the original and can't turn into a jump, a call or a halt
+def immediate_fields(instructions):
+    fields = []
+    addresses, opcodes, extensions, values = disassembler.decode(instructions)
+    for address, opcode in zip(addresses.tolist(), opcodes.tolist()):
+        if opcode == disassembler.UNKNOWN:
+            continue
+
+        name, size, operands = disassembler.INSTRUCTIONS[opcode]
+
+        kind = VALUE_KINDS.get(name, 'i')
+        for (shift, mask), operand_kind in zip(operands, disassembler.OPERAND_KINDS[opcode]):
+            if operand_kind != kind:
+                continue
+
+            # a two word instruction's value is both words, first word on top
+            word = address + size - 1 - shift // 16
+            if word < len(instructions):
+                fields.append((word, shift % 16, mask))
+
+    return fields
+
+# every single step reduction of a case, as (column, value) where columns 0 to 30 are the initial
+# registers and 31 onwards the immediate fields
+def reductions(instructions, initial, fields):
+    values = list(initial) + [(int(instructions[word]) >> shift) & mask for word, shift, mask in fields]
+    return [(column, simpler) for column, value in enumerate(values) for simpler in simpler_values(int(value))]
+
+def apply(instructions, initial, fields, changes):
+    instructions = instructions.copy()
+    initial = initial.copy()
+
+    for column, value in changes:
+        if column < 31:
+            initial[column] = value
+        else:
+            word, shift, mask = fields[column - 31]
+            instructions[word] = (int(instructions[word]) & ~(mask << shift)) | (value << shift)
+
+    return instructions, initial
+
+class Reducer:
+    def __init__(self, reference_ip, candidate_ip, instruction_length):
+        self.reference_ip = reference_ip
+        self.candidate_ip = candidate_ip
+
+        # the test body is patched over for every case, so any body of the right length will do
+        nops = lambda: [assembler.nop() for _ in range(instruction_length // 2)]
+        self.template = fuzz.do_tests(nops, 1)[:7]
+
+    # both runners get the whole set of candidates at once, and run at the same time
+    def run(self, instructions, initial):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            reference = executor.submit(fuzz.run_tests, self.reference_ip, self.template, instructions, initial)
+            candidate = executor.submit(fuzz.run_tests, self.candidate_ip, self.template, instructions, initial)
+            return reference.result(), candidate.result()
+
+    def mismatches(self, instructions, initial):
+        reference, candidate = self.run(instructions, initial)
+        return reference != candidate
+
+    def reduce(self, instructions, initial):
+        mismatch = self.mismatches(instructions[np.newaxis], initial[np.newaxis])[0]
+        if not mismatch.any():
+            return None
+
+        fields = immediate_fields(instructions)
+
+        # a reduction is kept only if one of the registers that mismatched at first still does
+        def fails(mismatches):
+            return (mismatches & mismatch).any(axis=1)
+
+        while True:
+            changes = reductions(instructions, initial, fields)
+            if len(changes) == 0:
+                break
+
+            candidates = [apply(instructions, initial, fields, [change]) for change in changes]
+            failing = fails(self.mismatches(np.array([c[0] for c in candidates]), np.array([c[1] for c in candidates])))
+            if not failing.any():
+                break
+
+            # try every column's simplest reduction that kept the failure at once, and fall back to the
+            # single simplest one if they don't hold up together
+            combined = {}
+            for (column, value), failed in zip(changes, failing):
+                if failed and column not in combined:
+                    combined[column] = value
+
+            reduced = apply(instructions, initial, fields, combined.items())
+            if not fails(self.mismatches(reduced[0][np.newaxis], reduced[1][np.newaxis]))[0]:
+                reduced = candidates[int(np.argmax(failing))]
+
+            instructions, initial = reduced
+            print(f"Reduced to {np.count_nonzero(initial)} nonzero registers")
+
+        return instructions, initial
+
+def print_case(instructions, initial, reference, candidate, origin=0):
+    print(f"Instructions: {' '.join(f'{word:04x}' for word in instructions)}")
+    for line in disassembler.disassemble(instructions, origin):
+        print(f"    {line}")
+    for column in range(31):
+        register = column if column < 18 else column + 1
+        marker = " <- mismatch" if reference[column] != candidate[column] else ""
+        if initial[column] != 0 or marker:
+            print(f"    reg {register:2d}: initial {initial[column]:04x} expected {reference[column]:04x} actual {candidate[column]:04x}{marker}")
+
+if __name__ == "__main__":
+    test_file = test_analyzer.parse_test_file(sys.argv[1])
+    case_index = int(sys.argv[2])
+    output = sys.argv[5] if len(sys.argv) > 5 else f"{os.path.splitext(sys.argv[1])[0]}_{case_index}_reduced.bin"
+
+    test_case = test_file.test_cases[case_index]
+    instructions = np.array(test_case.instructions, dtype=np.uint16)
+    initial = np.array(test_case.initial_state.registers, dtype=np.uint16)
+
+    reducer = Reducer(sys.argv[3], start_candidate(sys.argv[4]), test_file.instruction_length)
+    reduced = reducer.reduce(instructions, initial)
+    if reduced is None:
+        print(f"Test case {case_index} doesn't mismatch between the reference and the candidate")
+        exit(1)
+
+    instructions, initial = reduced
+    reference, candidate = reducer.run(instructions[np.newaxis], initial[np.newaxis])
+    # the test body sits at test_case_index in the template, which is a byte offset
+    print_case(instructions, initial, reference[0], candidate[0], reducer.template[3] // 2)
+
+    with open(output, "wb") as f:
+        f.write(test_file.instruction_length.to_bytes(2, 'little'))
+        f.write(fuzz.test_records(instructions[np.newaxis], reference, initial[np.newaxis]))
+
+    print(f"Wrote the reduced test case to {output}")
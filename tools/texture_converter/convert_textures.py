@@ -1,24 +1,122 @@
 #!/usr/bin/env python3
 
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import numpy as np
 import os
+import shutil
+import sys
 from PIL import Image
 
-for filename in os.listdir('texture_dumps'):
-    if filename.endswith('.rgba'):
-        parts = filename.replace('.rgba', '').split('_')
-        width = int(parts[3])
-        height = int(parts[4])
-        
-        with open(f'texture_dumps/{filename}', 'rb') as f:
-            data = f.read()
-        
-        rgba_data = bytearray()
-        for i in range(0, len(data), 4):
-            b, g, r, a = data[i:i+4]
-            rgba_data.extend([r, g, b, a])
-        
-        img = Image.frombytes('RGBA', (height, width), bytes(rgba_data))
-        img = img.rotate(90, expand=True)
-        img = img.transpose(Image.FLIP_TOP_BOTTOM)
-        img.save(f'texture_dumps/{filename.replace(".rgba", ".png")}')
-        print(f'Converted {filename}')
\ No newline at end of file
+# tex_<type>_<hash>_<width>_<height>.rgba from emu/hw/hollywood/texture.d or
+# texture_<index>_<width>x<height>.rgba from ui/sdl/device.d
+def parse_dimensions(filename):
+    parts = filename.replace('.rgba', '').split('_')
+    if parts[0] == 'texture':
+        width, height = parts[2].split('x')
+        return int(width), int(height)
+
+    return int(parts[3]), int(parts[4])
+
+def texture_hash(data, width, height):
+    return hashlib.blake2b(data, digest_size=16, person=f'{width}x{height}'.encode()).hexdigest()
+
+def convert(filename, cache_directory):
+    width, height = parse_dimensions(filename)
+
+    with open(f'texture_dumps/{filename}', 'rb') as f:
+        data = f.read()
+
+    hash = texture_hash(data, width, height)
+    png = os.path.join(cache_directory, f'{hash}.png')
+
+    if os.path.exists(png):
+        return filename, hash, width, height, False
+
+    pixels = np.frombuffer(data, dtype=np.uint8).reshape(width, height, 4)
+
+    # the dumps are BGRA and stored column major, swap the channels and transpose in one go
+    rgba_data = np.ascontiguousarray(pixels[:, :, [2, 1, 0, 3]].transpose(1, 0, 2))
+
+    # another worker may be converting the same texture, so never expose a half written png
+    temporary = f'{png}.{os.getpid()}.tmp'
+    Image.fromarray(rgba_data, 'RGBA').save(temporary, 'PNG')
+    os.replace(temporary, png)
+
+    return filename, hash, width, height, True
+
+# the index maps content hash -> png, and remembers which hash each dump file had so unchanged files aren't rehashed
+def load_index(cache_directory):
+    path = os.path.join(cache_directory, 'index.json')
+    if not os.path.exists(path):
+        return { 'textures': {}, 'files': {} }
+
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_index(cache_directory, index):
+    path = os.path.join(cache_directory, 'index.json')
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(index, f, indent=4, sort_keys=True)
+    os.replace(f'{path}.tmp', path)
+
+def is_up_to_date(filename, index, cache_directory):
+    entry = index['files'].get(filename)
+    if entry is None:
+        return False
+
+    stat = os.stat(f'texture_dumps/{filename}')
+    return entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime and \
+        os.path.exists(os.path.join(cache_directory, index['textures'][entry['hash']]['png']))
+
+# the png next to the dump, under the dump's own name, is a hard link to the cached one where the
+# filesystem allows it and a copy where it doesn't
+def publish(filename, png):
+    published = f'texture_dumps/{filename.replace(".rgba", ".png")}'
+    if os.path.exists(published) and os.path.samefile(published, png):
+        return
+
+    temporary = f'{published}.{os.getpid()}.tmp'
+    try:
+        os.link(png, temporary)
+    except OSError:
+        shutil.copyfile(png, temporary)
+    os.replace(temporary, published)
+
+def cached_png(filename, index, cache_directory):
+    return os.path.join(cache_directory, index['textures'][index['files'][filename]['hash']]['png'])
+
+if __name__ == "__main__":
+    # pass a shared directory to deduplicate textures across sessions and games
+    cache_directory = sys.argv[1] if len(sys.argv) > 1 else 'texture_dumps/cache'
+    os.makedirs(cache_directory, exist_ok=True)
+
+    index = load_index(cache_directory)
+
+    filenames = [filename for filename in os.listdir('texture_dumps') if filename.endswith('.rgba')]
+    stale = [filename for filename in filenames if not is_up_to_date(filename, index, cache_directory)]
+    print(f'{len(filenames) - len(stale)} textures already in the cache, hashing {len(stale)}')
+
+    num_converted = 0
+    with ProcessPoolExecutor() as executor:
+        for filename, hash, width, height, converted in executor.map(convert, stale, [cache_directory] * len(stale), chunksize=16):
+            stat = os.stat(f'texture_dumps/{filename}')
+            index['files'][filename] = { 'hash': hash, 'size': stat.st_size, 'mtime': stat.st_mtime }
+            index['textures'][hash] = { 'png': f'{hash}.png', 'width': width, 'height': height }
+
+            if converted:
+                num_converted += 1
+                print(f'Converted {filename} -> {hash}.png')
+            else:
+                print(f'Deduplicated {filename} -> {hash}.png')
+
+            publish(filename, os.path.join(cache_directory, f'{hash}.png'))
+
+    # a dump that was already cached may still be missing its png, if it was deleted or this is a new cache
+    for filename in set(filenames) - set(stale):
+        if not os.path.exists(f'texture_dumps/{filename.replace(".rgba", ".png")}'):
+            publish(filename, cached_png(filename, index, cache_directory))
+
+    save_index(cache_directory, index)
+    print(f'Converted {num_converted} new textures, {len(index["textures"])} unique textures in {cache_directory}')
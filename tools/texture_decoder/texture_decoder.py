@@ -1,37 +1,13 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from PIL import Image
+import csv
+import json
 import numpy as np
+import os
 import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/beandump")
 
-width = int(sys.argv[2])
-height = int(sys.argv[3])
-format = sys.argv[4]
-
-framebuffer = np.zeros((height, width, 4), dtype=np.uint8)
-framebuffer[:, :, 0] = 255
-framebuffer[:, :, 3] = 255
-
-with open('mem1.bin', 'rb') as f:
-    binary_data1 = f.read()
-with open('mem2.bin', 'rb') as f:
-    binary_data2 = f.read()
-
-def read(addr):
-    if addr > 0x10000000:
-        return binary_data2[addr - 0x10000000]
-    else:
-        return binary_data1[addr]
-
-# base_address = 0x010137c0
-# base_address = 17058240
-base_address = int(sys.argv[1])
-
-def interpolate(color1, color2, t):
-    return (
-        int(color1[0] + (color2[0] - color1[0]) * t),
-        int(color1[1] + (color2[1] - color1[1]) * t),
-        int(color1[2] + (color2[2] - color1[2]) * t),
-        255
-    )
+from beandump import BeanDump
 
 def convert_0_to_7_to_0_to_255(value):
     return value * 36
@@ -48,132 +24,333 @@ def convert_0_to_63_to_0_to_255(value):
 def div_round_up(a, b):
     return (a + b - 1) // b
 
-def convert_compressed():
+def new_framebuffer(width, height):
+    framebuffer = np.zeros((height, width, 4), dtype=np.uint8)
+    framebuffer[:, :, 0] = 255
+    framebuffer[:, :, 3] = 255
+    return framebuffer
+
+# (tiles_y, tiles_x, tile_height, tile_width, ...) -> (tiles_y * tile_height, tiles_x * tile_width, ...)
+def untile(tiles):
+    tiles_y, tiles_x, tile_height, tile_width = tiles.shape[:4]
+    rest = tiles.shape[4:]
+    return tiles.swapaxes(1, 2).reshape(tiles_y * tile_height, tiles_x * tile_width, *rest)
+
+def blit(framebuffer, pixels):
+    height = min(framebuffer.shape[0], pixels.shape[0])
+    width  = min(framebuffer.shape[1], pixels.shape[1])
+    framebuffer[:height, :width] = pixels[:height, :width]
+    return framebuffer
+
+def interpolate(color1, color2, t):
+    return (color1 + (color2 - color1) * t).astype(np.int64)
+
+def rgb565_to_rgb(value):
+    return np.stack([
+        ((value & 0xf800) >> 11) * 8,
+        ((value & 0x07e0) >> 5) * 4,
+        ((value & 0x001f) >> 0) * 8,
+    ], axis=-1)
+
+def convert_compressed(data, width, height):
     tiles_x = div_round_up(width, 8)
     tiles_y = div_round_up(height, 8)
 
-    for tile_x in range(tiles_x):
-        for tile_y in range(tiles_y):
-            tile_number = tile_x + tile_y * tiles_x
-            tile_address = base_address + tile_number * 32
-
-            for texel_number in range(4):
-                texel_address = tile_address + texel_number * 8
-
-                rgb1 = read(texel_address)
-                rgb2 = read(texel_address + 1)
-
-                color1 = ((rgb1 & 0xf8) >> 3, ((rgb1 & 0x07) << 3) | ((rgb2 & 0xe0) >> 5), (rgb2 & 0x1f) >> 0, 255)
-
-                rgb3 = read(texel_address + 2)
-                rgb4 = read(texel_address + 3)
-
-                # print(rgb1, rgb2, rgb3, rgb4)
-                color2 = ((rgb3 & 0xf8) >> 3, ((rgb3 & 0x07) << 3) | ((rgb4 & 0xe0) >> 5), (rgb4 & 0x1f) >> 0, 255)
-
-                color1 = (color1[0] * 8, color1[1] * 4, color1[2] * 8, 255)
-                color2 = (color2[0] * 8, color2[1] * 4, color2[2] * 8, 255)
-
-                x = tile_x * 8 + texel_number % 2 * 4
-                y = tile_y * 8 + texel_number // 2 * 4
-
-                colors = [
-                    color1,
-                    color2,
-                    interpolate(color1, color2, 0.33),
-                    interpolate(color1, color2, 0.66),
-                ]
-                # print(colors)
-
-                address = texel_address
-                bits = [
-                    (read(address + 4) & 0xc0) >> 6,
-                    (read(address + 4) & 0x30) >> 4,
-                    (read(address + 4) & 0xc) >> 2,
-                    read(address + 4) & 0x3,
-                    (read(address + 5) & 0xc0) >> 6,
-                    (read(address + 5) & 0x30) >> 4,
-                    (read(address + 5) & 0xc) >> 2,
-                    read(address + 5) & 0x3,
-                    (read(address + 6) & 0xc0) >> 6,
-                    (read(address + 6) & 0x30) >> 4,
-                    (read(address + 6) & 0xc) >> 2,
-                    read(address + 6) & 0x3,
-                    (read(address + 7) & 0xc0) >> 6,
-                    (read(address + 7) & 0x30) >> 4,
-                    (read(address + 7) & 0xc) >> 2,
-                    read(address + 7) & 0x3,
-                ]
-
-                fuck = 0
-
-                for i in range(4):
-                    for j in range(4):
-                        color = colors[bits[fuck]]
-                        framebuffer[y + i, x + j] = color
-                        fuck += 1
-                # exit(0)
-
-def convert_ia8():
-    tiles_x = width // 4
-    tiles_y = height // 4
+    # every 8x8 tile is four 8 byte 4x4 blocks, laid out 2x2
+    blocks = data[:tiles_x * tiles_y * 32].reshape(tiles_y, tiles_x, 2, 2, 8).astype(np.int64)
 
-    current_address = base_address
+    color1 = rgb565_to_rgb((blocks[..., 0] << 8) | blocks[..., 1])
+    color2 = rgb565_to_rgb((blocks[..., 2] << 8) | blocks[..., 3])
 
-    for tile_y in range(tiles_y):
-        for tile_x in range(tiles_x):
-            for fine_y in range(4):
-                for fine_x in range(4):
-                    intensity = read(current_address)
-                    alpha = read(current_address + 1)
-                    current_address += 2
-                    intensity, alpha = alpha, intensity
+    palette = np.full(blocks.shape[:4] + (4, 4), 255, dtype=np.uint8)
+    palette[..., 0, :3] = color1
+    palette[..., 1, :3] = color2
+    palette[..., 2, :3] = interpolate(color1, color2, 0.33)
+    palette[..., 3, :3] = interpolate(color1, color2, 0.66)
 
-                    x = tile_x * 4 + fine_x
-                    y = tile_y * 4 + fine_y
+    # one byte per row of the block, 2 bits per texel, leftmost texel in the top bits
+    indices = (blocks[..., 4:8, None] >> np.array([6, 4, 2, 0])) & 3
 
-                    framebuffer[y, x] = (intensity, intensity, intensity, alpha)
+    palette = palette.reshape(-1, 4, 4)
+    indices = indices.reshape(len(palette), 16)
+    texels  = palette[np.arange(len(palette))[:, None], indices]
 
-def convert_i4():
+    # (tiles_y, tiles_x, block_y, block_x, fine_y, fine_x, rgba) -> (tiles_y, block_y, fine_y, tiles_x, block_x, fine_x, rgba)
+    texels = texels.reshape(tiles_y, tiles_x, 2, 2, 4, 4, 4).transpose(0, 2, 4, 1, 3, 5, 6)
+    pixels = texels.reshape(tiles_y * 8, tiles_x * 8, 4)
+
+    return blit(new_framebuffer(width, height), pixels)
+
+def convert_ia8(data, width, height):
+    tiles_x = width // 4
+    tiles_y = height // 4
+
+    texels = untile(data[:tiles_x * tiles_y * 32].reshape(tiles_y, tiles_x, 4, 4, 2))
+    alpha     = texels[..., 0]
+    intensity = texels[..., 1]
+
+    pixels = np.stack([intensity, intensity, intensity, alpha], axis=-1)
+    return blit(new_framebuffer(width, height), pixels)
+
+def convert_i4(data, width, height):
     tiles_x = width // 8
     tiles_y = height // 8
 
-    current_address = base_address
-
-    for tile_y in range(tiles_y):
-        for tile_x in range(tiles_x):
-            shit = False
-            for fine_y in range(8):
-                for fine_x in range(8):
-                    value = read(current_address)
-
-                    x = tile_x * 8 + fine_x
-                    y = tile_y * 8 + fine_y
-
-                    shit = not shit
-                    if shit:
-                        value = value >> 4
-                    else:
-                        value = value & 0xf
-                        current_address += 1
-
-                    intensity = value * 0x11
-                    alpha = 0xff
-                    framebuffer[y, x] = (intensity, intensity, intensity, alpha)
-
-
-if format == 'compressed':
-    convert_compressed()
-elif format == 'ia8':
-    convert_ia8()
-elif format == 'i4':
-    convert_i4()
-else:
-    print("???")
-    exit(-1)
-# Convert to Pillow Image
-image = Image.fromarray(framebuffer, 'RGBA')
-
-
-# save image
-image.save('output.png')
+    # two texels per byte, the leftmost one in the high nybble
+    packed = data[:tiles_x * tiles_y * 32].reshape(tiles_y, tiles_x, 8, 4)
+    texels = np.stack([packed >> 4, packed & 0xf], axis=-1).reshape(tiles_y, tiles_x, 8, 8)
+
+    intensity = untile(texels) * 0x11
+    alpha = np.full_like(intensity, 0xff)
+
+    pixels = np.stack([intensity, intensity, intensity, alpha], axis=-1)
+    return blit(new_framebuffer(width, height), pixels)
+
+def rgba(r, g, b, a):
+    return np.stack(np.broadcast_arrays(r, g, b, a), axis=-1).astype(np.uint8)
+
+def ia8_to_rgba(value):
+    intensity = value & 0xff
+    return rgba(intensity, intensity, intensity, value >> 8)
+
+def rgb565_to_rgba(value):
+    return rgba((value & 0xf800) >> 8, (value & 0x07e0) >> 3, (value & 0x001f) << 3, 255)
+
+def rgb5a3_to_rgba(value):
+    opaque = rgba(
+        ((value >> 10) & 0x1f) << 3,
+        ((value >>  5) & 0x1f) << 3,
+        ((value >>  0) & 0x1f) << 3,
+        255
+    )
+
+    translucent = rgba(
+        ((value >>  8) & 0xf) << 4,
+        ((value >>  4) & 0xf) << 4,
+        ((value >>  0) & 0xf) << 4,
+        ((value >> 12) & 0x7) << 5
+    )
+
+    return np.where((value & 0x8000)[..., None] != 0, opaque, translucent)
+
+# format: (tile_width, tile_height, bytes_per_tile)
+tile_sizes = {
+    'i8':     (8, 4, 32),
+    'ia4':    (8, 4, 32),
+    'rgb565': (4, 4, 32),
+    'rgb5a3': (4, 4, 32),
+    'rgba8':  (4, 4, 64),
+    'c4':     (8, 8, 32),
+    'c8':     (8, 4, 32),
+    'c14x2':  (4, 4, 32),
+}
+
+def read_tiles(data, format, width, height):
+    tile_width, tile_height, bytes_per_tile = tile_sizes[format]
+    tiles_x = div_round_up(width,  tile_width)
+    tiles_y = div_round_up(height, tile_height)
+
+    return data[:tiles_x * tiles_y * bytes_per_tile].reshape(tiles_y, tiles_x, bytes_per_tile)
+
+def read_tiles_u16(data, format, width, height):
+    tiles = read_tiles(data, format, width, height)
+    return tiles.view('>u2').astype(np.uint16).reshape(*tiles.shape[:2], 4, 4)
+
+def convert_i8(data, width, height):
+    tiles = read_tiles(data, 'i8', width, height)
+    intensity = untile(tiles.reshape(*tiles.shape[:2], 4, 8))
+
+    pixels = rgba(intensity, intensity, intensity, intensity)
+    return blit(new_framebuffer(width, height), pixels)
+
+def convert_ia4(data, width, height):
+    tiles = read_tiles(data, 'ia4', width, height)
+    texels = untile(tiles.reshape(*tiles.shape[:2], 4, 8))
+
+    intensity = (texels & 0x0f) * 0x11
+    alpha     = (texels >> 4)   * 0x11
+
+    pixels = rgba(intensity, intensity, intensity, alpha)
+    return blit(new_framebuffer(width, height), pixels)
+
+def convert_rgb565(data, width, height):
+    pixels = rgb565_to_rgba(untile(read_tiles_u16(data, 'rgb565', width, height)))
+    return blit(new_framebuffer(width, height), pixels)
+
+def convert_rgb5a3(data, width, height):
+    pixels = rgb5a3_to_rgba(untile(read_tiles_u16(data, 'rgb5a3', width, height)))
+    return blit(new_framebuffer(width, height), pixels)
+
+def convert_rgba8(data, width, height):
+    # each tile is 16 AR pairs followed by 16 GB pairs
+    tiles = read_tiles(data, 'rgba8', width, height)
+    ar = untile(tiles[..., :32].reshape(*tiles.shape[:2], 4, 4, 2))
+    gb = untile(tiles[..., 32:].reshape(*tiles.shape[:2], 4, 4, 2))
+
+    pixels = rgba(ar[..., 1], gb[..., 0], gb[..., 1], ar[..., 0])
+    return blit(new_framebuffer(width, height), pixels)
+
+def convert_c4(data, width, height, palette):
+    # two indices per byte, the leftmost one in the high nybble
+    tiles = read_tiles(data, 'c4', width, height)
+    packed = tiles.reshape(*tiles.shape[:2], 8, 4)
+    indices = np.stack([packed >> 4, packed & 0xf], axis=-1).reshape(*tiles.shape[:2], 8, 8)
+
+    return blit(new_framebuffer(width, height), palette[untile(indices)])
+
+def convert_c8(data, width, height, palette):
+    tiles = read_tiles(data, 'c8', width, height)
+    indices = tiles.reshape(*tiles.shape[:2], 4, 8)
+
+    return blit(new_framebuffer(width, height), palette[untile(indices)])
+
+def convert_c14x2(data, width, height, palette):
+    indices = read_tiles_u16(data, 'c14x2', width, height) & 0x3fff
+
+    return blit(new_framebuffer(width, height), palette[untile(indices)])
+
+def size_of_texture(format, width, height):
+    if format == 'compressed':
+        return div_round_up(width, 8) * div_round_up(height, 8) * 32
+    elif format == 'ia8':
+        return (width // 4) * (height // 4) * 32
+    elif format == 'i4':
+        return (width // 8) * (height // 8) * 32
+    else:
+        tile_width, tile_height, bytes_per_tile = tile_sizes[format]
+        return div_round_up(width, tile_width) * div_round_up(height, tile_height) * bytes_per_tile
+
+converters = {
+    'compressed': convert_compressed,
+    'ia8': convert_ia8,
+    'i4': convert_i4,
+    'i8': convert_i8,
+    'ia4': convert_ia4,
+    'rgb565': convert_rgb565,
+    'rgb5a3': convert_rgb5a3,
+    'rgba8': convert_rgba8,
+    'c4': convert_c4,
+    'c8': convert_c8,
+    'c14x2': convert_c14x2,
+}
+
+palette_sizes = {
+    'c4': 16,
+    'c8': 256,
+    'c14x2': 16384,
+}
+
+tlut_converters = {
+    'ia8': ia8_to_rgba,
+    'rgb565': rgb565_to_rgba,
+    'rgb5a3': rgb5a3_to_rgba,
+}
+
+def decode_palette(tlut_address, tlut_format, num_entries):
+    if tlut_format not in tlut_converters:
+        raise ValueError(f"unknown tlut format: {tlut_format}")
+
+    entries = np.frombuffer(dump.read_range(tlut_address, num_entries * 2), dtype='>u2').astype(np.uint16)
+    return tlut_converters[tlut_format](entries)
+
+def decode_texture(address, width, height, format, tlut_address=None, tlut_format=None):
+    if format not in converters:
+        raise ValueError(f"unknown texture format: {format}")
+
+    data = np.frombuffer(dump.read_range(address, size_of_texture(format, width, height)), dtype=np.uint8)
+
+    if format in palette_sizes:
+        if tlut_address is None or tlut_format is None:
+            raise ValueError(f"{format} textures need a tlut address and tlut format")
+
+        palette = decode_palette(tlut_address, tlut_format, palette_sizes[format])
+        return converters[format](data, width, height, palette)
+
+    return converters[format](data, width, height)
+
+def parse_int(value):
+    return value if isinstance(value, int) else int(value, 0)
+
+# a json list of objects or a csv with a header, both with address, width, height, format and optionally
+# tlut_address, tlut_format (for c4, c8 and c14x2) and output
+def load_manifest(filename):
+    with open(filename, 'r', newline='') as f:
+        if filename.endswith('.csv'):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = json.load(f)
+
+    jobs = []
+    for index, row in enumerate(rows):
+        address = parse_int(row['address'])
+        format = row['format']
+        tlut_address = parse_int(row['tlut_address']) if row.get('tlut_address') else None
+        tlut_format = row.get('tlut_format') or None
+        output = row.get('output') or f"texture_{index:04d}_{address:08x}_{format}.png"
+        jobs.append((address, parse_int(row['width']), parse_int(row['height']), format, tlut_address, tlut_format, output))
+
+    return jobs
+
+# mmaps can't be pickled, so every worker maps bean.bdp itself and they all share the same page cache
+def init_worker(filename):
+    global dump
+    dump = BeanDump(filename)
+
+def decode_job(job, output_directory):
+    address, width, height, format, tlut_address, tlut_format, output = job
+    framebuffer = decode_texture(address, width, height, format, tlut_address, tlut_format)
+
+    filename = os.path.join(output_directory, output)
+    Image.fromarray(framebuffer, 'RGBA').save(filename)
+    return filename
+
+def decode_batch(manifest, output_directory, dump_filename='bean.bdp'):
+    jobs = load_manifest(manifest)
+    os.makedirs(output_directory, exist_ok=True)
+
+    num_failures = 0
+    with ProcessPoolExecutor(initializer=init_worker, initargs=(dump_filename,)) as executor:
+        futures = { executor.submit(decode_job, job, output_directory): job for job in jobs }
+
+        for future in as_completed(futures):
+            address, width, height, format, tlut_address, tlut_format, output = futures[future]
+
+            try:
+                print(f"Decoded {future.result()}")
+            except (IndexError, ValueError) as e:
+                print(f"Failed to decode 0x{address:08x} ({width}x{height} {format}): {e}")
+                num_failures += 1
+
+    print(f"Decoded {len(jobs) - num_failures} / {len(jobs)} textures")
+
+if __name__ == "__main__":
+    if sys.argv[1] == '--batch':
+        decode_batch(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else 'texture_output')
+        exit(0)
+
+    width = int(sys.argv[2])
+    height = int(sys.argv[3])
+    format = sys.argv[4]
+
+    # only used by the c4, c8 and c14x2 formats
+    tlut_address = int(sys.argv[5]) if len(sys.argv) > 5 else None
+    tlut_format = sys.argv[6] if len(sys.argv) > 6 else None
+
+    dump = BeanDump('bean.bdp')
+
+    # base_address = 0x010137c0
+    # base_address = 17058240
+    base_address = int(sys.argv[1])
+
+    if format not in converters:
+        print("???")
+        exit(-1)
+
+    framebuffer = decode_texture(base_address, width, height, format, tlut_address, tlut_format)
+
+    # Convert to Pillow Image
+    image = Image.fromarray(framebuffer, 'RGBA')
+
+
+    # save image
+    image.save('output.png')
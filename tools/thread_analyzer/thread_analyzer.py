@@ -1,5 +1,10 @@
-mem1 = list(open('mem1.bin', 'rb').read())
-mem2 = list(open('mem2.bin', 'rb').read())
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/beandump")
+
+from beandump import BeanDump
+
+dump = BeanDump(sys.argv[1] if len(sys.argv) > 1 else 'bean.bdp')
 
 #   state = PowerPC::MMU::HostRead_U16(guard, addr + 0x2c8);
 #   is_detached = PowerPC::MMU::HostRead_U16(guard, addr + 0x2ca);
@@ -90,32 +95,9 @@ class Thread:
 
         return "\n".join(lines)
 
-def read_u16(addr):
-    if (addr >= 0x90000000):
-        addr -= 0x90000000
-        return (mem2[addr] << 8) | mem2[addr + 1]
-    
-    addr -= 0x80000000
-    return (mem1[addr] << 8) | mem1[addr + 1]
-
-def read_u32(addr):
-    if (addr >= 0x90000000):
-        addr -= 0x90000000
-        return (mem2[addr] << 24) | (mem2[addr + 1] << 16) | (mem2[addr + 2] << 8) | mem2[addr + 3]
-    
-    addr -= 0x80000000
-    return (mem1[addr] << 24) | (mem1[addr + 1] << 16) | (mem1[addr + 2] << 8) | mem1[addr + 3]
-
-def is_valid_addr(addr, size=1):
-    if addr >= 0x90000000:
-        addr -= 0x90000000
-        return 0 <= addr and addr + size <= len(mem2)
-
-    if addr < 0x80000000:
-        return False
-
-    addr -= 0x80000000
-    return 0 <= addr and addr + size <= len(mem1)
+read_u16 = dump.read_u16
+read_u32 = dump.read_u32
+is_valid_addr = dump.is_valid_addr
 
 ACTIVE_QUEUE_HEAD_ADDR = 0x800000dc
 